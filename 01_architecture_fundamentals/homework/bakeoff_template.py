@@ -3,16 +3,47 @@ The Great Model Bake-off — Homework Template
 
 Send the same prompts to multiple models and compare quality + latency.
 Uses the HuggingFaceClient pattern from Lab 2.
+
+Latency is measured like a benchmark, not a stopwatch:
+  - warmup runs per model (cold starts happen outside the timed results)
+  - N repetitions per (prompt, model) pair
+  - service time (the successful HTTP call) is kept separate from queueing
+    and retry time (waiting for a worker, backoff sleeps, failed attempts),
+    all via perf_counter from the moment a request is submitted
+  - p50/p95/p99 and tokens/sec per model and concurrency level
+  - a concurrency sweep that runs all models in parallel
+  - raw rows and summaries saved as CSV/JSON for run-to-run comparison
+
+    python bakeoff_template.py --repetitions 5 --concurrency 1 2 4
+    python bakeoff_template.py --compare results/bakeoff_<previous>.json
+
+Record once, then replay offline (see lab_02 replay.py):
+
+    python bakeoff_template.py --record bakeoff_cassette.json
+    python bakeoff_template.py --replay bakeoff_cassette.json --time-scale 0 --fault-503 0.05
 """
 
+import argparse
+import csv
+import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lab" / "lab_02_api_client" / "starter"))
+from replay import Cassette, RecordingAdapter, ReplayAdapter  # noqa: E402
 
 load_dotenv()
 
+API_URL = "https://api-inference.huggingface.co/models/"
+
 
 def get_api_token():
     """Retrieve API token with validation."""
@@ -25,9 +56,26 @@ def get_api_token():
     return token
 
 
-def query_model(model_id: str, prompt: str, token: str, max_retries: int = 3) -> dict:
-    """Query a Hugging Face model with retry logic. Returns response + timing."""
-    url = f"https://api-inference.huggingface.co/models/{model_id}"
+def query_model(
+    model_id: str,
+    prompt: str,
+    token: str,
+    max_retries: int = 3,
+    session: requests.Session | None = None,
+    base_url: str = API_URL,
+    submitted_at: float | None = None,
+) -> dict:
+    """
+    Query a Hugging Face model with retry logic. Returns response + timing.
+
+    Timing (seconds, perf_counter), measured from `submitted_at` (when the
+    request entered an executor queue) or from this call if not given:
+        latency_s: total wall time including queueing and retries
+        service_s: duration of the successful HTTP call only
+        queue_s:   everything else — executor wait, backoff sleeps and
+                   failed attempts
+    """
+    url = f"{base_url}{model_id}"
     headers = {"Authorization": f"Bearer {token}"}
     payload = {
         "inputs": prompt,
@@ -37,17 +85,28 @@ def query_model(model_id: str, prompt: str, token: str, max_retries: int = 3) ->
             "return_full_text": False,
         },
     }
+    post = session.post if session is not None else requests.post
+
+    start_time = time.perf_counter() if submitted_at is None else submitted_at
 
-    start_time = time.time()
+    def timing(service_s: float, attempts: int) -> dict:
+        latency = time.perf_counter() - start_time
+        return {
+            "latency_s": latency,
+            "service_s": service_s,
+            "queue_s": latency - service_s,
+            "attempts": attempts,
+        }
 
     for attempt in range(max_retries):
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=120)
+            call_start = time.perf_counter()
+            response = post(url, headers=headers, json=payload, timeout=120)
+            call_s = time.perf_counter() - call_start
             if response.status_code == 200:
-                elapsed = time.time() - start_time
                 result = response.json()
                 text = result[0].get("generated_text", str(result))
-                return {"text": text, "latency_s": round(elapsed, 2), "status": "ok"}
+                return {"text": text, "status": "ok", "output_tokens": count_tokens(text)} | timing(call_s, attempt + 1)
             if response.status_code == 503:
                 wait = response.json().get("estimated_time", 30)
                 print(f"  Model loading... waiting {wait:.0f}s")
@@ -59,12 +118,26 @@ def query_model(model_id: str, prompt: str, token: str, max_retries: int = 3) ->
             response.raise_for_status()
         except Exception as e:
             if attempt == max_retries - 1:
-                elapsed = time.time() - start_time
-                return {"text": f"ERROR: {e}", "latency_s": round(elapsed, 2), "status": "error"}
+                return {"text": f"ERROR: {e}", "status": "error", "output_tokens": 0} | timing(0.0, attempt + 1)
             time.sleep(5)
 
-    elapsed = time.time() - start_time
-    return {"text": "Failed after retries", "latency_s": round(elapsed, 2), "status": "error"}
+    return {"text": "Failed after retries", "status": "error", "output_tokens": 0} | timing(0.0, max_retries)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate output tokens (~0.75 words per token for English)."""
+    return round(len(text.split()) / 0.75)
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """Linear-interpolated percentile, p in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
 
 
 # =====================================================================
@@ -85,41 +158,226 @@ PROMPTS = [
 ]
 
 
-def main():
-    token = get_api_token()
-    results = []
+# =====================================================================
+# Benchmark harness
+# =====================================================================
+
+def make_session(pool_size: int, args: argparse.Namespace) -> requests.Session:
+    """One keep-alive session shared by all worker threads (optionally recording or replaying)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(MODELS), pool_maxsize=pool_size)
+    if args.record:
+        adapter = RecordingAdapter(Cassette(args.record), inner=adapter)
+    elif args.replay:
+        adapter = ReplayAdapter(
+            Cassette(args.replay),
+            time_scale=args.time_scale,
+            fault_503=args.fault_503,
+            fault_429=args.fault_429,
+            seed=args.seed,
+        )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def warm_up(models: list[str], token: str, runs: int, session: requests.Session, base_url: str):
+    """Untimed requests so cold starts are paid before measuring — all models in parallel."""
+    if runs <= 0:
+        return
+    print(f"\nWarming up {len(models)} models ({runs} run(s) each)...")
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        for model in models:
+            pool.submit(
+                lambda m: [query_model(m, PROMPTS[0], token, session=session, base_url=base_url) for _ in range(runs)],
+                model,
+            )
+
+
+def run_level(
+    models: list[str],
+    prompts: list[str],
+    token: str,
+    repetitions: int,
+    concurrency: int,
+    session: requests.Session,
+    base_url: str,
+) -> tuple[list[dict], float]:
+    """
+    Runs every (prompt, model, repetition) once with `concurrency` requests in
+    flight per model, all models at the same time. Returns (rows, wall_s).
+    """
+    executors = {model: ThreadPoolExecutor(max_workers=concurrency) for model in models}
+    jobs = []
+    start = time.perf_counter()
+    for rep in range(repetitions):
+        for i, prompt in enumerate(prompts, 1):
+            for model in models:
+                future = executors[model].submit(
+                    query_model, model, prompt, token, session=session, base_url=base_url,
+                    submitted_at=time.perf_counter(),
+                )
+                jobs.append((rep, i, prompt, model, future))
+
+    rows = []
+    for rep, i, prompt, model, future in jobs:
+        result = future.result()
+        rows.append({
+            "concurrency": concurrency,
+            "repetition": rep,
+            "prompt_num": i,
+            "prompt": prompt,
+            "model": model,
+            "response": result["text"],
+            "status": result["status"],
+            "attempts": result["attempts"],
+            "latency_s": result["latency_s"],
+            "service_s": result["service_s"],
+            "queue_s": result["queue_s"],
+            "output_tokens": result["output_tokens"],
+        })
+    wall_s = time.perf_counter() - start
+    for executor in executors.values():
+        executor.shutdown()
+    return rows, wall_s
+
+
+def summarize(rows: list[dict], wall_s: float) -> list[dict]:
+    """Per-model percentiles and throughput for one concurrency level."""
+    summaries = []
+    for model in dict.fromkeys(r["model"] for r in rows):
+        model_rows = [r for r in rows if r["model"] == model]
+        ok = [r for r in model_rows if r["status"] == "ok"]
+        service = [r["service_s"] for r in ok]
+        latency = [r["latency_s"] for r in ok]
+        tokens = sum(r["output_tokens"] for r in ok)
+        summaries.append({
+            "model": model,
+            "concurrency": model_rows[0]["concurrency"],
+            "requests": len(model_rows),
+            "errors": len(model_rows) - len(ok),
+            "service_p50_s": percentile(service, 50),
+            "service_p95_s": percentile(service, 95),
+            "service_p99_s": percentile(service, 99),
+            "latency_p50_s": percentile(latency, 50),
+            "latency_p99_s": percentile(latency, 99),
+            "queue_mean_s": sum(r["queue_s"] for r in ok) / len(ok) if ok else None,
+            "tokens_per_s": tokens / sum(service) if service and sum(service) > 0 else None,
+            "throughput_rps": len(ok) / wall_s if wall_s > 0 else None,
+        })
+    return summaries
+
+
+def save_results(rows: list[dict], summaries: list[dict], config: dict, output_dir: Path) -> Path:
+    """
+    Writes raw rows as CSV and everything as JSON; returns the JSON path.
+    With no rows (nothing was collected) the CSV is left empty.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_path = output_dir / f"bakeoff_{stamp}.csv"
+    json_path = output_dir / f"bakeoff_{stamp}.json"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        if rows:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    json_path.write_text(
+        json.dumps({"config": config, "summary": summaries, "rows": rows}, indent=2, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    print(f"\nSaved {csv_path} and {json_path}")
+    return json_path
+
+
+def compare_with(previous_path: str, summaries: list[dict]):
+    """Prints the change in service p50/p95 against an earlier run."""
+    previous = json.loads(Path(previous_path).read_text(encoding="utf-8"))["summary"]
+    before = {(s["model"], s["concurrency"]): s for s in previous}
+    print("\n" + "=" * 70)
+    print(f"  COMPARISON WITH {previous_path}")
+    print("=" * 70)
+    print(f"{'Model':<35} {'Conc':>5} {'p50 Δ':>10} {'p95 Δ':>10}")
+    print("-" * 64)
+    for s in summaries:
+        old = before.get((s["model"], s["concurrency"]))
+        if not old or old["service_p50_s"] is None or s["service_p50_s"] is None:
+            continue
+        d50 = s["service_p50_s"] - old["service_p50_s"]
+        d95 = s["service_p95_s"] - old["service_p95_s"]
+        print(f"{s['model'].split('/')[-1]:<35} {s['concurrency']:>5} {d50:>+9.2f}s {d95:>+9.2f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="The Great Model Bake-off")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per model")
+    parser.add_argument("--repetitions", type=int, default=3, help="Timed runs per (prompt, model)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1], help="Levels to sweep")
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument("--compare", default=None, help="Earlier bakeoff_*.json to diff against")
+    parser.add_argument("--base-url", default=API_URL, help="Inference API URL (e.g. a local stub)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="CASSETTE", help="Save every request/response to a cassette")
+    mode.add_argument("--replay", metavar="CASSETTE", help="Answer requests from a cassette (offline)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Replay: recorded latency multiplier")
+    parser.add_argument("--fault-503", type=float, default=0.0, help="Replay: probability of a cold-start 503")
+    parser.add_argument("--fault-429", type=float, default=0.0, help="Replay: probability of a 429")
+    parser.add_argument("--seed", type=int, default=None, help="Replay: seed for repeatable faults")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    token = os.getenv("HUGGINGFACE_API_TOKEN", "offline") if args.replay else get_api_token()
+    session = make_session(max(args.concurrency) * len(MODELS), args)
 
     print("=" * 70)
     print("  THE GREAT MODEL BAKE-OFF")
     print("=" * 70)
 
+    warm_up(MODELS, token, args.warmup, session, args.base_url)
+
+    results = []
+    summaries = []
+    for level in args.concurrency:
+        print(f"\nRunning {args.repetitions} repetition(s) at concurrency {level}...")
+        rows, wall_s = run_level(MODELS, PROMPTS, token, args.repetitions, level, session, args.base_url)
+        results.extend(rows)
+        summaries.extend(summarize(rows, wall_s))
+
+    # --- Responses (first repetition) for quality review ---
+    first = [r for r in results if r["repetition"] == 0 and r["concurrency"] == args.concurrency[0]]
     for i, prompt in enumerate(PROMPTS, 1):
         print(f"\n--- Prompt {i}: {prompt[:60]}... ---")
-        for model in MODELS:
-            model_short = model.split("/")[-1]
-            print(f"\n  [{model_short}] Querying...")
-            result = query_model(model, prompt, token)
-            print(f"  [{model_short}] Latency: {result['latency_s']}s")
-            print(f"  [{model_short}] Response: {result['text'][:150]}...")
-
-            results.append({
-                "prompt_num": i,
-                "prompt": prompt,
-                "model": model,
-                "response": result["text"],
-                "latency_s": result["latency_s"],
-                "status": result["status"],
-            })
+        for r in (r for r in first if r["prompt_num"] == i):
+            model_short = r["model"].split("/")[-1]
+            print(f"  [{model_short}] Service: {r['service_s']:.2f}s (queue/retry {r['queue_s']:.2f}s)")
+            print(f"  [{model_short}] Response: {r['response'][:150]}...")
 
     # --- Summary Table ---
     print("\n" + "=" * 70)
-    print("  RESULTS SUMMARY")
+    print("  RESULTS SUMMARY (service time, seconds)")
     print("=" * 70)
-    print(f"\n{'Prompt':<8} {'Model':<35} {'Latency':>10} {'Status':>8}")
-    print("-" * 65)
-    for r in results:
-        model_short = r["model"].split("/")[-1]
-        print(f"  #{r['prompt_num']:<5} {model_short:<35} {r['latency_s']:>8.1f}s {r['status']:>8}")
+    print(f"\n{'Model':<30} {'Conc':>4} {'p50':>7} {'p95':>7} {'p99':>7} {'queue':>7} {'tok/s':>7} {'err':>4}")
+    print("-" * 78)
+
+    def fmt(value, spec=">7.2f"):
+        return format(value, spec) if value is not None else format("-", ">7")
+
+    for s in summaries:
+        model_short = s["model"].split("/")[-1]
+        print(
+            f"{model_short:<30} {s['concurrency']:>4} {fmt(s['service_p50_s'])} "
+            f"{fmt(s['service_p95_s'])} {fmt(s['service_p99_s'])} {fmt(s['queue_mean_s'])} "
+            f"{fmt(s['tokens_per_s'], '>7.1f')} {s['errors']:>4}"
+        )
+
+    session.close()  # Also saves the cassette when recording
+
+    config = vars(args) | {"models": MODELS, "prompts": PROMPTS}
+    save_results(results, summaries, config, Path(args.output_dir))
+    if args.compare:
+        compare_with(args.compare, summaries)
 
     # --- Rate quality (manual step) ---
     print("\n" + "=" * 70)
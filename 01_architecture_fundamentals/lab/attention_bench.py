@@ -0,0 +1,256 @@
+"""
+Lab 1 — Extension: Measured Context-Length Scaling
+
+CPU-only NumPy reference kernels for single-head attention, timed across
+context lengths so the O(n²) discussion rests on measurements:
+
+- naive:    full n×n score matrix (memory grows with n²)
+- chunked:  blocked attention with an online softmax — same result as
+            naive, but only block×block scores exist at a time
+- sliding:  causal sliding-window attention — each token sees the
+            previous `window` tokens, so time and memory grow linearly
+
+Every measurement runs in a fresh process, so peak RSS (resource module)
+belongs to that kernel alone. Runs projected to exceed the time budget
+or the memory limit are skipped, not attempted.
+
+    python attention_bench.py --lengths 1024 4096 8192 32768 128000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+KERNELS = ("naive", "chunked", "sliding")
+
+
+def naive_attention(q: np.ndarray, k: np.ndarray, v: np.ndarray, **_) -> np.ndarray:
+    scores = q @ k.T
+    scores *= 1.0 / np.sqrt(q.shape[1])
+    scores -= scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores @ v
+
+
+def chunked_attention(q: np.ndarray, k: np.ndarray, v: np.ndarray, block: int = 1024, **_) -> np.ndarray:
+    n, d = q.shape
+    out = np.empty_like(q)
+    for qs in range(0, n, block):
+        qb = q[qs:qs + block] * (1.0 / np.sqrt(d))
+        running_max = np.full((len(qb), 1), -np.inf, dtype=q.dtype)
+        denominator = np.zeros((len(qb), 1), dtype=q.dtype)
+        acc = np.zeros((len(qb), d), dtype=q.dtype)
+        for ks in range(0, n, block):
+            scores = qb @ k[ks:ks + block].T
+            new_max = np.maximum(running_max, scores.max(axis=1, keepdims=True))
+            scores -= new_max
+            np.exp(scores, out=scores)
+            correction = np.exp(running_max - new_max)
+            denominator = denominator * correction + scores.sum(axis=1, keepdims=True)
+            acc = acc * correction + scores @ v[ks:ks + block]
+            running_max = new_max
+        out[qs:qs + block] = acc / denominator
+    return out
+
+
+def sliding_window_attention(
+    q: np.ndarray, k: np.ndarray, v: np.ndarray, window: int = 1024, block: int = 1024, **_
+) -> np.ndarray:
+    n, d = q.shape
+    out = np.empty_like(q)
+    for qs in range(0, n, block):
+        qe = min(qs + block, n)
+        ks = max(0, qs - window + 1)
+        scores = (q[qs:qe] * (1.0 / np.sqrt(d))) @ k[ks:qe].T
+        rows = np.arange(qs, qe)[:, None]
+        cols = np.arange(ks, qe)[None, :]
+        scores[(cols > rows) | (cols <= rows - window)] = -np.inf
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        out[qs:qe] = scores @ v[ks:qe]
+    return out
+
+
+_KERNEL_FUNCTIONS = {
+    "naive": naive_attention,
+    "chunked": chunked_attention,
+    "sliding": sliding_window_attention,
+}
+
+# Growth of run time with n, used to project whether a run fits the budget
+_TIME_EXPONENT = {"naive": 2, "chunked": 2, "sliding": 1}
+
+
+def estimated_bytes(kernel: str, n: int, dim: int, block: int, window: int) -> int:
+    """Rough peak working set: inputs/output plus the largest score buffers."""
+    inputs = 4 * n * dim * 4
+    if kernel == "naive":
+        return inputs + 2 * n * n * 4
+    if kernel == "chunked":
+        return inputs + 3 * block * block * 4
+    return inputs + 3 * block * (block + window) * 4
+
+
+def _max_rss_bytes() -> int:
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux reports KiB
+
+
+def _measure(kernel: str, n: int, dim: int, block: int, window: int, repeats: int) -> dict:
+    """Runs in a fresh worker process."""
+    rng = np.random.default_rng(0)
+    baseline = _max_rss_bytes()
+    q, k, v = (rng.standard_normal((n, dim), dtype=np.float32) for _ in range(3))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _KERNEL_FUNCTIONS[kernel](q, k, v, block=block, window=window)
+        times.append(time.perf_counter() - start)
+    peak = _max_rss_bytes()
+    return {
+        "wall_s": min(times),
+        "peak_rss_mb": peak / 2**20,
+        "kernel_rss_mb": (peak - baseline) / 2**20,
+    }
+
+
+def check_kernels(n: int = 300, dim: int = 32, block: int = 64):
+    """Chunked must equal naive; sliding with a full window must equal causal naive."""
+    rng = np.random.default_rng(1)
+    q, k, v = (rng.standard_normal((n, dim)) for _ in range(3))
+    expected = naive_attention(q, k, v)
+    np.testing.assert_allclose(chunked_attention(q, k, v, block=block), expected, rtol=1e-6, atol=1e-8)
+
+    scores = q @ k.T / np.sqrt(dim)
+    scores[np.triu_indices(n, 1)] = -np.inf
+    weights = np.exp(scores - scores.max(axis=1, keepdims=True))
+    causal = (weights / weights.sum(axis=1, keepdims=True)) @ v
+    got = sliding_window_attention(q, k, v, window=n, block=block)
+    np.testing.assert_allclose(got, causal, rtol=1e-6, atol=1e-8)
+
+
+def _physical_memory() -> int:
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def run_attention_benchmark(
+    context_lengths: list[int],
+    kernels: tuple[str, ...] = KERNELS,
+    dim: int = 64,
+    block: int = 1024,
+    window: int = 1024,
+    repeats: int = 3,
+    time_budget: float = 60.0,
+    memory_limit: int | None = None,
+    progress=print,
+) -> list[dict]:
+    """
+    Measures each kernel at each context length (ascending).
+
+    Args:
+        dim: Head dimension
+        block: Block size for chunked and sliding kernels
+        window: Sliding-window width in tokens
+        repeats: Timed runs per measurement (the fastest is reported)
+        time_budget: Skip runs projected to take longer than this (seconds)
+        memory_limit: Skip runs estimated to need more bytes
+            (default: half of physical memory)
+        progress: Called with one line of text per measurement (None = silent)
+    """
+    check_kernels()
+    memory_limit = memory_limit or _physical_memory() // 2
+    results = []
+    for kernel in kernels:
+        previous: tuple[int, float] | None = None
+        for n in sorted(context_lengths):
+            row = {"kernel": kernel, "context": n, "status": "ok", "wall_s": None,
+                   "peak_rss_mb": None, "kernel_rss_mb": None, "note": ""}
+            needed = estimated_bytes(kernel, n, dim, block, window)
+            projected = (
+                previous[1] * repeats * (n / previous[0]) ** _TIME_EXPONENT[kernel]
+                if previous else None
+            )
+            if needed > memory_limit:
+                row.update(status="skipped", note=f"needs ~{needed / 2**30:.1f} GiB")
+            elif projected is not None and projected > time_budget:
+                row.update(status="skipped", note=f"projected {projected:.0f}s")
+            else:
+                # One fresh process per measurement so ru_maxrss is this kernel's peak
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    row.update(pool.submit(_measure, kernel, n, dim, block, window, repeats).result())
+                previous = (n, row["wall_s"])
+            results.append(row)
+            if progress is not None:
+                progress(_format_row(row))
+    return results
+
+
+def _format_row(row: dict) -> str:
+    if row["status"] != "ok":
+        return f"{row['kernel']:<8} {row['context']:>8,}  {'skipped':>10}  {row['note']}"
+    return (
+        f"{row['kernel']:<8} {row['context']:>8,}  {row['wall_s'] * 1000:>9.1f}ms  "
+        f"{row['peak_rss_mb']:>9.0f}MB  {row['kernel_rss_mb']:>9.0f}MB"
+    )
+
+
+def format_results(results: list[dict]) -> str:
+    header = f"{'Kernel':<8} {'Tokens':>8}  {'Wall time':>11}  {'Peak RSS':>11}  {'Kernel RSS':>10}"
+    return "\n".join([header, "-" * len(header)] + [_format_row(row) for row in results])
+
+
+def save_results(results: list[dict], path: str | Path):
+    """Writes .json or .csv depending on the suffix."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure attention cost vs. context length (CPU, NumPy)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1024, 4096, 8192, 32768, 128000])
+    parser.add_argument("--kernels", nargs="+", choices=KERNELS, default=list(KERNELS))
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--block", type=int, default=1024)
+    parser.add_argument("--window", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--time-budget", type=float, default=60.0, help="Seconds per measurement")
+    parser.add_argument("--memory-limit-gb", type=float, default=None)
+    parser.add_argument("--output", help="Save results as .json or .csv")
+    args = parser.parse_args()
+
+    results = run_attention_benchmark(
+        args.lengths,
+        tuple(args.kernels),
+        dim=args.dim,
+        block=args.block,
+        window=args.window,
+        repeats=args.repeats,
+        time_budget=args.time_budget,
+        memory_limit=int(args.memory_limit_gb * 2**30) if args.memory_limit_gb else None,
+        progress=None,
+    )
+    print(format_results(results))
+    if args.output:
+        save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Lab 1 — Extension: Streaming Corpus Cost Estimator
+
+estimate_cost() prices one string. This prices a whole corpus — text files
+or JSONL — without loading it: files are read lazily in blocks, grouped
+into chunks of about `chunk_chars` characters, and counted in a process
+pool with a fixed number of chunks in flight, so memory stays bounded
+however large the corpus is.
+
+    estimate = estimate_corpus_cost(["data/"], PRICING, progress=print)
+    print(format_estimate(estimate))
+
+    python corpus_cost.py data/*.jsonl --field text --output-tokens 500
+
+Each JSONL line (or each other file) is one document. Costs use the same
+formula as estimate_cost(): tokens / 1M * price, with
+`output_tokens_per_document` expected output tokens per document.
+"""
+
+import argparse
+import codecs
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from token_counter import TokenCounter
+
+# Same table as the lab notebook (USD per 1M tokens)
+DEFAULT_PRICING = {
+    "GPT-4-Turbo": {"input": 10.00, "output": 30.00},
+    "GPT-4o": {"input": 2.50, "output": 10.00},
+    "GPT-3.5-Turbo": {"input": 0.50, "output": 1.50},
+    "Claude-3.5-Sonnet": {"input": 3.00, "output": 15.00},
+    "Gemini-1.5-Pro": {"input": 1.25, "output": 5.00},
+}
+
+# The lab uses the GPT-4 encoder as a proxy for every model
+DEFAULT_ENCODING = "cl100k_base"
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+@dataclass
+class CorpusProgress:
+    """Passed to the progress callback after every counted chunk."""
+
+    bytes_read: int
+    bytes_total: int
+    documents: int
+    tokens: int  # Input tokens counted so far (first encoding)
+
+    @property
+    def fraction(self) -> float:
+        return self.bytes_read / self.bytes_total if self.bytes_total else 1.0
+
+    def __str__(self) -> str:
+        return f"{self.fraction:6.1%}  {self.documents:,} docs  {self.tokens:,} tokens"
+
+
+@dataclass
+class CorpusEstimate:
+    files: int = 0
+    documents: int = 0
+    bytes: int = 0
+    characters: int = 0
+    tokens: dict[str, int] = field(default_factory=dict)  # Per encoding
+    costs: list[dict] = field(default_factory=list)  # One estimate_cost()-style row per model
+
+
+def _corpus_files(paths: Iterable[str | Path]) -> list[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def _read_pieces(path: Path, text_field: str, block_size: int) -> Iterator[tuple[str, int, int]]:
+    """Yields (text, bytes consumed, documents started) without reading the whole file."""
+    if path.suffix in JSONL_SUFFIXES:
+        with path.open("rb") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    yield "", len(line), 0
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    if text_field not in record:
+                        raise ValueError(f"{path}:{line_no}: no {text_field!r} field")
+                    record = record[text_field]
+                yield record if isinstance(record, str) else json.dumps(record), len(line), 1
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    started = 1
+    with path.open("rb") as f:
+        while block := f.read(block_size):
+            text = carry + decoder.decode(block)
+            # Split just before whitespace, where the BPE pre-tokenizer splits anyway
+            cut = max(text.rfind(" "), text.rfind("\n"))
+            if cut <= 0:
+                cut = len(text)
+            carry = text[cut:]
+            yield text[:cut], len(block), started
+            started = 0
+        tail = carry + decoder.decode(b"", final=True)
+        if tail or started:
+            yield tail, 0, started
+
+
+def _chunks(
+    files: list[Path], text_field: str, chunk_chars: int
+) -> Iterator[tuple[list[str], int, int, int]]:
+    """Groups pieces into (texts, bytes, documents, characters) of ~chunk_chars."""
+    texts, size, documents, characters = [], 0, 0, 0
+    for path in files:
+        for text, nbytes, started in _read_pieces(path, text_field, chunk_chars):
+            if text:
+                texts.append(text)
+            size += nbytes
+            documents += started
+            characters += len(text)
+            if characters >= chunk_chars:
+                yield texts, size, documents, characters
+                texts, size, documents, characters = [], 0, 0, 0
+    if texts or size or documents:
+        yield texts, size, documents, characters
+
+
+_worker_counters: dict[str, TokenCounter] = {}
+
+
+def _count_chunk(texts: list[str], encodings: tuple[str, ...], num_threads: int = 1) -> dict[str, int]:
+    """Token totals per encoding for one chunk (runs inside a worker process)."""
+    totals = {}
+    for encoding in encodings:
+        if encoding not in _worker_counters:
+            # No count cache: corpus texts rarely repeat, and it would hold them in memory
+            _worker_counters[encoding] = TokenCounter(encoding, cache_size=0, num_threads=num_threads)
+        totals[encoding] = _worker_counters[encoding].total(texts)
+    return totals
+
+
+def _price(model: str, prices: dict, input_tokens: int, output_tokens: int) -> dict:
+    input_cost = (input_tokens / 1_000_000) * prices["input"]
+    output_cost = (output_tokens / 1_000_000) * prices["output"]
+    return {
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "total_cost": input_cost + output_cost,
+    }
+
+
+def estimate_corpus_cost(
+    paths: Iterable[str | Path],
+    pricing: dict[str, dict] = DEFAULT_PRICING,
+    output_tokens_per_document: int = 500,
+    encodings: dict[str, str] | None = None,
+    text_field: str = "text",
+    chunk_chars: int = 1_000_000,
+    workers: int | None = None,
+    progress: Callable[[CorpusProgress], None] | None = None,
+) -> CorpusEstimate:
+    """
+    Projects input/output cost for every model in `pricing`.
+
+    Args:
+        paths: Files or directories (searched recursively)
+        pricing: {model: {"input": usd_per_1m, "output": usd_per_1m}}
+        output_tokens_per_document: Expected output tokens per document
+        encodings: tiktoken encoding per model (default: cl100k_base for all);
+            each distinct encoding is counted once
+        text_field: JSONL field holding the text
+        chunk_chars: Characters per chunk sent to a worker
+        workers: Worker processes (default: CPU count; 0 counts in-process)
+        progress: Called with a CorpusProgress after every chunk
+
+    Memory use is about chunk_chars * 2 * workers characters in flight.
+    """
+    files = _corpus_files(paths)
+    model_encodings = {model: (encodings or {}).get(model, DEFAULT_ENCODING) for model in pricing}
+    distinct = tuple(dict.fromkeys(model_encodings.values()))
+    estimate = CorpusEstimate(files=len(files), tokens=dict.fromkeys(distinct, 0))
+    bytes_total = sum(path.stat().st_size for path in files)
+
+    def record(meta: tuple[int, int, int], totals: dict[str, int]):
+        size, documents, characters = meta
+        estimate.bytes += size
+        estimate.documents += documents
+        estimate.characters += characters
+        for encoding, count in totals.items():
+            estimate.tokens[encoding] += count
+        if progress is not None:
+            progress(CorpusProgress(estimate.bytes, bytes_total, estimate.documents, estimate.tokens[distinct[0]]))
+
+    chunks = _chunks(files, text_field, chunk_chars)
+    if workers == 0:
+        for texts, *meta in chunks:
+            record(meta, _count_chunk(texts, distinct, num_threads=os.cpu_count() or 1))
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: dict[Future, tuple[int, int, int]] = {}
+            for texts, *meta in chunks:
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(pending.pop(future), future.result())
+                pending[pool.submit(_count_chunk, texts, distinct)] = tuple(meta)
+            for future in list(pending):
+                record(pending.pop(future), future.result())
+
+    output_tokens = estimate.documents * output_tokens_per_document
+    estimate.costs = [
+        _price(model, prices, estimate.tokens[model_encodings[model]], output_tokens)
+        for model, prices in pricing.items()
+    ]
+    return estimate
+
+
+def format_estimate(estimate: CorpusEstimate) -> str:
+    lines = [
+        f"{estimate.files:,} files, {estimate.documents:,} documents, "
+        f"{estimate.bytes / 1e6:,.1f} MB, {estimate.characters:,} characters",
+        "",
+        f"{'Model':<20} {'Input tok':>14} {'Output tok':>14} {'Input $':>12} {'Output $':>12} {'Total $':>12}",
+        "-" * 89,
+    ]
+    for row in sorted(estimate.costs, key=lambda r: r["total_cost"]):
+        lines.append(
+            f"{row['model']:<20} {row['input_tokens']:>14,} {row['output_tokens']:>14,} "
+            f"{row['input_cost']:>12,.2f} {row['output_cost']:>12,.2f} {row['total_cost']:>12,.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project API cost for a corpus before running a job")
+    parser.add_argument("paths", nargs="+", help="Text/JSONL files or directories")
+    parser.add_argument("--field", default="text", help="JSONL field holding the text")
+    parser.add_argument("--output-tokens", type=int, default=500, help="Expected output tokens per document")
+    parser.add_argument("--pricing", help="JSON file with {model: {input, output}} (default: lab table)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-chars", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pricing = DEFAULT_PRICING
+    if args.pricing:
+        pricing = json.loads(Path(args.pricing).read_text(encoding="utf-8"))
+
+    estimate = estimate_corpus_cost(
+        args.paths,
+        pricing,
+        output_tokens_per_document=args.output_tokens,
+        text_field=args.field,
+        chunk_chars=args.chunk_chars,
+        workers=args.workers,
+        progress=lambda p: print(f"\r{p}", end="", flush=True),
+    )
+    print("\n")
+    print(format_estimate(estimate))
+
+
+if __name__ == "__main__":
+    main()
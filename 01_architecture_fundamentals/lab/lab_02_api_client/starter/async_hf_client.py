@@ -0,0 +1,344 @@
+"""
+Lab 2 — Extension: Async Client with Bounded Fan-out
+
+asyncio counterpart to HuggingFaceClient for bulk work. The retry semantics
+match query(): 503 waits for the cold start, 429 and timeouts back off with
+jitter under the token's shared rate limiter and retry budget. query_many()
+keeps a bounded number of requests in flight and yields results as they
+complete.
+"""
+
+import asyncio
+from typing import AsyncIterator, Iterable
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from hf_client import JSON_HEADERS, HuggingFaceClient, estimated_load_time, get_api_token
+from model_readiness import ReadinessTracker
+from serialization import Serializer, get_serializer
+from streaming import AsyncTokenStream, StreamStats
+from rate_limit import (
+    AdaptiveRateLimiter,
+    RetryBudget,
+    jittered_backoff,
+    parse_retry_after,
+    shared_throttle,
+)
+
+
+class AsyncHuggingFaceClient:
+    """
+    Async client for the Hugging Face Inference API.
+
+    Per-model concurrency caps are shared by every query_many() call on the
+    same client, so two bulk jobs against one model cannot exceed its cap.
+    """
+
+    BASE_URL = HuggingFaceClient.BASE_URL
+
+    def __init__(
+        self,
+        token: str,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        model_concurrency: dict[str, int] | None = None,
+        default_model_concurrency: int | None = None,
+        base_url: str | None = None,
+        timeout: float = 120,
+        readiness: ReadinessTracker | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        retry_budget: RetryBudget | None = None,
+        serializer: str | Serializer = "auto",
+    ):
+        """
+        Args:
+            token: Hugging Face API token
+            max_retries: Attempts per query before giving up
+            retry_delay: Base delay (seconds) for retry backoff
+            max_connections: Hard limit on open connections
+            max_keepalive_connections: Idle connections kept for reuse
+            model_concurrency: Max in-flight requests per model ID
+            default_model_concurrency: Cap for models not listed above
+                (None means no per-model cap)
+            base_url: Override the Inference API URL (e.g. a local stub)
+            timeout: Per-request timeout in seconds
+            readiness: Tracker to record cold-start state in (shared with
+                the sync client when built via from_client)
+            rate_limiter: Throttle to use instead of the token's shared one
+            retry_budget: Retry budget to use instead of the token's shared one
+            serializer: JSON codec for request and response bodies
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.base_url = base_url or self.BASE_URL
+        self.serializer = get_serializer(serializer)
+        self.model_concurrency = dict(model_concurrency or {})
+        self.default_model_concurrency = default_model_concurrency
+        self._model_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.readiness = readiness or ReadinessTracker()
+        shared_limiter, shared_budget = shared_throttle(token)
+        self.rate_limiter = rate_limiter or shared_limiter
+        self.retry_budget = retry_budget or shared_budget
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {token}"},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=timeout,
+        )
+
+    @classmethod
+    def from_client(cls, client: HuggingFaceClient, **kwargs) -> "AsyncHuggingFaceClient":
+        """Builds an async client with the same token and retry settings."""
+        kwargs.setdefault("max_retries", client.max_retries)
+        kwargs.setdefault("retry_delay", client.retry_delay)
+        kwargs.setdefault("base_url", client.base_url)
+        kwargs.setdefault("readiness", client.readiness)
+        kwargs.setdefault("rate_limiter", client.rate_limiter)
+        kwargs.setdefault("retry_budget", client.retry_budget)
+        kwargs.setdefault("serializer", client.serializer)
+        return cls(client.token, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def query(self, model_id: str, payload: dict) -> dict:
+        """
+        Query a model with automatic retry logic.
+
+        Handles:
+        - 503: Model loading (cold start) — waits and retries
+        - 429: Rate limited — backs off exponentially
+        - Timeout — retries with delay
+        """
+        response = await self._send(model_id, payload)
+        return self.serializer.loads(response.content)
+
+    async def _send(self, model_id: str, payload: dict, stream: bool = False) -> httpx.Response:
+        """The retry loop behind query(); returns the first 200 response."""
+        url = f"{self.base_url}{model_id}"
+        body = self.serializer.dumps(payload)
+        response = None
+        self.retry_budget.record_request()
+
+        async with self._model_slot(model_id):
+            for attempt in range(self.max_retries):
+                await self.rate_limiter.acquire_async()
+                try:
+                    request = self._client.build_request("POST", url, content=body, headers=JSON_HEADERS)
+                    response = await self._client.send(request, stream=stream)
+
+                    if response.status_code == 200:
+                        self.rate_limiter.on_success()
+                        self.readiness.mark_ready(model_id)
+                        return response
+
+                    if stream:
+                        await response.aread()  # Error bodies are small — read them
+
+                    if response.status_code == 503:
+                        estimated_time = estimated_load_time(response)
+                        self.readiness.mark_loading(model_id, estimated_time)
+                        print(f"Model loading... waiting {estimated_time:.0f}s (attempt {attempt + 1})")
+                        await asyncio.sleep(min(estimated_time, 60))
+                        continue
+
+                    if response.status_code == 429:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        self.rate_limiter.on_throttle(retry_after)
+                        if attempt == self.max_retries - 1 or not self.retry_budget.try_retry():
+                            break
+                        wait_time = retry_after or jittered_backoff(self.retry_delay, attempt)
+                        print(f"Rate limited. Waiting {wait_time:.1f}s before retry...")
+                        await asyncio.sleep(wait_time)
+                        continue
+
+                    # Other errors — raise immediately
+                    response.raise_for_status()
+
+                except httpx.TimeoutException:
+                    print(f"Request timed out (attempt {attempt + 1}/{self.max_retries})")
+                    if attempt < self.max_retries - 1 and self.retry_budget.try_retry():
+                        await asyncio.sleep(jittered_backoff(self.retry_delay, attempt))
+                        continue
+                    raise
+
+        raise RuntimeError(
+            f"Failed after {self.max_retries} attempts. "
+            f"Last status: {response.status_code if response is not None else 'N/A'}, "
+            f"Body: {response.text[:200] if response is not None else 'No response received'}"
+        )
+
+    async def query_many(
+        self,
+        model_id: str,
+        payloads: Iterable[dict],
+        concurrency: int = 8,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[tuple[int, dict]]:
+        """
+        Query many payloads, yielding (index, result) in completion order.
+
+        At most `concurrency` requests are in flight (further capped by the
+        per-model semaphore), and payloads are consumed lazily, so a
+        50k-item iterable never becomes 50k tasks.
+
+        Args:
+            model_id: The model to query
+            payloads: Request bodies (any iterable)
+            concurrency: Max in-flight requests for this call
+            return_exceptions: Yield failures as (index, exception) instead
+                of raising on the first one
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        pending: set[asyncio.Task] = set()
+        payload_iter = iter(enumerate(payloads))
+
+        async def run_one(index: int, payload: dict):
+            try:
+                return index, await self.query(model_id, payload)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return index, e
+
+        def fill():
+            while len(pending) < concurrency:
+                item = next(payload_iter, None)
+                if item is None:
+                    return
+                pending.add(asyncio.create_task(run_one(*item)))
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                fill()
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _model_slot(self, model_id: str) -> asyncio.Semaphore:
+        """Returns the shared per-model semaphore (or a no-op if uncapped)."""
+        limit = self.model_concurrency.get(model_id, self.default_model_concurrency)
+        if limit is None:
+            return _NO_LIMIT
+        if model_id not in self._model_semaphores:
+            self._model_semaphores[model_id] = asyncio.Semaphore(limit)
+        return self._model_semaphores[model_id]
+
+    # --- Helper methods ---
+
+    async def text_generation(
+        self, prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3"
+    ) -> str:
+        """Generate text from a prompt."""
+        result = await self.query(
+            model,
+            {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": 200,
+                    "temperature": 0.7,
+                    "return_full_text": False,
+                },
+            },
+        )
+        return result[0]["generated_text"]
+
+    async def text_generation_stream(
+        self,
+        prompt: str,
+        model: str = "mistralai/Mistral-7B-Instruct-v0.3",
+        max_new_tokens: int = 200,
+        temperature: float = 0.7,
+    ) -> AsyncTokenStream:
+        """
+        Stream generated tokens as they are produced.
+
+        `async for` over the returned AsyncTokenStream for token texts; its
+        .stats holds time-to-first-token and inter-token latencies.
+        """
+        stats = StreamStats()
+        response = await self._send(
+            model,
+            {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": max_new_tokens,
+                    "temperature": temperature,
+                    "return_full_text": False,
+                },
+                "stream": True,
+            },
+            stream=True,
+        )
+        response.encoding = "utf-8"  # SSE is always UTF-8, whatever the client default
+        return AsyncTokenStream(response.aiter_lines(), stats, aclose=response.aclose)
+
+    async def summarization(
+        self, text: str, model: str = "facebook/bart-large-cnn"
+    ) -> str:
+        """Summarize a long text into a shorter version."""
+        result = await self.query(
+            model,
+            {"inputs": text, "parameters": {"max_length": 130, "min_length": 30}},
+        )
+        return result[0]["summary_text"]
+
+    async def text_classification(
+        self, text: str, model: str = "distilbert-base-uncased-finetuned-sst-2-english"
+    ) -> list:
+        """Classify text sentiment or category."""
+        return await self.query(model, {"inputs": text})
+
+
+class _NoLimit:
+    """Async context manager that never blocks."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NO_LIMIT = _NoLimit()
+
+
+# --- Main: classify a batch of texts concurrently ---
+if __name__ == "__main__":
+    texts = [
+        "This product is amazing and exceeded my expectations!",
+        "Terrible support, I want a refund.",
+        "It works, nothing special.",
+    ]
+
+    async def main():
+        async with AsyncHuggingFaceClient(token=get_api_token()) as client:
+            payloads = [{"inputs": text} for text in texts]
+            async for index, result in client.query_many(
+                "distilbert-base-uncased-finetuned-sst-2-english", payloads, concurrency=4
+            ):
+                print(f"[{index}] {texts[index][:40]!r} -> {result}")
+
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Benchmark: one request per text vs. packed `inputs` batches.
+
+Runs against the local stub server, so no token or network is needed:
+
+    python starter/bench_batching.py --texts 3200 --batch-size 32
+    python starter/bench_batching.py --server-max-batch 10   # exercise split-and-retry
+"""
+
+import argparse
+import time
+
+from hf_client import HuggingFaceClient
+from stub_server import StubHandler, StubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=3200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument(
+        "--server-max-batch", type=int, default=None,
+        help="Stub rejects larger batches with 413",
+    )
+    args = parser.parse_args()
+
+    texts = [f"Review #{i}: the product works as advertised." for i in range(args.texts)]
+
+    class Handler(StubHandler):
+        max_batch_size = args.server_max_batch
+
+    with StubServer(handler=Handler) as server:
+        with HuggingFaceClient(token="hf_benchmark", base_url=server.base_url) as client:
+            start = time.perf_counter()
+            single = [client.text_classification(text) for text in texts]
+            single_s = time.perf_counter() - start
+            single_requests = client.pool_stats().requests
+
+        with HuggingFaceClient(token="hf_benchmark", base_url=server.base_url) as client:
+            start = time.perf_counter()
+            batched = client.text_classification_batch(texts, batch_size=args.batch_size)
+            batched_s = time.perf_counter() - start
+            batched_requests = client.pool_stats().requests
+
+    assert len(batched) == len(single) == len(texts)
+
+    print(f"{'Mode':<10} {'Requests':>10} {'Seconds':>10}")
+    print("-" * 32)
+    print(f"{'single':<10} {single_requests:>10} {single_s:>10.2f}")
+    print(f"{'batched':<10} {batched_requests:>10} {batched_s:>10.2f}")
+    print(f"\nRequest reduction: {single_requests / batched_requests:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
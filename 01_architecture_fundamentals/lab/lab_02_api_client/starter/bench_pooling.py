@@ -0,0 +1,65 @@
+"""
+Benchmark: pooled keep-alive session vs. a fresh connection per request.
+
+Runs against the local stub server, so no token or network is needed:
+
+    python starter/bench_pooling.py --requests 2000
+
+Against the real API the gap is wider still — each new connection there
+also pays a TLS handshake, which the local stub does not simulate.
+"""
+
+import argparse
+import time
+
+import requests
+
+from hf_client import HuggingFaceClient
+from stub_server import StubServer
+
+MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+PAYLOAD = {"inputs": "This product is amazing!"}
+
+
+def run_unpooled(base_url: str, n: int) -> float:
+    """The old behaviour: module-level requests.post, one connection per call."""
+    headers = {"Authorization": "Bearer hf_benchmark"}
+    start = time.perf_counter()
+    for _ in range(n):
+        response = requests.post(f"{base_url}{MODEL_ID}", headers=headers, json=PAYLOAD, timeout=10)
+        response.raise_for_status()
+    return n / (time.perf_counter() - start)
+
+
+def run_pooled(client: HuggingFaceClient, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        client.text_classification(PAYLOAD["inputs"], model=MODEL_ID)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        unpooled_rps = run_unpooled(server.base_url, args.requests)
+
+        with HuggingFaceClient(token="hf_benchmark", base_url=server.base_url) as client:
+            pooled_rps = run_pooled(client, args.requests)
+            stats = client.pool_stats()
+
+    print(f"{'Mode':<12} {'req/s':>10}")
+    print("-" * 24)
+    print(f"{'unpooled':<12} {unpooled_rps:>10.0f}")
+    print(f"{'pooled':<12} {pooled_rps:>10.0f}")
+    print(f"\nSpeedup: {pooled_rps / unpooled_rps:.2f}x")
+    print(
+        f"Pool: {stats.requests} requests, {stats.hits} hits, "
+        f"{stats.misses} misses (hit rate {stats.hit_rate:.1%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: cache key generation, cache reads and cache writes per serializer.
+
+Uses a summarization-sized request and response; no network is needed:
+
+    python starter/bench_serialization.py --input-kb 32 --output-kb 8
+"""
+
+import argparse
+import hashlib
+import json
+import tempfile
+import time
+
+from cache_backends import ShardedDirectoryBackend
+from cache_tiers import DiskTier
+from serialization import JSONSerializer, MsgspecSerializer, OrjsonSerializer, canonical_key
+
+
+def timeit(fn, repeat: int) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def legacy_key(model_id: str, payload: dict) -> str:
+    """The previous scheme: one sorted json.dumps of the whole request."""
+    content = json.dumps({"model": model_id, "payload": payload}, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def available_serializers():
+    serializers = [JSONSerializer()]
+    for cls in (OrjsonSerializer, MsgspecSerializer):
+        try:
+            serializers.append(cls())
+        except ImportError:
+            print(f"(skipping {cls.name}: not installed)")
+    return serializers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-kb", type=int, default=32, help="Size of the prompt")
+    parser.add_argument("--output-kb", type=int, default=8, help="Size of the response")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    model_id = "facebook/bart-large-cnn"
+    sentence = "Retrieval-augmented generation grounds answers in documents — «précis» ✓. "
+    payload = {
+        "inputs": sentence * (args.input_kb * 1024 // len(sentence)),
+        "parameters": {"max_length": 150, "min_length": 30},
+    }
+    response = [{"summary_text": sentence * (args.output_kb * 1024 // len(sentence))}]
+    raw_body = json.dumps(response).encode()  # What the API sends back
+
+    print(f"Request ~{args.input_kb} KiB, response ~{args.output_kb} KiB, {args.repeat} iterations\n")
+
+    print(f"{'Key generation':<28} {'µs/call':>10}")
+    print("-" * 40)
+    print(f"{'json.dumps(sort_keys) + sha256':<28} {timeit(lambda: legacy_key(model_id, payload), args.repeat):>10.1f}")
+    print(f"{'canonical_key':<28} {timeit(lambda: canonical_key(model_id, payload), args.repeat):>10.1f}")
+
+    print(f"\n{'Serializer':<10} {'decode':>10} {'write':>10} {'write raw':>10} {'read':>10}   (µs/call)")
+    print("-" * 56)
+    for serializer in available_serializers():
+        with tempfile.TemporaryDirectory() as tmp:
+            tier = DiskTier(ShardedDirectoryBackend(tmp), serializer=serializer)
+            key = canonical_key(model_id, payload)
+            decode_us = timeit(lambda: serializer.loads(raw_body), args.repeat)
+            write_us = timeit(lambda: tier.set(key, response), args.repeat // 10)
+            raw_us = timeit(lambda: tier.set(key, response, raw_body), args.repeat // 10)
+            read_us = timeit(lambda: tier.get(key), args.repeat // 10)
+            tier.close()
+        print(f"{serializer.name:<10} {decode_us:>10.1f} {write_us:>10.1f} {raw_us:>10.1f} {read_us:>10.1f}")
+
+    print("\nwrite = re-encode the decoded response; write raw = store the API bytes as-is.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: time-to-first-token, blocking vs. streamed generation.
+
+Runs against the local stub server's SSE endpoint, so no token or network
+is needed:
+
+    python starter/bench_streaming.py --token-delay 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+from async_hf_client import AsyncHuggingFaceClient
+from hf_client import HuggingFaceClient
+from stub_server import StubHandler, StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+PROMPT = "Retrieval augmented generation grounds answers in documents fetched at query time"
+NON_ASCII_PROMPT = "café 日本 naïve — ✓"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Stub delay per token (s)")
+    args = parser.parse_args()
+
+    class Handler(StubHandler):
+        stream_token_delay = args.token_delay
+
+    with StubServer(handler=Handler) as server:
+        with HuggingFaceClient(token="hf_benchmark", base_url=server.base_url) as client:
+            # Blocking: the first token is visible only when the whole response is
+            start = time.perf_counter()
+            text = "".join(client.text_generation_stream(PROMPT, model=MODEL_ID))
+            blocking_s = time.perf_counter() - start
+
+            stream = client.text_generation_stream(PROMPT, model=MODEL_ID)
+            tokens = list(stream)
+            sync_stats = stream.stats
+
+            # Tokens must arrive as UTF-8 text, not mojibake
+            non_ascii = "".join(client.text_generation_stream(NON_ASCII_PROMPT, model=MODEL_ID))
+
+        async def run_async():
+            async with AsyncHuggingFaceClient(token="hf_benchmark", base_url=server.base_url) as aclient:
+                astream = await aclient.text_generation_stream(PROMPT, model=MODEL_ID)
+                async for _token in astream:
+                    pass
+                return astream.stats
+
+        async_stats = asyncio.run(run_async())
+
+    assert "".join(tokens) == text == sync_stats.generated_text
+    assert non_ascii == f"Echo: {NON_ASCII_PROMPT}", non_ascii
+
+    print(f"Tokens: {sync_stats.tokens}")
+    print(f"{'Mode':<16} {'TTFT (ms)':>10} {'ITL (ms)':>10} {'tok/s':>8}")
+    print("-" * 47)
+    print(f"{'blocking':<16} {blocking_s * 1000:>10.1f} {'-':>10} {'-':>8}")
+    for name, stats in (("stream (sync)", sync_stats), ("stream (async)", async_stats)):
+        print(
+            f"{name:<16} {stats.time_to_first_token * 1000:>10.1f} "
+            f"{stats.mean_inter_token_latency * 1000:>10.1f} {stats.tokens_per_second:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
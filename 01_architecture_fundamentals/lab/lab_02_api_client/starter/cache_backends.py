@@ -0,0 +1,318 @@
+"""
+Lab 2 — Extension: Cache Storage Backends
+
+Where DiskTier keeps its bytes. Two backends are provided:
+
+- ShardedDirectoryBackend: one file per key under <dir>/<key[:2]>/
+- SQLiteBackend: a single indexed file in WAL mode, with optional gzip or
+  zstd compression of response bodies. One file is cheap to rsync between
+  CI machines, and every write is an atomic transaction.
+
+Command line:
+    python cache_backends.py migrate .cache/hf_responses .cache/hf_responses.db --compression gzip
+    python cache_backends.py compact .cache/hf_responses.db
+    python cache_backends.py stats .cache/hf_responses.db
+"""
+
+import argparse
+import gzip
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+
+class CacheBackend(ABC):
+    """
+    Key -> bytes storage used by DiskTier. Backends only store and list;
+    eviction, TTL and (de)serialization stay in the tier.
+    """
+
+    @abstractmethod
+    def read(self, key: str) -> bytes | None:
+        """Returns the stored bytes, or None if the key is absent."""
+        pass
+
+    @abstractmethod
+    def write(self, key: str, data: bytes, created_at: float | None = None) -> int:
+        """Stores data atomically; returns the bytes used on storage."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def scan(self) -> Iterator[tuple[str, int, float]]:
+        """Yields (key, stored_size, created_at) for every entry. Read-only."""
+        pass
+
+    def migrate_layout(self) -> int:
+        """Upgrades an older on-disk layout in place; returns entries moved."""
+        return 0
+
+    def close(self):
+        pass
+
+
+class ShardedDirectoryBackend(CacheBackend):
+    """
+    One JSON file per key at <directory>/<key[:2]>/<key>.json. Files from the
+    old flat layout (<directory>/<key>.json) are still read and listed;
+    migrate_layout() moves them into shards.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _flat_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def read(self, key: str) -> bytes | None:
+        for path in (self._path(key), self._flat_path(key)):
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def write(self, key: str, data: bytes, created_at: float | None = None) -> int:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_bytes(data)
+        if created_at is not None:
+            os.utime(tmp, (created_at, created_at))
+        os.replace(tmp, path)
+        return len(data)
+
+    def delete(self, key: str):
+        for path in (self._path(key), self._flat_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _stat(self, path: str) -> os.stat_result | None:
+        try:
+            return os.stat(path)
+        except FileNotFoundError:  # Removed since it was listed
+            return None
+
+    def scan(self) -> Iterator[tuple[str, int, float]]:
+        """
+        Read-only. Lists the directory before yielding anything and reports
+        each key once; a key in both layouts is reported by its shard copy,
+        which is the one read() returns.
+        """
+        items = list(os.scandir(self.directory))
+        seen = set()
+        for item in items:
+            if item.is_dir() and len(item.name) == 2:
+                for shard_item in list(os.scandir(item.path)):
+                    key = shard_item.name[:-5]
+                    if not shard_item.name.endswith(".json") or key in seen:
+                        continue
+                    stat = self._stat(shard_item.path)
+                    if stat is not None:
+                        seen.add(key)
+                        yield key, stat.st_size, stat.st_mtime
+        for item in items:
+            key = item.name[:-5]
+            if item.is_file() and item.name.endswith(".json") and key not in seen:
+                stat = self._stat(item.path)
+                if stat is not None:
+                    seen.add(key)
+                    yield key, stat.st_size, stat.st_mtime
+
+    def migrate_layout(self) -> int:
+        """
+        Moves flat-layout files into their shards; returns how many moved.
+        A flat file whose key already has a shard copy is stale and removed.
+        """
+        moved = 0
+        for item in list(os.scandir(self.directory)):
+            if not (item.is_file() and item.name.endswith(".json")):
+                continue
+            target = self._path(item.name[:-5])
+            if target.exists():
+                os.unlink(item.path)
+                continue
+            target.parent.mkdir(exist_ok=True)
+            os.replace(item.path, target)
+            moved += 1
+        return moved
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Single-file store: one row per key in an indexed SQLite table, written
+    through the write-ahead log. The codec is stored per row, so changing
+    `compression` never invalidates existing entries.
+    """
+
+    def __init__(self, path: str | Path, compression: str = "none", level: int | None = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {COMPRESSIONS}, got {compression!r}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires: pip install zstandard")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.level = level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " codec TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+
+    def _encode(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level or 6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(data)
+        return data
+
+    @staticmethod
+    def _decode(codec: str, body: bytes) -> bytes:
+        if codec == "gzip":
+            return gzip.decompress(body)
+        if codec == "zstd":
+            if zstandard is None:
+                raise ImportError("Entry is zstd-compressed: pip install zstandard")
+            return zstandard.ZstdDecompressor().decompress(body)
+        return body
+
+    def read(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else self._decode(row[0], row[1])
+
+    def write(self, key: str, data: bytes, created_at: float | None = None) -> int:
+        body = self._encode(data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, codec, body, created_at) VALUES (?, ?, ?, ?)",
+                (key, self.compression, body, time.time() if created_at is None else created_at),
+            )
+        return len(body)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def scan(self) -> Iterator[tuple[str, int, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, length(body), created_at FROM responses"
+            ).fetchall()
+        yield from rows
+
+    def compact(self, max_age: float | None = None) -> dict:
+        """
+        Drops entries older than max_age seconds (if given), rebuilds the
+        file to release free pages and folds the WAL back into it.
+        """
+        size_before = self.file_size()
+        with self._lock:
+            removed = 0
+            if max_age is not None:
+                removed = self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - max_age,)
+                ).rowcount
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"removed": removed, "bytes_before": size_before, "bytes_after": self.file_size()}
+
+    def file_size(self) -> int:
+        """Bytes on disk, including the write-ahead log."""
+        wal = self.path.with_name(self.path.name + "-wal")
+        return sum(p.stat().st_size for p in (self.path, wal) if p.exists())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_directory(source_dir: str | Path, target: CacheBackend, remove: bool = False) -> int:
+    """
+    One-time copy of a <sha256>.json cache directory (flat or sharded) into
+    another backend. Returns the number of entries migrated. The source is
+    only modified when `remove` is set.
+    """
+    source = ShardedDirectoryBackend(source_dir)
+    migrated = 0
+    for key, _size, created_at in source.scan():
+        data = source.read(key)
+        if data is None:
+            continue
+        target.write(key, data, created_at)
+        migrated += 1
+        if remove:
+            source.delete(key)
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the HF response cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Copy a JSON cache directory into a SQLite file")
+    migrate.add_argument("source_dir")
+    migrate.add_argument("db_path")
+    migrate.add_argument("--compression", choices=COMPRESSIONS, default="none")
+    migrate.add_argument("--remove", action="store_true", help="Delete source files after copying")
+
+    compact = commands.add_parser("compact", help="Checkpoint and vacuum a SQLite cache")
+    compact.add_argument("db_path")
+    compact.add_argument("--max-age", type=float, default=None, help="Also drop entries older than this (seconds)")
+
+    stats = commands.add_parser("stats", help="Show entry count and size")
+    stats.add_argument("db_path")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        backend = SQLiteBackend(args.db_path, compression=args.compression)
+        count = migrate_directory(args.source_dir, backend, remove=args.remove)
+        backend.compact()
+        print(f"Migrated {count} entries into {args.db_path} ({backend.file_size():,} bytes)")
+    elif args.command == "compact":
+        backend = SQLiteBackend(args.db_path)
+        result = backend.compact(max_age=args.max_age)
+        print(
+            f"Removed {result['removed']} entries; "
+            f"{result['bytes_before']:,} -> {result['bytes_after']:,} bytes"
+        )
+    else:
+        backend = SQLiteBackend(args.db_path)
+        entries = list(backend.scan())
+        print(f"{len(entries)} entries, {sum(size for _, size, _ in entries):,} bytes of bodies, "
+              f"{backend.file_size():,} bytes on disk")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
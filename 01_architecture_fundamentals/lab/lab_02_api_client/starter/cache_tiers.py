@@ -0,0 +1,315 @@
+"""
+Lab 2 — Extension: Tiered Response Cache
+
+An in-process memory tier in front of a size-bounded disk tier. Both tiers
+enforce max-entries / max-bytes limits with LRU or LFU eviction, and the
+cache as a whole applies a TTL with an optional stale-while-revalidate
+window.
+
+The disk tier stores bytes through a pluggable CacheBackend (see
+cache_backends.py): a sharded JSON directory by default, or a single
+SQLite file.
+"""
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from cache_backends import CacheBackend, ShardedDirectoryBackend
+from serialization import Serializer, get_serializer
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+@dataclass
+class CacheStats:
+    """Counters for one tier (or the whole cache)."""
+
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """Bookkeeping for one cached response."""
+
+    size: int
+    created_at: float
+    access_count: int = 0
+    value: Any = field(default=None, repr=False)
+
+
+class _BoundedTier:
+    """
+    Shared LRU/LFU bookkeeping. Entries live in an OrderedDict whose order
+    is recency of use; subclasses decide where values are stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        policy: str = "lru",
+    ):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"policy must be one of {EVICTION_POLICIES}, got {policy!r}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.stats = CacheStats()
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _touch(self, key: str, entry: CacheEntry):
+        entry.access_count += 1
+        self._entries.move_to_end(key)
+
+    def _add(self, key: str, entry: CacheEntry):
+        replaced = self._entries.pop(key, None)
+        if replaced is not None:
+            # Overwrite in place — storage already holds the new value
+            self.total_bytes -= replaced.size
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        self._evict_over_limit(protect=key)
+
+    def _remove(self, key: str) -> CacheEntry | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+            self._discard(key)
+        return entry
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def _victim(self, protect: str) -> str | None:
+        candidates = (k for k in self._entries if k != protect)
+        if self.policy == "lru":
+            return next(candidates, None)
+        # LFU: least used wins; iteration order breaks ties by recency
+        return min(candidates, key=lambda k: self._entries[k].access_count, default=None)
+
+    def _evict_over_limit(self, protect: str):
+        while self._over_limit():
+            victim = self._victim(protect)
+            if victim is None:
+                break
+            self._remove(victim)
+            self.stats.evictions += 1
+
+    def _discard(self, key: str):
+        """Hook: release storage for an evicted or expired key."""
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+
+class MemoryTier(_BoundedTier):
+    """In-process LRU/LFU tier holding parsed responses."""
+
+    def __init__(
+        self,
+        max_entries: int | None = 1024,
+        max_bytes: int | None = 64 * 1024 * 1024,
+        policy: str = "lru",
+    ):
+        super().__init__(max_entries, max_bytes, policy)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._touch(key, entry)
+            self.stats.hits += 1
+            return entry
+
+    def set(self, key: str, value: Any, size: int, created_at: float | None = None):
+        with self._lock:
+            created_at = time.time() if created_at is None else created_at
+            self._add(key, CacheEntry(size=size, created_at=created_at, value=value))
+            self.stats.writes += 1
+
+
+class DiskTier(_BoundedTier):
+    """
+    Size-bounded tier over a CacheBackend. At startup the backend's layout
+    is migrated once, then the index (size, age, use counts) is rebuilt
+    from backend.scan(), so a miss never touches storage. Values are
+    encoded with `serializer` (see serialization.py).
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | str | Path,
+        max_entries: int | None = None,
+        max_bytes: int | None = 256 * 1024 * 1024,
+        policy: str = "lru",
+        serializer: str | Serializer = "auto",
+    ):
+        super().__init__(max_entries, max_bytes, policy)
+        self.serializer = get_serializer(serializer)
+        if not isinstance(backend, CacheBackend):
+            backend = ShardedDirectoryBackend(backend)
+        self.backend = backend
+        self.backend.migrate_layout()
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Index existing entries oldest-first, evicting if over the limits.
+        Runs after migrate_layout(), so storage is not changing underneath.
+        """
+        for key, size, created_at in sorted(self.backend.scan(), key=lambda e: e[2]):
+            self._entries[key] = CacheEntry(size=size, created_at=created_at)
+            self.total_bytes += size
+        self._evict_over_limit(protect="")
+
+    def get(self, key: str) -> tuple[Any, CacheEntry] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            try:
+                data = self.backend.read(key)
+                value = self.serializer.loads(data) if data is not None else None
+            except (OSError, EOFError, ValueError, zlib.error):
+                data = None
+            if data is None:
+                # Deleted or corrupted behind our back — forget it
+                self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._touch(key, entry)
+            self.stats.hits += 1
+            return value, entry
+
+    def set(self, key: str, value: Any, data: bytes | None = None) -> int:
+        """
+        Writes value through the backend; returns its serialized size.
+        Pass `data` when the encoded bytes are already at hand (e.g. the raw
+        response body) to skip re-encoding.
+        """
+        if data is None:
+            data = self.serializer.dumps(value)
+        stored = self.backend.write(key, data)
+        with self._lock:
+            self._add(key, CacheEntry(size=stored, created_at=time.time()))
+            self.stats.writes += 1
+        return len(data)
+
+    def _discard(self, key: str):
+        self.backend.delete(key)
+
+    def close(self):
+        self.backend.close()
+
+
+class TieredCache:
+    """
+    Memory tier in front of a disk tier.
+
+    get() returns (value, FRESH | STALE) or (None, None). An entry older
+    than `ttl` is STALE for a further `stale_ttl` seconds — callers may
+    serve it while refreshing — and is deleted after that.
+    """
+
+    def __init__(
+        self,
+        memory: MemoryTier,
+        disk: DiskTier,
+        ttl: float | None = None,
+        stale_ttl: float = 0.0,
+    ):
+        self.memory = memory
+        self.disk = disk
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+
+    def _freshness(self, created_at: float) -> str | None:
+        if self.ttl is None:
+            return FRESH
+        age = time.time() - created_at
+        if age <= self.ttl:
+            return FRESH
+        if age <= self.ttl + self.stale_ttl:
+            return STALE
+        return None
+
+    def get(self, key: str) -> tuple[Any, str | None]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            value, created_at, size = entry.value, entry.created_at, entry.size
+        else:
+            found = self.disk.get(key)
+            if found is None:
+                self.stats.misses += 1
+                return None, None
+            value, disk_entry = found
+            created_at, size = disk_entry.created_at, disk_entry.size
+            self.memory.set(key, value, size, created_at)
+
+        state = self._freshness(created_at)
+        if state is None:
+            self.delete(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None, None
+        if state == STALE:
+            self.stats.stale_hits += 1
+        self.stats.hits += 1
+        return value, state
+
+    def set(self, key: str, value: Any, data: bytes | None = None):
+        size = self.disk.set(key, value, data)
+        self.memory.set(key, value, size)
+        self.stats.writes += 1
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def close(self):
+        self.disk.close()
+
+    def summary(self) -> dict:
+        """Per-tier and overall counters, ready to print or log."""
+        return {
+            "overall": vars(self.stats) | {"hit_rate": self.stats.hit_rate},
+            "memory": vars(self.memory.stats) | {
+                "entries": len(self.memory), "bytes": self.memory.total_bytes,
+            },
+            "disk": vars(self.disk.stats) | {
+                "entries": len(self.disk), "bytes": self.disk.total_bytes,
+            },
+        }
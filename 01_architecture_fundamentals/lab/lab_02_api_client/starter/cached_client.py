@@ -5,12 +5,12 @@ Extends HuggingFaceClient with local caching to minimize API calls.
 Essential for development on free tier.
 
 The cache directory setup and key generation are complete.
-Complete the three TODOs in the query() method.
+query() checks the cache, calls the API on a miss, and writes the result
+back. Storage is tiered (memory + size-bounded disk) with eviction and TTL.
 """
 
-import hashlib
-import json
 import os
+import threading
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -19,61 +19,196 @@ load_dotenv()
 
 # Import the client you built in Step 3-4
 from hf_client import HuggingFaceClient, get_api_token
+from cache_backends import CacheBackend, ShardedDirectoryBackend, SQLiteBackend
+from cache_tiers import STALE, DiskTier, MemoryTier, TieredCache
+from semantic_cache import SemanticCache
+from serialization import canonical_key, legacy_key
+from singleflight import SingleFlight
 
 
 class CachedHFClient(HuggingFaceClient):
     """
     Extends HuggingFaceClient with local caching to minimize API calls.
+
+    Responses go through a memory tier backed by a size-bounded disk tier
+    (see cache_tiers.py). With a `ttl`, entries expire; with
+    `stale_while_revalidate`, an expired entry is still served for that many
+    extra seconds while a background thread refreshes it.
+
+    `cache_backend` selects disk storage: "directory" (one JSON file per
+    key under cache_dir), "sqlite" (single file at <cache_dir>.db) or any
+    CacheBackend instance.
+
+    Concurrent misses for the same key are coalesced: one thread calls the
+    API and the others wait for its result (see singleflight.py).
+
+    Responses are stored as the raw bytes the API returned, decoded once
+    with the client's serializer; keys come from canonical_key() (see
+    serialization.py). An entry written under the older legacy_key() is
+    still found, and moved to its canonical key on first use.
+
+    Pass a SemanticCache to also serve responses for prompts that are
+    similar, not just byte-identical (see semantic_cache.py).
     """
 
-    def __init__(self, token: str, cache_dir: str = ".cache/hf_responses"):
-        super().__init__(token)
+    def __init__(
+        self,
+        token: str,
+        cache_dir: str = ".cache/hf_responses",
+        ttl: float | None = None,
+        stale_while_revalidate: float = 0.0,
+        memory_max_entries: int | None = 1024,
+        memory_max_bytes: int | None = 64 * 1024 * 1024,
+        disk_max_entries: int | None = None,
+        disk_max_bytes: int | None = 256 * 1024 * 1024,
+        eviction: str = "lru",
+        cache_backend: str | CacheBackend = "directory",
+        cache_compression: str = "none",
+        semantic_cache: SemanticCache | None = None,
+        **client_kwargs,
+    ):
+        super().__init__(token, **client_kwargs)
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if cache_backend == "directory":
+            cache_backend = ShardedDirectoryBackend(self.cache_dir)
+        elif cache_backend == "sqlite":
+            cache_backend = SQLiteBackend(
+                self.cache_dir.with_name(self.cache_dir.name + ".db"),
+                compression=cache_compression,
+            )
+        elif not isinstance(cache_backend, CacheBackend):
+            raise ValueError(f"Unknown cache_backend: {cache_backend!r}")
+        self.cache = TieredCache(
+            MemoryTier(memory_max_entries, memory_max_bytes, eviction),
+            DiskTier(cache_backend, disk_max_entries, disk_max_bytes, eviction, self.serializer),
+            ttl=ttl,
+            stale_ttl=stale_while_revalidate,
+        )
+        self.semantic_cache = semantic_cache
+        self._flight = SingleFlight()
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
 
     def _cache_key(self, model_id: str, payload: dict) -> str:
         """Generate a unique cache key from the request."""
-        content = json.dumps({"model": model_id, "payload": payload}, sort_keys=True)
-        return hashlib.sha256(content.encode()).hexdigest()
+        return canonical_key(model_id, payload)
 
     def query(self, model_id: str, payload: dict, use_cache: bool = True) -> dict:
         """Query with optional local caching."""
         cache_key = self._cache_key(model_id, payload)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        # =================================================================
-        # TODO 1: Check cache — return cached response if available
-        #
-        # If use_cache is True AND cache_file.exists():
-        #   - Print "[Cache HIT] Using cached response"
-        #   - Read the file: cache_file.read_text(encoding="utf-8")
-        #   - Parse JSON and return it
-        # =================================================================
-
-        # Your code here (cache check)
-
-        # =================================================================
-        # TODO 2: Make the API call (cache miss)
-        #
-        # - Print "[Cache MISS] Calling API..."
-        # - Call the parent's query method: super().query(model_id, payload)
-        # - Store the result in a variable
-        # =================================================================
-
-        # Your code here (API call)
-        result = None  # Replace with: super().query(model_id, payload)
-
-        # =================================================================
-        # TODO 3: Write result to cache
-        #
-        # - Convert result to JSON string: json.dumps(result, ensure_ascii=False)
-        # - Write to cache_file: cache_file.write_text(..., encoding="utf-8")
-        # =================================================================
-
-        # Your code here (cache write)
 
+        if use_cache:
+            cached, state = self.cache.get(cache_key)
+            if state == STALE:
+                print("[Cache STALE] Using cached response, refreshing in background")
+                self._refresh_in_background(cache_key, model_id, payload)
+                return cached
+            if state is not None:
+                print("[Cache HIT] Using cached response")
+                return cached
+            cached = self._rekey_legacy_entry(cache_key, model_id, payload)
+            if cached is not None:
+                print("[Cache HIT] Using cached response (moved from legacy key)")
+                return cached
+            if self.semantic_cache is not None:
+                cached = self._semantic_lookup(model_id, payload)
+                if cached is not None:
+                    return cached
+
+        print("[Cache MISS] Calling API...")
+        result, shared = self._flight.do(
+            cache_key, lambda: self._load(cache_key, model_id, payload, use_cache)
+        )
+        if shared:
+            print("[Coalesced] Shared an identical in-flight request")
         return result
 
+    def _load(self, cache_key: str, model_id: str, payload: dict, use_cache: bool) -> dict:
+        """Flight body: a flight for this key may have filled the cache since our miss."""
+        if use_cache:
+            cached, state = self.cache.get(cache_key)
+            if state is not None:
+                return cached
+        return self._fetch_and_store(cache_key, model_id, payload)
+
+    def _rekey_legacy_entry(self, cache_key: str, model_id: str, payload: dict) -> dict | None:
+        """Serves an entry cached under legacy_key() and rewrites it under cache_key."""
+        old_key = legacy_key(model_id, payload)
+        if old_key == cache_key or old_key not in self.cache.disk:
+            return None
+        cached, state = self.cache.get(old_key)
+        if state is not None:
+            self.cache.set(cache_key, cached)
+        self.cache.delete(old_key)
+        return cached
+
+    def _fetch_and_store(self, cache_key: str, model_id: str, payload: dict) -> dict:
+        data = self._post(model_id, payload).content
+        result = self.serializer.loads(data)
+        self.cache.set(cache_key, result, data)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(model_id, payload, cache_key)
+        return result
+
+    def _semantic_lookup(self, model_id: str, payload: dict) -> dict | None:
+        match = self.semantic_cache.lookup(model_id, payload)
+        if match is None:
+            return None
+        cached, state = self.cache.get(match.key)
+        if state is None:
+            # Neighbour's response was evicted or expired
+            self.semantic_cache.discard(match)
+            return None
+        self.semantic_cache.record_hit(match)
+        print(f"[Semantic HIT] similarity {match.similarity:.3f} to: {match.prompt[:60]!r}")
+        return cached
+
+    def report_false_hit(self):
+        """Record that the last semantic hit served the wrong response."""
+        if self.semantic_cache is not None:
+            self.semantic_cache.report_false_hit()
+
+    def _refresh_in_background(self, cache_key: str, model_id: str, payload: dict):
+        """Re-fetch a stale entry once, however many callers hit it meanwhile."""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                self._flight.do(
+                    cache_key, lambda: self._fetch_and_store(cache_key, model_id, payload)
+                )
+            except Exception as e:
+                print(f"[Cache] Background refresh failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction counters for each cache tier, plus coalescing."""
+        stats = self.flight_stats()
+        summary = self.cache.summary() | {
+            "single_flight": vars(stats) | {"coalesce_rate": stats.coalesce_rate},
+        }
+        if self.semantic_cache is not None:
+            summary["semantic"] = self.semantic_cache.summary()
+        return summary
+
+    def flight_stats(self):
+        """
+        How many flights ran vs. were coalesced into one in flight. A flight
+        whose leader found the response already cached makes no upstream call.
+        """
+        return self._flight.stats
+
+    def close(self):
+        super().close()
+        self.cache.close()
+
 
 # --- Main: demonstrate cache behavior ---
 if __name__ == "__main__":
@@ -97,3 +232,5 @@ if __name__ == "__main__":
     result2 = client.query("mistralai/Mistral-7B-Instruct-v0.3", prompt_payload)
     if result2:
         print(result2[0]["generated_text"][:200])
+
+    print(f"\nCache stats: {client.cache_stats()}")
@@ -5,13 +5,32 @@ Step 3: Read the class structure — __init__ and helpers are complete.
 Step 4: Complete the three TODOs inside the query() method.
 """
 
+import asyncio
 import os
+import threading
 import time
+from dataclasses import dataclass
+
 import requests
 from dotenv import load_dotenv
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from model_readiness import READY, ModelStatus, ReadinessTracker
+from serialization import Serializer, get_serializer
+from streaming import StreamStats, TokenStream
+from rate_limit import (
+    AdaptiveRateLimiter,
+    RetryBudget,
+    jittered_backoff,
+    parse_retry_after,
+    shared_throttle,
+)
 
 load_dotenv()
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 def get_api_token():
     """Retrieve API token with validation."""
@@ -26,18 +45,177 @@ def get_api_token():
     return token
 
 
+def is_batch_too_large(response: requests.Response | None) -> bool:
+    """True if the server rejected a request because the batch was too big."""
+    if response is None:
+        return False
+    if response.status_code == 413:
+        return True
+    if response.status_code in (400, 422):
+        message = response.text.lower()
+        return "batch" in message or "too large" in message or "too many" in message
+    return False
+
+
+def estimated_load_time(response, default: float = 30.0) -> float:
+    """A 503's estimated_time in seconds; `default` if the body does not carry one."""
+    try:
+        body = response.json()
+    except ValueError:  # Not JSON, e.g. an HTML page from a proxy
+        return default
+    value = body.get("estimated_time") if isinstance(body, dict) else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return default
+
+
+@dataclass
+class PoolStats:
+    """Connection pool counters: a hit reuses a kept-alive connection."""
+
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.requests - self.new_connections
+
+    @property
+    def misses(self) -> int:
+        return self.new_connections
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connection pools count checkouts and new connections,
+    so callers can see how often keep-alive actually saves a handshake.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.stats = PoolStats()
+        self._stats_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        def counting(pool_cls):
+            class CountingPool(pool_cls):
+                def _get_conn(self, timeout=None):
+                    with adapter._stats_lock:
+                        adapter.stats.requests += 1
+                    return super()._get_conn(timeout=timeout)
+
+                def _new_conn(self):
+                    with adapter._stats_lock:
+                        adapter.stats.new_connections += 1
+                    return super()._new_conn()
+
+            return CountingPool
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counting(HTTPConnectionPool),
+            "https": counting(HTTPSConnectionPool),
+        }
+
+
 class HuggingFaceClient:
     """
     Production-ready client for the Hugging Face Inference API.
     Handles retries, cold starts, and rate limits.
+
+    All clients using the same token share one AdaptiveRateLimiter and
+    RetryBudget (see rate_limit.py) unless others are passed in.
     """
 
     BASE_URL = "https://api-inference.huggingface.co/models/"
 
-    def __init__(self, token: str, max_retries: int = 3, retry_delay: float = 5.0):
+    def __init__(
+        self,
+        token: str,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        base_url: str | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        retry_budget: RetryBudget | None = None,
+        transport: BaseAdapter | None = None,
+        serializer: str | Serializer = "auto",
+    ):
+        """
+        Args:
+            token: Hugging Face API token
+            max_retries: Attempts per query before giving up
+            retry_delay: Base delay (seconds) for retry backoff
+            pool_connections: Number of per-host pools kept open
+            pool_maxsize: Max kept-alive connections per host
+            pool_block: If True, pool_maxsize is a hard per-host limit and
+                extra requests wait for a free connection
+            keep_alive: Reuse connections between requests
+            base_url: Override the Inference API URL (e.g. a local stub)
+            rate_limiter: Throttle to use instead of the token's shared one
+            retry_budget: Retry budget to use instead of the token's shared one
+            transport: Adapter to send requests through instead of the pooled
+                one (e.g. replay.ReplayAdapter for offline runs); pool_stats()
+                then stays at zero
+            serializer: JSON codec for request and response bodies — "auto",
+                "orjson", "msgspec", "json" or a Serializer (see serialization.py)
+        """
+        self.token = token
         self.headers = {"Authorization": f"Bearer {token}"}
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.base_url = base_url or self.BASE_URL
+        self.serializer = get_serializer(serializer)
+
+        # One pooled session per client — every query reuses its connections
+        self._adapter = PooledHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", transport or self._adapter)
+        self.session.mount("http://", transport or self._adapter)
+        self.session.headers.update(self.headers)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        # What we know about each model's cold-start state
+        self.readiness = ReadinessTracker()
+
+        shared_limiter, shared_budget = shared_throttle(token)
+        self.rate_limiter = rate_limiter or shared_limiter
+        self.retry_budget = retry_budget or shared_budget
+
+    def pool_stats(self) -> PoolStats:
+        """
+        Returns a snapshot of connection pool hit/miss counters.
+
+        Only the built-in PooledHTTPAdapter counts: with a custom `transport`
+        nothing goes through it, so every counter reads zero.
+        """
+        with self._adapter._stats_lock:
+            stats = self._adapter.stats
+            return PoolStats(stats.requests, stats.new_connections)
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def query(self, model_id: str, payload: dict) -> dict:
         """
@@ -47,66 +225,219 @@ class HuggingFaceClient:
         - 503: Model loading (cold start) — waits and retries
         - 429: Rate limited — backs off exponentially
         - Timeout — retries with delay
+
+        429 and timeout retries use jittered backoff and draw on the shared
+        retry budget; every attempt first waits for the shared rate limiter.
         """
-        url = f"{self.BASE_URL}{model_id}"
+        return self.serializer.loads(self._post(model_id, payload).content)
+
+    def _post(self, model_id: str, payload: dict, stream: bool = False) -> requests.Response:
+        """The retry loop behind query(); returns the first 200 response."""
+        url = f"{self.base_url}{model_id}"
+        body = self.serializer.dumps(payload)
         response = None
+        self.retry_budget.record_request()
 
         for attempt in range(self.max_retries):
+            self.rate_limiter.acquire()
             try:
-                response = requests.post(
-                    url, headers=self.headers, json=payload, timeout=120
+                response = self.session.post(
+                    url, data=body, headers=JSON_HEADERS, timeout=120, stream=stream
                 )
 
                 if response.status_code == 200:
-                    return response.json()
-
-                # =============================================================
-                # TODO 1: Handle 503 — Model is loading (cold start)
-                #
-                # When status_code == 503, the model is being loaded into memory.
-                # - Parse the estimated wait time: response.json().get("estimated_time", 30)
-                # - Print a message like: "Model loading... waiting Xs (attempt N)"
-                # - Sleep for min(estimated_time, 60) seconds
-                # - Continue to the next attempt
-                # =============================================================
-
-                # Your code here (503 handling)
-
-                # =============================================================
-                # TODO 2: Handle 429 — Rate limited
-                #
-                # When status_code == 429, you've hit the rate limit.
-                # - Calculate wait_time using exponential backoff:
-                #   wait_time = self.retry_delay * (2 ** attempt)
-                # - Print a message like: "Rate limited. Waiting Xs before retry..."
-                # - Sleep for wait_time seconds
-                # - Continue to the next attempt
-                # =============================================================
-
-                # Your code here (429 handling)
+                    self.rate_limiter.on_success()
+                    self.readiness.mark_ready(model_id)
+                    return response
+
+                # 503 — Model is loading (cold start)
+                if response.status_code == 503:
+                    estimated_time = estimated_load_time(response)
+                    self.readiness.mark_loading(model_id, estimated_time)
+                    print(f"Model loading... waiting {estimated_time:.0f}s (attempt {attempt + 1})")
+                    time.sleep(min(estimated_time, 60))
+                    continue
+
+                # 429 — Rate limited: slow everyone sharing this token down
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.on_throttle(retry_after)
+                    if attempt == self.max_retries - 1 or not self.retry_budget.try_retry():
+                        break
+                    wait_time = retry_after or jittered_backoff(self.retry_delay, attempt)
+                    print(f"Rate limited. Waiting {wait_time:.1f}s before retry...")
+                    time.sleep(wait_time)
+                    continue
 
                 # Other errors — raise immediately
                 response.raise_for_status()
 
             except requests.exceptions.Timeout:
-                # =============================================================
-                # TODO 3: Handle timeout
-                #
-                # - Print: "Request timed out (attempt N/max_retries)"
-                # - If there are more attempts left, sleep for self.retry_delay
-                #   and continue
-                # - If this was the last attempt, re-raise the exception
-                # =============================================================
-
-                # Your code here (timeout handling)
-                raise  # Remove this line once you implement the handler
+                print(f"Request timed out (attempt {attempt + 1}/{self.max_retries})")
+                if attempt < self.max_retries - 1 and self.retry_budget.try_retry():
+                    time.sleep(jittered_backoff(self.retry_delay, attempt))
+                    continue
+                raise
 
         raise RuntimeError(
             f"Failed after {self.max_retries} attempts. "
-            f"Last status: {response.status_code if response else 'N/A'}, "
-            f"Body: {response.text[:200] if response else 'No response received'}"
+            f"Last status: {response.status_code if response is not None else 'N/A'}, "
+            f"Body: {response.text[:200] if response is not None else 'No response received'}"
         )
 
+    # --- Warmup and readiness ---
+
+    def warmup(
+        self,
+        model_ids: list[str],
+        probe_payload: dict | None = None,
+        timeout: float = 300,
+        background: bool = True,
+    ) -> list[threading.Thread]:
+        """
+        Pre-touches each model so cold starts happen before real traffic.
+
+        One thread per model sends a tiny probe and, while the API answers
+        503, records the estimated_time and polls again until the model
+        answers 200, fails, or `timeout` elapses. Probes go through the
+        shared rate limiter like queries, and a 429 is waited out rather
+        than treated as a failure. Progress is visible via self.readiness /
+        model_status().
+
+        Returns the probe threads (already joined if background=False).
+        """
+        probe_payload = probe_payload or {"inputs": "Hello"}
+        threads = [
+            threading.Thread(
+                target=self._warm_one, args=(model_id, probe_payload, timeout),
+                name=f"warmup-{model_id}", daemon=True,
+            )
+            for model_id in model_ids
+        ]
+        for thread in threads:
+            thread.start()
+        if not background:
+            for thread in threads:
+                thread.join()
+        return threads
+
+    def _warm_one(self, model_id: str, probe_payload: dict, timeout: float):
+        url = f"{self.base_url}{model_id}"
+        body = self.serializer.dumps(probe_payload)
+        deadline = time.monotonic() + timeout
+        if self.readiness.status(model_id).state != READY:
+            self.readiness.mark_loading(model_id, None)
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.post(url, data=body, headers=JSON_HEADERS, timeout=30)
+            except requests.exceptions.RequestException as e:
+                self.readiness.mark_failed(model_id, str(e))
+                return
+            if response.status_code == 200:
+                self.rate_limiter.on_success()
+                self.readiness.mark_ready(model_id)
+                return
+            if response.status_code == 503:
+                estimated_time = estimated_load_time(response)
+                self.readiness.mark_loading(model_id, estimated_time)
+                # Poll a little before the estimate is up, never longer than 30s
+                wait = max(0.5, min(estimated_time * 0.8, 30))
+            elif response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self.rate_limiter.on_throttle(retry_after)
+                wait = retry_after or self.retry_delay
+            else:
+                self.readiness.mark_failed(
+                    model_id, f"Probe failed with {response.status_code}: {response.text[:200]}"
+                )
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.readiness.mark_failed(model_id, f"Still loading after {timeout:.0f}s")
+                return
+            time.sleep(min(wait, remaining))
+
+    def model_status(self, model_id: str) -> ModelStatus:
+        """Last known readiness of a model (state, estimated_time, eta)."""
+        return self.readiness.status(model_id)
+
+    def wait_until_ready(self, model_id: str, timeout: float | None = None) -> bool:
+        """Blocks until the model is loaded; False on timeout or failure."""
+        return self.readiness.wait_until_ready(model_id, timeout)
+
+    def first_ready(self, model_ids: list[str]) -> str | None:
+        """
+        Picks a model to route to: the first one already loaded, else the
+        one expected to finish loading soonest; None if all have failed.
+        """
+        return self.readiness.first_ready(model_ids)
+
+    def query_many(
+        self,
+        model_id: str,
+        payloads: list[dict],
+        concurrency: int = 8,
+        return_exceptions: bool = False,
+        **async_kwargs,
+    ) -> list:
+        """
+        Query many payloads concurrently, returning results in input order.
+
+        Delegates to AsyncHuggingFaceClient.query_many(); use that directly
+        to consume results as they complete. Must not be called from inside
+        a running event loop.
+        """
+        from async_hf_client import AsyncHuggingFaceClient
+
+        async def run():
+            results = [None] * len(payloads)
+            async with AsyncHuggingFaceClient.from_client(self, **async_kwargs) as client:
+                async for index, result in client.query_many(
+                    model_id, payloads, concurrency, return_exceptions
+                ):
+                    results[index] = result
+            return results
+
+        return asyncio.run(run())
+
+    def _query_batched(
+        self, model_id: str, texts: list[str], batch_size: int, parameters: dict | None = None
+    ) -> list:
+        """
+        Sends texts as list-valued `inputs`, batch_size at a time, and returns
+        one result per text. A batch rejected as too large is split in half
+        and each half retried.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        results = []
+        for start in range(0, len(texts), batch_size):
+            results.extend(self._query_batch(model_id, texts[start:start + batch_size], parameters))
+        return results
+
+    def _query_batch(self, model_id: str, texts: list[str], parameters: dict | None) -> list:
+        payload = {"inputs": texts}
+        if parameters:
+            payload["parameters"] = parameters
+        try:
+            result = self.query(model_id, payload)
+        except requests.HTTPError as e:
+            if len(texts) == 1 or not is_batch_too_large(e.response):
+                raise
+            mid = len(texts) // 2
+            print(f"Batch of {len(texts)} rejected as too large — splitting into {mid} + {len(texts) - mid}")
+            return (
+                self._query_batch(model_id, texts[:mid], parameters)
+                + self._query_batch(model_id, texts[mid:], parameters)
+            )
+
+        if len(result) != len(texts):
+            raise RuntimeError(
+                f"Expected {len(texts)} results for batch, got {len(result)}"
+            )
+        return result
+
     # --- Helper methods (complete — no changes needed) ---
 
     def text_generation(
@@ -126,6 +457,39 @@ class HuggingFaceClient:
         )
         return result[0]["generated_text"]
 
+    def text_generation_stream(
+        self,
+        prompt: str,
+        model: str = "mistralai/Mistral-7B-Instruct-v0.3",
+        max_new_tokens: int = 200,
+        temperature: float = 0.7,
+    ) -> TokenStream:
+        """
+        Stream generated tokens as they are produced.
+
+        Iterate the returned TokenStream for token texts; its .stats holds
+        time-to-first-token and inter-token latencies.
+        """
+        stats = StreamStats()
+        response = self._post(
+            model,
+            {
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": max_new_tokens,
+                    "temperature": temperature,
+                    "return_full_text": False,
+                },
+                "stream": True,
+            },
+            stream=True,
+        )
+        # SSE is always UTF-8; without a charset requests would assume ISO-8859-1
+        response.encoding = "utf-8"
+        return TokenStream(
+            response.iter_lines(decode_unicode=True), stats, close=response.close
+        )
+
     def summarization(
         self, text: str, model: str = "facebook/bart-large-cnn"
     ) -> str:
@@ -142,6 +506,26 @@ class HuggingFaceClient:
         """Classify text sentiment or category."""
         return self.query(model, {"inputs": text})
 
+    # --- Batch helpers: one HTTP request per batch_size inputs ---
+
+    def summarization_batch(
+        self, texts: list[str], model: str = "facebook/bart-large-cnn", batch_size: int = 8
+    ) -> list[str]:
+        """Summarize many texts; returns one summary per input, in order."""
+        results = self._query_batched(
+            model, texts, batch_size, {"max_length": 130, "min_length": 30}
+        )
+        return [item["summary_text"] for item in results]
+
+    def text_classification_batch(
+        self,
+        texts: list[str],
+        model: str = "distilbert-base-uncased-finetuned-sst-2-english",
+        batch_size: int = 32,
+    ) -> list[list]:
+        """Classify many texts; returns the label/score list for each input, in order."""
+        return self._query_batched(model, texts, batch_size)
+
 
 # --- Main: test all three task types ---
 if __name__ == "__main__":
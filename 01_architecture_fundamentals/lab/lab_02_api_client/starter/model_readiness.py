@@ -0,0 +1,104 @@
+"""
+Lab 2 — Extension: Model Readiness Tracking
+
+Records what the client has learned about each model's cold-start state —
+from warmup probes and from 503 responses to real queries — so callers can
+wait for a model, or route to one that is already loaded.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+UNKNOWN = "unknown"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class ModelStatus:
+    """Last known state of one model."""
+
+    state: str = UNKNOWN
+    estimated_time: float | None = None
+    updated_at: float = field(default_factory=time.monotonic)
+    error: str | None = None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Remaining load time, based on the last 503's estimated_time."""
+        if self.state != LOADING or self.estimated_time is None:
+            return None
+        return max(0.0, self.estimated_time - (time.monotonic() - self.updated_at))
+
+
+class ReadinessTracker:
+    """Thread-safe per-model readiness state with blocking waits."""
+
+    def __init__(self):
+        self._statuses: dict[str, ModelStatus] = {}
+        self._changed = threading.Condition()
+
+    def _set(self, model_id: str, status: ModelStatus):
+        with self._changed:
+            self._statuses[model_id] = status
+            self._changed.notify_all()
+
+    def mark_loading(self, model_id: str, estimated_time: float | None):
+        self._set(model_id, ModelStatus(LOADING, estimated_time))
+
+    def mark_ready(self, model_id: str):
+        with self._changed:
+            if self._statuses.get(model_id, ModelStatus()).state == READY:
+                return  # Hot path: every successful query lands here
+        self._set(model_id, ModelStatus(READY))
+
+    def mark_failed(self, model_id: str, error: str):
+        self._set(model_id, ModelStatus(FAILED, error=error))
+
+    def status(self, model_id: str) -> ModelStatus:
+        with self._changed:
+            return self._statuses.get(model_id, ModelStatus())
+
+    def snapshot(self) -> dict[str, ModelStatus]:
+        with self._changed:
+            return dict(self._statuses)
+
+    def is_ready(self, model_id: str) -> bool:
+        return self.status(model_id).state == READY
+
+    def wait_until_ready(self, model_id: str, timeout: float | None = None) -> bool:
+        """
+        Blocks until the model is READY. Returns False on timeout or if the
+        model is marked FAILED.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                state = self._statuses.get(model_id, ModelStatus()).state
+                if state == READY:
+                    return True
+                if state == FAILED:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+
+    def first_ready(self, model_ids: list[str]) -> str | None:
+        """
+        The first READY model in preference order; otherwise the non-failed
+        model expected to finish loading soonest; None if all have failed.
+        """
+        statuses = [(model_id, self.status(model_id)) for model_id in model_ids]
+        for model_id, status in statuses:
+            if status.state == READY:
+                return model_id
+        candidates = [(m, s) for m, s in statuses if s.state != FAILED]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda item: item[1].eta_seconds if item[1].eta_seconds is not None else float("inf"),
+        )[0]
@@ -0,0 +1,196 @@
+"""
+Lab 2 — Extension: Adaptive Rate Limiting and Retry Budgets
+
+Shared, process-wide throttling for every client that uses the same token:
+
+- AdaptiveRateLimiter: a token bucket whose rate is learned AIMD-style.
+  It starts unlimited; the first 429 sets the rate just below the observed
+  throughput, each further 429 halves it, and every second without one adds
+  a little back. Retry-After pauses all callers, and the bucket then releases
+  them one interval apart instead of all at once.
+- RetryBudget: caps retries to a fraction of recent traffic, so a struggling
+  backend is not hit with a multiple of its normal load.
+- jittered_backoff: "full jitter" exponential backoff.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+
+def jittered_backoff(base: float, attempt: int, cap: float = 60.0) -> float:
+    """Random delay in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD token bucket. rate is in requests/second; None means unlimited
+    (no 429 seen yet).
+    """
+
+    def __init__(
+        self,
+        initial_rate: float | None = None,
+        min_rate: float = 0.2,
+        max_rate: float = 200.0,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        first_throttle_factor: float = 0.9,
+        burst: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            initial_rate: Starting rate (None = unlimited until the first 429)
+            min_rate / max_rate: Bounds for the learned rate
+            additive_increase: Requests/second added per throttle-free second
+            decrease_factor: Multiplier applied to the rate on a 429
+            first_throttle_factor: Fraction of the observed throughput
+                (requests in the last second) used as the rate after the
+                first 429
+            burst: Tokens that may accumulate while idle
+            clock: Monotonic time source in seconds (tests pass a fake)
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.first_throttle_factor = first_throttle_factor
+        self.burst = burst
+        self.throttles = 0
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_free = clock()
+        self._last_adjust = clock()
+        self._recent: deque[float] = deque()  # Acquire times in the last second
+
+    def reserve(self) -> float:
+        """Claims the next slot; returns how long the caller must wait for it."""
+        with self._lock:
+            now = self.clock()
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - 1.0:
+                self._recent.popleft()
+            if self.rate is None:
+                wait = max(0.0, self._next_free - now)
+                return wait
+            interval = 1.0 / self.rate
+            # Idle time accrues at most `burst` tokens
+            start = max(self._next_free, now - (self.burst - 1) * interval)
+            self._next_free = start + interval
+            return max(0.0, start - now)
+
+    def acquire(self):
+        """Blocks until the caller may send a request."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        """Additive increase: at most once per second."""
+        with self._lock:
+            if self.rate is None:
+                return
+            now = self.clock()
+            if now - self._last_adjust >= 1.0:
+                self.rate = min(self.max_rate, self.rate + self.additive_increase)
+                self._last_adjust = now
+
+    def on_throttle(self, retry_after: float | None = None):
+        """Multiplicative decrease, plus a shared pause for Retry-After."""
+        with self._lock:
+            now = self.clock()
+            self.throttles += 1
+            if self.rate is None:
+                # First 429: the throughput that triggered it is the ceiling
+                observed = max(len(self._recent), self.min_rate)
+                self.rate = max(self.min_rate, observed * self.first_throttle_factor)
+                self._last_adjust = now
+            elif now - self._last_adjust >= 1.0:
+                # A burst of 429s from one overload counts as one signal
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_adjust = now
+            if retry_after:
+                self._next_free = max(self._next_free, now + retry_after)
+
+
+class RetryBudget:
+    """
+    Allows retries only while they stay under `ratio` of the requests seen in
+    the last `window` seconds (with a small floor so low traffic can retry).
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 0.5, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self.denied = 0
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window
+        for times in (self._requests, self._retries):
+            while times and times[0] < cutoff:
+                times.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """Consumes budget for one retry; False if the budget is spent."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = max(
+                self.min_retries_per_second * self.window,
+                self.ratio * len(self._requests),
+            )
+            if len(self._retries) >= allowed:
+                self.denied += 1
+                return False
+            self._retries.append(now)
+            return True
+
+
+_shared_lock = threading.Lock()
+_shared: dict[str, tuple[AdaptiveRateLimiter, RetryBudget]] = {}
+
+
+def shared_throttle(token: str) -> tuple[AdaptiveRateLimiter, RetryBudget]:
+    """The process-wide limiter and retry budget for an API token."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = (AdaptiveRateLimiter(), RetryBudget())
+        return _shared[key]
@@ -0,0 +1,263 @@
+"""
+Lab 2 — Extension: Record / Replay Transport
+
+Records real Inference API traffic to a cassette file, then replays it
+offline — deterministically, with optional latency and fault injection —
+so the client (and the bake-off) can be load-tested without network access.
+
+    # Record once against the live API
+    cassette = Cassette("hf_cassette.json")
+    with HuggingFaceClient(token, transport=RecordingAdapter(cassette)) as client:
+        client.text_generation("Explain RAG:")
+    # (closing the client saves the cassette)
+
+    # Replay anywhere: recorded latency at 10x speed, 5% cold starts
+    replay = ReplayAdapter(Cassette("hf_cassette.json"), time_scale=0.1, fault_503=0.05, seed=1)
+    client = HuggingFaceClient("offline", transport=replay)
+
+Requests are stored as method, full URL (host, path and any query string)
+and body — never headers, so the API token, sent as a header, does not end
+up in the cassette. Keep secrets out of query strings when recording.
+"""
+
+import base64
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_VERSION = 1
+
+# Headers describing the wire format, not the (already decoded) body
+_SKIP_HEADERS = {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay found no recorded response for a request."""
+
+
+def _request_key(method: str, url: str, body: bytes | str | None) -> str:
+    """Host-independent match key: method, path + query and canonical body."""
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            pass
+    return f"{method.upper()} {target} {body or ''}"
+
+
+def _encode_body(body: bytes) -> dict:
+    try:
+        return {"body": body.decode("utf-8"), "encoding": "utf-8"}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode("ascii"), "encoding": "base64"}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if entry.get("encoding") == "base64":
+        return base64.b64decode(entry["body"])
+    return entry["body"].encode("utf-8")
+
+
+class Cassette:
+    """
+    Recorded request/response pairs with their timing, stored as JSON.
+
+    Identical requests recorded several times are replayed in recorded
+    order, cycling once exhausted.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.interactions: list[dict] = []
+        self._by_key: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+            for interaction in data["interactions"]:
+                self._index(interaction)
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def _index(self, interaction: dict):
+        self.interactions.append(interaction)
+        self._by_key.setdefault(interaction["key"], []).append(interaction)
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed_s: float):
+        """Adds one exchange; the response body must already be read."""
+        interaction = {
+            "key": _request_key(request.method, request.url, request.body),
+            "request": {"method": request.method, "url": request.url},
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {
+                    k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS
+                },
+                **_encode_body(response.content),
+            },
+            "ttfb_s": response.elapsed.total_seconds(),
+            "elapsed_s": elapsed_s,
+        }
+        with self._lock:
+            self._index(interaction)
+
+    def find(self, request: requests.PreparedRequest) -> dict | None:
+        key = _request_key(request.method, request.url, request.body)
+        with self._lock:
+            matches = self._by_key.get(key)
+            if not matches:
+                return None
+            cursor = self._cursor.get(key, 0)
+            self._cursor[key] = cursor + 1
+            return matches[cursor % len(matches)]
+
+    def save(self):
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class RecordingAdapter(BaseAdapter):
+    """Sends requests through a real adapter and records every exchange."""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter | None = None):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        response.content  # Read the body (even for stream=True) so it can be stored
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.inner.close()
+        self.cassette.save()
+
+
+@dataclass
+class ReplayStats:
+    requests: int = 0
+    replayed: int = 0
+    misses: int = 0
+    faults_503: int = 0
+    faults_429: int = 0
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests from a cassette instead of the network.
+
+    Latency: each response waits recorded elapsed_s * time_scale plus
+    added_latency (time_scale=0 replays as fast as possible). Bodies are
+    delivered at once, so streamed responses arrive as a single burst.
+
+    Faults: with probability fault_503 / fault_429 a request gets a cold-start
+    503 (with estimated_time) or a 429 (with Retry-After) instead of its
+    recording. Pass seed for a repeatable fault sequence.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        time_scale: float = 1.0,
+        added_latency: float = 0.0,
+        fault_503: float = 0.0,
+        fault_429: float = 0.0,
+        estimated_time: float = 1.0,
+        retry_after: float = 1.0,
+        seed: int | None = None,
+    ):
+        super().__init__()
+        self.cassette = cassette
+        self.time_scale = time_scale
+        self.added_latency = added_latency
+        self.fault_503 = fault_503
+        self.fault_429 = fault_429
+        self.estimated_time = estimated_time
+        self.retry_after = retry_after
+        self.stats = ReplayStats()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _fault(self) -> tuple[int, dict, dict] | None:
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.fault_503:
+                self.stats.faults_503 += 1
+                return 503, {}, {"error": "Model is currently loading", "estimated_time": self.estimated_time}
+            if roll < self.fault_503 + self.fault_429:
+                self.stats.faults_429 += 1
+                return 429, {"Retry-After": f"{self.retry_after:g}"}, {"error": "Rate limit reached"}
+        return None
+
+    def _build_response(self, request, status: int, headers: dict, body: bytes, reason: str | None, elapsed: float):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(seconds=elapsed)
+        return response
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.stats.requests += 1
+
+        fault = self._fault()
+        if fault is not None:
+            status, headers, body = fault
+            headers = {"Content-Type": "application/json", **headers}
+            return self._build_response(request, status, headers, json.dumps(body).encode(), None, 0.0)
+
+        interaction = self.cassette.find(request)
+        if interaction is None:
+            with self._lock:
+                self.stats.misses += 1
+            raise CassetteMiss(f"No recording for {request.method} {request.url}", request=request)
+
+        delay = interaction["elapsed_s"] * self.time_scale + self.added_latency
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.stats.replayed += 1
+        recorded = interaction["response"]
+        return self._build_response(
+            request,
+            recorded["status"],
+            recorded["headers"],
+            _decode_body(recorded),
+            recorded.get("reason"),
+            delay,
+        )
+
+    def close(self):
+        pass
@@ -0,0 +1,260 @@
+"""
+Lab 2 — Extension: Semantic Cache
+
+Matches prompts by meaning instead of exact bytes. Prompts are normalized,
+embedded and looked up in an in-memory vector index; a neighbour above the
+similarity threshold counts as a hit. Only requests that agree on the
+model and every non-`inputs` parameter are ever compared.
+
+The default HashingEmbedder is deterministic and fully offline. Anything
+with an embed(texts) -> array method (e.g. a sentence-transformers model
+wrapped in CallableEmbedder) can replace it.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT = re.compile(r" ([?.!,;:])")
+_WORD = re.compile(r"\w+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Unicode-normalize, case-fold and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized row vectors."""
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Returns an array of shape (len(texts), dim)."""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """
+    Feature-hashing embedder over word unigrams, word bigrams and character
+    trigrams. Uses blake2b rather than hash(), so vectors are identical
+    across processes and machines.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD.findall(text)
+        features = [f"w:{w}" for w in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        padded = f" {text} "
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class CallableEmbedder(Embedder):
+    """Adapts any fn(list[str]) -> array-like, normalizing its output."""
+
+    def __init__(self, fn: Callable[[list[str]], object]):
+        self.fn = fn
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.asarray(self.fn(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class VectorIndex:
+    """
+    Brute-force cosine index over normalized vectors. Storage grows in
+    blocks up to max_entries; after that it is a ring buffer, so each add
+    overwrites the oldest slot in O(dim).
+    """
+
+    def __init__(self, dim: int, max_entries: int = 10_000):
+        self.dim = dim
+        self.max_entries = max_entries
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._keys: list[str | None] = []
+        self._prompts: list[str | None] = []
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []  # Slots emptied by remove()
+        self._cursor = 0  # Oldest slot, overwritten next once full
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _next_slot(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if len(self._keys) < self.max_entries:
+            if len(self._keys) >= self._vectors.shape[0]:
+                grow = min(max(64, self._vectors.shape[0]), self.max_entries - self._vectors.shape[0])
+                self._vectors = np.vstack([self._vectors, np.zeros((grow, self.dim), dtype=np.float32)])
+                self._live = np.concatenate([self._live, np.zeros(grow, dtype=bool)])
+            self._keys.append(None)
+            self._prompts.append(None)
+            return len(self._keys) - 1
+        slot = self._cursor
+        self._cursor = (self._cursor + 1) % self.max_entries
+        self._slots.pop(self._keys[slot], None)
+        return slot
+
+    def add(self, vector: np.ndarray, key: str, prompt: str):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._next_slot()
+        self._vectors[slot] = vector
+        self._live[slot] = True
+        self._keys[slot] = key
+        self._prompts[slot] = prompt
+        self._slots[key] = slot
+
+    def remove(self, key: str):
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._live[slot] = False
+            self._keys[slot] = self._prompts[slot] = None
+            self._free.append(slot)
+
+    def nearest(self, vector: np.ndarray) -> tuple[str, str, float] | None:
+        """Returns (key, prompt, similarity) of the closest entry."""
+        if not self._slots:
+            return None
+        used = len(self._keys)
+        scores = np.where(self._live[:used], self._vectors[:used] @ vector, -np.inf)
+        best = int(np.argmax(scores))
+        return self._keys[best], self._prompts[best], float(scores[best])
+
+
+@dataclass
+class SemanticCacheStats:
+    lookups: int = 0
+    hits: int = 0
+    false_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def false_hit_rate(self) -> float:
+        return self.false_hits / self.hits if self.hits else 0.0
+
+
+@dataclass
+class SemanticMatch:
+    key: str
+    prompt: str
+    similarity: float
+    namespace: str
+
+
+class SemanticCache:
+    """
+    Maps prompts to the exact-match cache keys of similar earlier requests.
+    Values stay in the regular cache; this index only finds the key.
+
+    The caller resolves a match against the regular cache, then calls
+    record_hit() if the entry was there or discard() if it was evicted, so
+    only served responses count as hits. False hits are reported by the
+    caller too (report_false_hit) — only the application can tell that a
+    similar prompt needed a different answer.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        threshold: float = 0.92,
+        max_entries_per_namespace: int = 10_000,
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self.stats = SemanticCacheStats()
+        self._indexes: dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def namespace(model_id: str, payload: dict) -> str | None:
+        """Requests are only comparable if everything except `inputs` matches."""
+        if not isinstance(payload.get("inputs"), str):
+            return None
+        rest = {k: v for k, v in payload.items() if k != "inputs"}
+        return f"{model_id}|{json.dumps(rest, sort_keys=True)}"
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        return self.embedder.embed([normalize_prompt(prompt)])[0]
+
+    def lookup(self, model_id: str, payload: dict) -> SemanticMatch | None:
+        namespace = self.namespace(model_id, payload)
+        if namespace is None:
+            return None
+        vector = self._embed(payload["inputs"])
+        with self._lock:
+            self.stats.lookups += 1
+            index = self._indexes.get(namespace)
+            found = index.nearest(vector) if index else None
+            if found is None or found[2] < self.threshold:
+                return None
+        return SemanticMatch(*found, namespace)
+
+    def record_hit(self, match: SemanticMatch):
+        """The match's entry was found in the cache and served."""
+        with self._lock:
+            self.stats.hits += 1
+
+    def discard(self, match: SemanticMatch):
+        """The match's entry is gone from the cache: drop its stale vector."""
+        with self._lock:
+            index = self._indexes.get(match.namespace)
+            if index is not None:
+                index.remove(match.key)
+
+    def add(self, model_id: str, payload: dict, key: str):
+        namespace = self.namespace(model_id, payload)
+        if namespace is None:
+            return
+        vector = self._embed(payload["inputs"])
+        with self._lock:
+            if namespace not in self._indexes:
+                self._indexes[namespace] = VectorIndex(
+                    vector.shape[0], self.max_entries_per_namespace
+                )
+            self._indexes[namespace].add(vector, key, payload["inputs"])
+
+    def report_false_hit(self):
+        """Record that a semantic hit returned an unsuitable response."""
+        with self._lock:
+            self.stats.false_hits += 1
+
+    def summary(self) -> dict:
+        return vars(self.stats) | {
+            "hit_rate": self.stats.hit_rate,
+            "false_hit_rate": self.stats.false_hit_rate,
+            "indexed": sum(len(index) for index in self._indexes.values()),
+        }
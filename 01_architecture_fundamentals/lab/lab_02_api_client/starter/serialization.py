@@ -0,0 +1,150 @@
+"""
+Lab 2 — Extension: Fast Serialization and Canonical Cache Keys
+
+A pluggable JSON codec for the client stack. "auto" picks the fastest one
+installed — orjson, then msgspec, then the standard library:
+
+    client = CachedHFClient(token, serializer="auto")
+
+canonical_key() hashes a request without serializing it as one document:
+string inputs (often the large part) go into the hash as raw UTF-8, and only
+the small remainder of the payload is JSON-encoded. It always uses the
+standard library for that remainder, so keys are identical whichever codec
+is installed.
+
+Caches written before canonical_key() used legacy_key(); CachedHFClient
+looks an entry up under it on a miss and moves it to the new key.
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: pip install msgspec
+    msgspec = None
+
+SERIALIZERS = ("auto", "orjson", "msgspec", "json")
+
+
+class Serializer(ABC):
+    """Encodes values to UTF-8 JSON bytes and back."""
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Raises ValueError on malformed data."""
+        pass
+
+
+class JSONSerializer(Serializer):
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson serializer requires: pip install orjson")
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)  # orjson.JSONDecodeError is a ValueError
+
+
+class MsgspecSerializer(Serializer):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec serializer requires: pip install msgspec")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value)
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+def get_serializer(serializer: str | Serializer = "auto") -> Serializer:
+    """Resolves a name from SERIALIZERS (or passes an instance through)."""
+    if isinstance(serializer, Serializer):
+        return serializer
+    if serializer == "auto":
+        if orjson is not None:
+            return OrjsonSerializer()
+        if msgspec is not None:
+            return MsgspecSerializer()
+        return JSONSerializer()
+    if serializer == "orjson":
+        return OrjsonSerializer()
+    if serializer == "msgspec":
+        return MsgspecSerializer()
+    if serializer == "json":
+        return JSONSerializer()
+    raise ValueError(f"Unknown serializer: {serializer!r} (choose from {SERIALIZERS})")
+
+
+def _canonical_json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def canonical_key(model_id: str, payload: dict) -> str:
+    """
+    sha256 hex digest identifying a request. Each field is length-prefixed,
+    so different payloads cannot produce the same byte stream.
+    """
+    digest = hashlib.sha256()
+
+    def feed(tag: bytes, data: bytes):
+        digest.update(tag + len(data).to_bytes(8, "little"))
+        digest.update(data)
+
+    feed(b"m", model_id.encode("utf-8"))
+    if "inputs" not in payload:
+        feed(b"n", b"")
+    else:
+        inputs = payload["inputs"]
+        if isinstance(inputs, str):
+            feed(b"s", inputs.encode("utf-8"))
+        elif isinstance(inputs, list) and all(isinstance(text, str) for text in inputs):
+            feed(b"l", len(inputs).to_bytes(8, "little"))
+            for text in inputs:
+                feed(b"s", text.encode("utf-8"))
+        else:
+            feed(b"j", _canonical_json(inputs))
+    feed(b"p", _canonical_json({k: v for k, v in payload.items() if k != "inputs"}))
+    return digest.hexdigest()
+
+
+def legacy_key(model_id: str, payload: dict) -> str:
+    """The key CachedHFClient used before canonical_key(), for migrating old entries."""
+    content = json.dumps({"model": model_id, "payload": payload}, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
@@ -0,0 +1,79 @@
+"""
+Lab 2 — Extension: Single-flight Request Coalescing
+
+When several threads ask for the same key at once, only the first (the
+leader) runs the function; the rest wait and share its result or error.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters: `executed` calls reached upstream, `coalesced` shared a result."""
+
+    executed: int = 0
+    coalesced: int = 0
+
+    @property
+    def coalesce_rate(self) -> float:
+        total = self.executed + self.coalesced
+        return self.coalesced / total if total else 0.0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Runs fn() unless a call for key is already in flight, in which case
+        waits for that one instead.
+
+        Returns:
+            (result, shared) — shared is True if the result came from
+            another caller's in-flight request
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,124 @@
+"""
+Lab 2 — Extension: Streaming Token Generation
+
+Parses the server-sent-event stream that text-generation endpoints return
+for `"stream": true` and measures it as it arrives:
+
+    stream = client.text_generation_stream("Explain RAG:")
+    for token in stream:
+        print(token, end="", flush=True)
+    print(stream.stats.time_to_first_token)
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator
+
+
+@dataclass
+class StreamStats:
+    """Timing for one streamed generation (perf_counter seconds)."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    token_times: list[float] = field(default_factory=list)
+    finished_at: float | None = None
+    generated_text: str | None = None
+
+    @property
+    def tokens(self) -> int:
+        return len(self.token_times)
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        return self.token_times[0] - self.started_at if self.token_times else None
+
+    @property
+    def inter_token_latencies(self) -> list[float]:
+        return [b - a for a, b in zip(self.token_times, self.token_times[1:])]
+
+    @property
+    def mean_inter_token_latency(self) -> float | None:
+        gaps = self.inter_token_latencies
+        return sum(gaps) / len(gaps) if gaps else None
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if not self.token_times or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.started_at
+        return self.tokens / elapsed if elapsed > 0 else None
+
+
+def parse_sse_event(line: str) -> dict | None:
+    """Returns the JSON payload of a `data:` line, or None for other lines."""
+    if not line.startswith("data:"):
+        return None  # Blank separators, comments (":") and event/id fields
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    event = json.loads(data)
+    if "error" in event:
+        raise RuntimeError(f"Stream error: {event['error']}")
+    return event
+
+
+def _token_text(event: dict) -> str | None:
+    token = event.get("token") or {}
+    if token.get("special"):
+        return None
+    return token.get("text")
+
+
+class TokenStream:
+    """Iterates the token texts of a streamed response, recording stats."""
+
+    def __init__(self, lines: Iterator[str], stats: StreamStats, close=None):
+        self.stats = stats
+        self._lines = lines
+        self._close = close
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for line in self._lines:
+                event = parse_sse_event(line)
+                if event is None:
+                    continue
+                if event.get("generated_text") is not None:
+                    self.stats.generated_text = event["generated_text"]
+                text = _token_text(event)
+                if text is None:
+                    continue
+                self.stats.token_times.append(time.perf_counter())
+                yield text
+            self.stats.finished_at = time.perf_counter()
+        finally:
+            if self._close is not None:
+                self._close()
+
+
+class AsyncTokenStream:
+    """Async counterpart of TokenStream: `async for token in stream`."""
+
+    def __init__(self, lines: AsyncIterator[str], stats: StreamStats, aclose=None):
+        self.stats = stats
+        self._lines = lines
+        self._aclose = aclose
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for line in self._lines:
+                event = parse_sse_event(line)
+                if event is None:
+                    continue
+                if event.get("generated_text") is not None:
+                    self.stats.generated_text = event["generated_text"]
+                text = _token_text(event)
+                if text is None:
+                    continue
+                self.stats.token_times.append(time.perf_counter())
+                yield text
+            self.stats.finished_at = time.perf_counter()
+        finally:
+            if self._aclose is not None:
+                await self._aclose()
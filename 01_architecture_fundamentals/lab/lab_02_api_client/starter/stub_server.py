@@ -0,0 +1,200 @@
+"""
+Local stub of the Hugging Face Inference API.
+
+Serves canned responses on http://127.0.0.1:<port>/models/<model_id> so the
+client can be exercised and benchmarked without a token or network access.
+Speaks HTTP/1.1, so keep-alive connections are honoured.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def canned_item(model_id: str, text: str):
+    """Builds the result for a single input, shaped like the real API."""
+    if "bart" in model_id or "summar" in model_id:
+        return {"summary_text": f"Summary of: {text[:40]}"}
+    if "distilbert" in model_id or "sst" in model_id:
+        return [
+            {"label": "POSITIVE", "score": 0.99},
+            {"label": "NEGATIVE", "score": 0.01},
+        ]
+    return {"generated_text": f"Echo: {text[:40]}"}
+
+
+def canned_response(model_id: str, payload: dict):
+    """Builds a response for a single or list-valued `inputs`."""
+    inputs = payload.get("inputs", "")
+    if isinstance(inputs, list):
+        return [canned_item(model_id, str(text)) for text in inputs]
+    return [canned_item(model_id, str(inputs))]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Header/body writes must not wait on delayed ACKs
+
+    # Reject list inputs longer than this with 413, like an overloaded endpoint
+    max_batch_size: int | None = None
+
+    # Delay between tokens when a request asks for "stream": true
+    stream_token_delay: float = 0.02
+
+    # Answer 429 (with Retry-After) above this many requests/second
+    rate_limit_per_second: float | None = None
+    retry_after_seconds: float = 1.0
+
+    # Answer 503 with estimated_time for this long after a model's first request
+    cold_start_seconds: float = 0.0
+
+    def _over_rate_limit(self) -> bool:
+        if self.rate_limit_per_second is None:
+            return False
+        now = time.monotonic()
+        with self.server.lock:
+            window = self.server.rate_window
+            window[:] = [t for t in window if t > now - 1.0]
+            if len(window) >= self.rate_limit_per_second:
+                return True
+            window.append(now)
+            return False
+
+    def _loading_remaining(self, model_id: str) -> float:
+        with self.server.lock:
+            first_seen = self.server.first_seen.setdefault(model_id, time.monotonic())
+        return self.cold_start_seconds - (time.monotonic() - first_seen)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status: int, body, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        model_id = self.path.split("/models/", 1)[-1]
+        with self.server.lock:
+            self.server.requests += 1
+        if self._over_rate_limit():
+            self._send_json(
+                429, {"error": "Rate limit reached"},
+                {"Retry-After": f"{self.retry_after_seconds:g}"},
+            )
+            return
+        remaining = self._loading_remaining(model_id)
+        if remaining > 0:
+            self._send_json(503, {"error": f"Model {model_id} is currently loading", "estimated_time": remaining})
+            return
+        inputs = payload.get("inputs")
+        if (
+            self.max_batch_size is not None
+            and isinstance(inputs, list)
+            and len(inputs) > self.max_batch_size
+        ):
+            self._send_json(413, {"error": "Payload too large: batch exceeds limit"})
+            return
+        if payload.get("stream"):
+            self._send_stream(f"Echo: {inputs}")
+            return
+        self._send_json(200, canned_response(model_id, payload))
+
+    def _send_stream(self, text: str):
+        """Server-sent events, one token per word, like text-generation-inference."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.stream_token_delay)
+            last = i == len(words) - 1
+            event = {
+                "token": {"id": i, "text": word if i == 0 else f" {word}", "special": False},
+                "generated_text": text if last else None,
+            }
+            # Raw UTF-8 and no charset parameter, as real SSE servers send it
+            self._write_chunk(f"data:{json.dumps(event, ensure_ascii=False)}\n\n".encode())
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Holds the per-server state StubHandler reads through self.server."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.requests = 0  # POSTs received, including rejected ones
+        self.rate_window: list[float] = []
+        self.first_seen: dict[str, float] = {}
+
+
+class StubServer:
+    """
+    Runs StubHandler on a background thread.
+
+    Usage:
+        with StubServer(cold_start_seconds=2.0) as server:
+            client = HuggingFaceClient(token, base_url=server.base_url)
+
+    Keyword arguments override StubHandler settings (max_batch_size,
+    stream_token_delay, rate_limit_per_second, retry_after_seconds,
+    cold_start_seconds) for this server only.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, handler=StubHandler, **settings):
+        for name in settings:
+            if not hasattr(handler, name):
+                raise TypeError(f"Unknown StubHandler setting: {name}")
+        if settings:
+            handler = type(handler.__name__, (handler,), settings)
+        self.httpd = StubHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/models/"
+
+    @property
+    def requests(self) -> int:
+        """POSTs received so far."""
+        with self.httpd.lock:
+            return self.httpd.requests
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with StubServer(port=8080) as server:
+        print(f"Stub Inference API listening on {server.base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,105 @@
+import gzip
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from cache_backends import ShardedDirectoryBackend, SQLiteBackend, migrate_directory
+from cache_tiers import DiskTier
+
+
+def _key(i: int) -> str:
+    return f"{i:064x}"
+
+
+def _legacy_directory(path, count: int) -> dict:
+    """Writes `count` entries in the old flat <key>.json layout."""
+    entries = {}
+    for i in range(count):
+        data = f'{{"n": {i}}}'.encode()
+        (path / f"{_key(i)}.json").write_bytes(data)
+        entries[_key(i)] = data
+    return entries
+
+
+def test_scan_of_flat_directory_yields_each_key_once_and_moves_nothing(tmp_path):
+    entries = _legacy_directory(tmp_path, 2000)
+    backend = ShardedDirectoryBackend(tmp_path)
+
+    scanned = [key for key, _size, _created in backend.scan()]
+
+    assert len(scanned) == len(set(scanned)) == 2000
+    assert set(scanned) == set(entries)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f"{k}.json" for k in entries)
+    assert backend.read(_key(7)) == entries[_key(7)]
+
+
+def test_scan_reports_key_in_both_layouts_once(tmp_path):
+    backend = ShardedDirectoryBackend(tmp_path)
+    backend.write(_key(1), b"new")
+    (tmp_path / f"{_key(1)}.json").write_bytes(b"stale")
+
+    assert [(key, size) for key, size, _ in backend.scan()] == [(_key(1), 3)]
+    assert backend.read(_key(1)) == b"new"
+
+
+def test_migrate_layout_moves_flat_files_into_shards(tmp_path):
+    entries = _legacy_directory(tmp_path, 300)
+    backend = ShardedDirectoryBackend(tmp_path)
+
+    assert backend.migrate_layout() == 300
+    assert not any(p.is_file() for p in tmp_path.iterdir())
+    assert sorted(key for key, _, _ in backend.scan()) == sorted(entries)
+    assert backend.migrate_layout() == 0
+
+
+def test_migrate_directory_counts_each_entry_and_leaves_source_alone(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    entries = _legacy_directory(source, 500)
+    target = SQLiteBackend(tmp_path / "cache.db")
+
+    assert migrate_directory(source, target) == 500
+    assert sorted(p.name for p in source.iterdir()) == sorted(f"{k}.json" for k in entries)
+    assert target.read(_key(42)) == entries[_key(42)]
+    target.close()
+
+
+def test_disk_tier_treats_undecodable_entry_as_miss(tmp_path):
+    backend = SQLiteBackend(tmp_path / "cache.db", compression="gzip")
+    tier = DiskTier(backend)
+    tier.set(_key(1), {"ok": True})
+    with backend._lock:
+        backend._conn.execute("UPDATE responses SET body = ? WHERE key = ?", (b"not gzip", _key(1)))
+
+    assert tier.get(_key(1)) is None
+    assert tier.stats.misses == 1
+    assert _key(1) not in tier
+    assert backend.read(_key(1)) is None
+    tier.close()
+
+
+def test_disk_tier_treats_truncated_entry_as_miss(tmp_path):
+    backend = SQLiteBackend(tmp_path / "cache.db", compression="gzip")
+    tier = DiskTier(backend)
+    tier.set(_key(2), {"ok": True})
+    truncated = gzip.compress(b'{"ok": true}')[:-8]
+    with backend._lock:
+        backend._conn.execute("UPDATE responses SET body = ? WHERE key = ?", (truncated, _key(2)))
+
+    assert tier.get(_key(2)) is None
+    assert _key(2) not in tier
+    tier.close()
+
+
+def test_disk_tier_over_legacy_directory_indexes_every_entry_once(tmp_path):
+    entries = _legacy_directory(tmp_path, 2000)
+    total = sum(len(data) for data in entries.values())
+
+    tier = DiskTier(tmp_path, max_bytes=total)
+
+    assert len(tier) == 2000
+    assert tier.total_bytes == total
+    assert tier.stats.evictions == 0
+    assert not any(p.is_file() for p in tmp_path.iterdir())
+    assert tier.get(_key(123))[0] == {"n": 123}
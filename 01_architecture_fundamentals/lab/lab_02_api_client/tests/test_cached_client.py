@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from cached_client import CachedHFClient
+from serialization import canonical_key, legacy_key
+from stub_server import StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+PAYLOAD = {"inputs": "What is RAG?", "parameters": {"max_new_tokens": 10}}
+
+
+def test_cache_written_before_canonical_keys_still_hits(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    old_key = legacy_key(MODEL_ID, PAYLOAD)
+    cached = [{"generated_text": "from the old cache"}]
+    (cache_dir / f"{old_key}.json").write_text(json.dumps(cached))
+
+    with StubServer() as server:
+        with CachedHFClient("hf_test", cache_dir=str(cache_dir), base_url=server.base_url) as client:
+            assert client.query(MODEL_ID, PAYLOAD) == cached
+            assert client.query(MODEL_ID, PAYLOAD) == cached
+            assert client.pool_stats().requests == 0
+            assert old_key not in client.cache.disk
+            assert canonical_key(MODEL_ID, PAYLOAD) in client.cache.disk
+
+    # Moved for good: a fresh client finds it under the new key
+    with CachedHFClient("hf_test", cache_dir=str(cache_dir), base_url="http://127.0.0.1:9/models/") as client:
+        assert client.query(MODEL_ID, PAYLOAD) == cached
+
+
+def test_concurrent_identical_queries_make_one_upstream_call(tmp_path):
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(client.query(MODEL_ID, PAYLOAD))
+
+    with StubServer() as server:
+        with CachedHFClient("hf_test", cache_dir=str(tmp_path / "cache"), base_url=server.base_url) as client:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    assert server.requests == 1
+    assert len(results) == 8 and all(result == results[0] for result in results)
+
+
+def test_leader_rechecks_cache_after_a_flight_just_finished(tmp_path):
+    with StubServer() as server:
+        with CachedHFClient("hf_test", cache_dir=str(tmp_path / "cache"), base_url=server.base_url) as client:
+            get = client.cache.get
+            misses = []
+
+            def get_then_let_another_flight_finish(key):
+                found = get(key)
+                if not misses:
+                    # After our miss, someone else's identical query completes
+                    misses.append(key)
+                    client.query(MODEL_ID, PAYLOAD)
+                return found
+
+            client.cache.get = get_then_let_another_flight_finish
+            client.query(MODEL_ID, PAYLOAD)
+
+    assert server.requests == 1
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from requests.adapters import HTTPAdapter
+
+from hf_client import HuggingFaceClient
+from stub_server import StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+
+
+def test_pooled_adapter_counts_reused_connections():
+    with StubServer() as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            for _ in range(3):
+                client.text_generation("hi", model=MODEL_ID)
+            stats = client.pool_stats()
+
+    assert stats.requests == 3
+    assert stats.new_connections == 1
+    assert stats.hits == 2
+
+
+def test_custom_transport_reports_zeros():
+    with StubServer() as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url, transport=HTTPAdapter()) as client:
+            client.text_generation("hi", model=MODEL_ID)
+            stats = client.pool_stats()
+
+    assert (stats.requests, stats.new_connections, stats.hit_rate) == (0, 0, 0.0)
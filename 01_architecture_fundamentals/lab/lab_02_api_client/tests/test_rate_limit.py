@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from hf_client import HuggingFaceClient
+from rate_limit import AdaptiveRateLimiter, RetryBudget
+from stub_server import StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_first_throttle_sets_rate_just_below_observed_throughput():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(clock=clock)
+    for _ in range(20):
+        limiter.reserve()
+
+    limiter.on_throttle()
+    assert limiter.rate == 18.0
+    limiter.on_throttle()  # Same overload: ignored
+    assert limiter.rate == 18.0
+
+    clock.now += 1.1
+    limiter.on_throttle()
+    assert limiter.rate == 9.0
+
+
+def test_rate_grows_after_throttle_free_seconds_against_stub():
+    limiter = AdaptiveRateLimiter(initial_rate=2.0)
+    with StubServer(rate_limit_per_second=20) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url, rate_limiter=limiter) as client:
+            deadline = time.monotonic() + 2.2
+            while time.monotonic() < deadline:
+                client.text_generation("hi", model=MODEL_ID)
+
+    assert limiter.throttles == 0
+    assert limiter.rate == 4.0  # +1 request/second for each of the two seconds
+    assert server.requests <= 10  # Paced at 2-4/s, not as fast as the stub answers
+
+
+def test_exhausted_retry_budget_reports_the_last_429():
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.0)
+    with StubServer(rate_limit_per_second=1, retry_after_seconds=0.05) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url, retry_budget=budget,
+                               rate_limiter=AdaptiveRateLimiter(), max_retries=3) as client:
+            client.text_generation("hi", model=MODEL_ID)
+            with pytest.raises(RuntimeError, match="Last status: 429, Body: .*Rate limit reached"):
+                client.text_generation("hi", model=MODEL_ID)
+
+    assert budget.denied == 1
+    assert server.requests == 2  # The denied retry was never sent
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from hf_client import HuggingFaceClient
+from model_readiness import FAILED, LOADING, READY
+from stub_server import StubHandler, StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+OTHER_MODEL_ID = "facebook/bart-large-cnn"
+
+
+class ProxyErrorHandler(StubHandler):
+    """The first request gets a non-JSON 503, as from a proxy in front of the API."""
+
+    def do_POST(self):
+        with self.server.lock:
+            first = self.server.requests == 0
+        if not first:
+            return super().do_POST()
+        with self.server.lock:
+            self.server.requests += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        data = b"<html>503 Service Unavailable</html>"
+        self.send_response(503)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def test_warmup_reports_loading_then_ready():
+    with StubServer(cold_start_seconds=0.6) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            client.warmup([MODEL_ID])
+            time.sleep(0.2)
+            status = client.model_status(MODEL_ID)
+            assert status.state == LOADING
+            assert 0 < status.estimated_time <= 0.6
+            assert client.first_ready([MODEL_ID]) == MODEL_ID  # Loading, but not failed
+
+            assert client.wait_until_ready(MODEL_ID, timeout=5)
+            assert client.model_status(MODEL_ID).state == READY
+            assert server.requests >= 2
+
+
+def test_each_stub_server_starts_cold():
+    with StubServer(cold_start_seconds=5) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            client.warmup([MODEL_ID], timeout=0.1, background=False)
+            assert client.model_status(MODEL_ID).state == FAILED
+
+    with StubServer(cold_start_seconds=5) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            client.warmup([MODEL_ID], timeout=0.1, background=False)
+            assert client.model_status(MODEL_ID).state == FAILED  # Not "ready" from the first server
+
+
+def test_warmup_survives_non_json_503():
+    with StubServer(handler=ProxyErrorHandler) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            # No estimate in the body: the default is cut short by the timeout
+            client.warmup([MODEL_ID], timeout=1, background=False)
+            assert client.model_status(MODEL_ID).state == READY
+            assert server.requests == 2
+
+
+def test_first_ready_prefers_a_loaded_model():
+    with StubServer() as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            client.readiness.mark_loading(MODEL_ID, 10)
+            client.warmup([OTHER_MODEL_ID], background=False)
+            assert client.first_ready([MODEL_ID, OTHER_MODEL_ID]) == OTHER_MODEL_ID
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from hf_client import HuggingFaceClient
+from rate_limit import AdaptiveRateLimiter, RetryBudget
+from replay import Cassette, CassetteMiss, RecordingAdapter, ReplayAdapter
+from stub_server import StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+
+
+def _client(base_url: str, transport, **kwargs) -> HuggingFaceClient:
+    return HuggingFaceClient(
+        "hf_secret_token", base_url=base_url, transport=transport,
+        rate_limiter=AdaptiveRateLimiter(), retry_budget=RetryBudget(), **kwargs,
+    )
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = tmp_path / "cassette.json"
+    with StubServer(stream_token_delay=0.0) as server:
+        base_url = server.base_url
+        with _client(base_url, RecordingAdapter(Cassette(path))) as client:
+            text = client.text_generation("Explain RAG", model=MODEL_ID)
+            tokens = list(client.text_generation_stream("Explain RAG", model=MODEL_ID))
+        recorded_requests = server.requests
+
+    assert recorded_requests == 2
+    assert "hf_secret_token" not in path.read_text(encoding="utf-8")
+
+    # The server is gone: everything below comes from the cassette
+    replay = ReplayAdapter(Cassette(path), time_scale=0)
+    with _client(base_url, replay) as client:
+        assert client.text_generation("Explain RAG", model=MODEL_ID) == text
+        assert list(client.text_generation_stream("Explain RAG", model=MODEL_ID)) == tokens
+        with pytest.raises(CassetteMiss):
+            client.text_generation("Something never recorded", model=MODEL_ID)
+
+    assert (replay.stats.replayed, replay.stats.misses) == (2, 1)
+
+
+def test_fault_503_exhausts_retries_with_last_status(tmp_path):
+    path = tmp_path / "cassette.json"
+    with StubServer() as server:
+        base_url = server.base_url
+        with _client(base_url, RecordingAdapter(Cassette(path))) as client:
+            client.text_generation("hi", model=MODEL_ID)
+
+    replay = ReplayAdapter(Cassette(path), time_scale=0, fault_503=1.0, estimated_time=0.01, seed=1)
+    with _client(base_url, replay, max_retries=2) as client:
+        with pytest.raises(RuntimeError, match="Last status: 503, Body: .*currently loading"):
+            client.text_generation("hi", model=MODEL_ID)
+
+    assert replay.stats.faults_503 == 2
+    assert replay.stats.replayed == 0
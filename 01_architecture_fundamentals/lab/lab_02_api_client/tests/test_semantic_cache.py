@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from cached_client import CachedHFClient
+from semantic_cache import SemanticCache, VectorIndex
+from stub_server import StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+
+
+def _unit(i: int, dim: int = 8) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i % dim] = 1.0
+    return vector
+
+
+def test_full_index_overwrites_oldest_slot_in_place():
+    index = VectorIndex(dim=8, max_entries=4)
+    for i in range(6):
+        index.add(_unit(i), f"k{i}", f"p{i}")
+
+    assert len(index) == 4
+    assert index._vectors.shape[0] == 4  # Never grows past max_entries
+    assert index.nearest(_unit(0))[0] != "k0"  # k0 and k1 were overwritten by k4, k5
+    assert index.nearest(_unit(5))[:2] == ("k5", "p5")
+    assert index.nearest(_unit(2))[0] == "k2"
+
+
+def test_removed_slot_is_never_returned_and_is_reused():
+    index = VectorIndex(dim=8, max_entries=4)
+    for i in range(3):
+        index.add(_unit(i), f"k{i}", f"p{i}")
+    index.remove("k1")
+
+    assert index.nearest(_unit(1))[0] != "k1"
+    index.add(_unit(3), "k3", "p3")
+    assert len(index) == 3
+    assert len(index._keys) == 3
+
+
+def test_semantic_hit_counts_only_when_entry_is_served(tmp_path):
+    semantic = SemanticCache(threshold=0.8)
+    with StubServer() as server:
+        client = CachedHFClient(
+            "hf_test", cache_dir=str(tmp_path / "cache"), base_url=server.base_url,
+            semantic_cache=semantic,
+        )
+        client.query(MODEL_ID, {"inputs": "What is the capital of France?"})
+        assert client.query(MODEL_ID, {"inputs": "what is the capital of france ?"}) is not None
+        assert semantic.stats.hits == 1
+
+        # Evict everything behind the index's back
+        for key in list(client.cache.memory._entries):
+            client.cache.delete(key)
+        client.query(MODEL_ID, {"inputs": "What is the capital of France ?"}, use_cache=True)
+        client.close()
+
+    assert semantic.stats.lookups == 3
+    assert semantic.stats.hits == 1
+    assert semantic.summary()["indexed"] == 1  # Stale vector dropped, fresh one added
@@ -0,0 +1,38 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from async_hf_client import AsyncHuggingFaceClient
+from hf_client import HuggingFaceClient
+from stub_server import StubHandler, StubServer
+
+MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+PROMPT = "café 日本 naïve — ✓"
+
+
+class FastHandler(StubHandler):
+    stream_token_delay = 0.0
+
+
+def test_sync_stream_decodes_utf8_tokens():
+    with StubServer(handler=FastHandler) as server:
+        with HuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            stream = client.text_generation_stream(PROMPT, model=MODEL_ID)
+            tokens = list(stream)
+
+    assert tokens == ["Echo:", " café", " 日本", " naïve", " —", " ✓"]
+    assert stream.stats.generated_text == f"Echo: {PROMPT}"
+
+
+def test_async_stream_decodes_utf8_tokens():
+    async def collect():
+        async with AsyncHuggingFaceClient(token="hf_test", base_url=server.base_url) as client:
+            stream = await client.text_generation_stream(PROMPT, model=MODEL_ID)
+            return [token async for token in stream]
+
+    with StubServer(handler=FastHandler) as server:
+        tokens = asyncio.run(collect())
+
+    assert "".join(tokens) == f"Echo: {PROMPT}"
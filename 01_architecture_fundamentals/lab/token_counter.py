@@ -0,0 +1,180 @@
+"""
+Lab 1 — Extension: Token Counting Service
+
+Reusable, fast token counting on top of tiktoken:
+
+- encoders are built once per process and shared by every counter
+- count() / count_batch() only need the length, so they never decode tokens
+- count_batch() encodes cache misses with tiktoken's multithreaded batch API
+- an LRU of recent counts answers repeated texts without re-encoding
+- token_pieces() decodes a breakdown in one call instead of one per token
+
+    counter = TokenCounter("gpt-4")
+    counter.count_batch(documents)      # list[int]
+    counter.total(documents)            # int
+
+Run this file to time a synthetic 100k-document corpus:
+
+    python token_counter.py --documents 100000
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import tiktoken
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model: str) -> tiktoken.Encoding:
+    """Encoder for a model name ("gpt-4") or encoding name ("cl100k_base")."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(model)
+
+
+class TokenCounter:
+    """
+    Counts tokens for one encoding. Thread-safe; special-token strings such
+    as "<|endoftext|>" are counted as ordinary text rather than rejected.
+    """
+
+    def __init__(self, model: str = "gpt-4", cache_size: int = 10_000, num_threads: int | None = None):
+        """
+        Args:
+            model: Model or encoding name understood by tiktoken
+            cache_size: Texts whose counts are remembered (0 disables the LRU)
+            num_threads: Threads for batch encoding (default: CPU count)
+        """
+        self.encoder = get_encoder(model)
+        self.cache_size = cache_size
+        self.num_threads = num_threads or os.cpu_count() or 4
+        self.hits = 0
+        self.misses = 0
+        self._counts: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, text: str) -> int | None:
+        with self._lock:
+            count = self._counts.get(text)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(text)
+            self.hits += 1
+            return count
+
+    def _remember(self, texts: list[str], counts: list[int]):
+        if not self.cache_size:
+            return
+        with self._lock:
+            for text, count in zip(texts, counts):
+                self._counts[text] = count
+                self._counts.move_to_end(text)
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+
+    def encode(self, text: str) -> list[int]:
+        return self.encoder.encode_ordinary(text)
+
+    def encode_batch(self, texts: list[str]) -> list[list[int]]:
+        """Token IDs for many texts, encoded in parallel."""
+        if self.num_threads == 1:
+            # The thread pool only adds overhead without a second core
+            return [self.encoder.encode_ordinary(text) for text in texts]
+        return self.encoder.encode_ordinary_batch(texts, num_threads=self.num_threads)
+
+    def count(self, text: str) -> int:
+        count = self._cached(text)
+        if count is None:
+            count = len(self.encode(text))
+            self._remember([text], [count])
+        return count
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        """Token count per text; only uncached texts are encoded."""
+        counts: list[int | None] = [self._cached(text) for text in texts]
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            # Encode each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = {
+                text: len(tokens) for text, tokens in zip(unique, self.encode_batch(unique))
+            }
+            self._remember(unique, list(encoded.values()))
+            for i in missing:
+                counts[i] = encoded[texts[i]]
+        return counts
+
+    def total(self, texts: list[str]) -> int:
+        return sum(self.count_batch(texts))
+
+    def token_pieces(self, text: str) -> list[str]:
+        """The text split into its tokens, decoded for display."""
+        pieces = self.encoder.decode_tokens_bytes(self.encode(text))
+        return [piece.decode("utf-8", errors="replace") for piece in pieces]
+
+    def cache_info(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._counts),
+            }
+
+
+_counters: dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(model: str = "gpt-4") -> TokenCounter:
+    """Shared counter per encoding — models with the same encoding share one LRU."""
+    name = get_encoder(model).name
+    with _counters_lock:
+        if name not in _counters:
+            _counters[name] = TokenCounter(name)
+        return _counters[name]
+
+
+def _synthetic_corpus(documents: int) -> list[str]:
+    words = (
+        "transformer attention token budget latency context window embedding "
+        "retrieval cost model inference prompt الذكاء 你好 def return {} [] 2025"
+    ).split()
+    return [
+        f"doc {i}: " + " ".join(words[(i * 7 + j) % len(words)] for j in range(20 + i % 200))
+        for i in range(documents)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time token counting over a synthetic corpus")
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--model", default="gpt-4")
+    args = parser.parse_args()
+
+    corpus = _synthetic_corpus(args.documents)
+    counter = TokenCounter(args.model, cache_size=0)
+
+    start = time.perf_counter()
+    total = sum(len(counter.encode(text)) for text in corpus)
+    serial_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = counter.total(corpus)
+    batch_s = time.perf_counter() - start
+    assert batched == total
+
+    print(f"{args.documents:,} documents, {total:,} tokens ({counter.encoder.name})")
+    print(f"  one at a time : {serial_s:6.2f}s")
+    print(f"  count_batch   : {batch_s:6.2f}s  ({counter.num_threads} threads)")
+
+
+if __name__ == "__main__":
+    main()
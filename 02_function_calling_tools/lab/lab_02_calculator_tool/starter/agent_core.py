@@ -10,12 +10,15 @@ Implements the two-call pattern:
 import os
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from pydantic import ValidationError
 from calculator import get_tool_schemas, execute_tool, CalculationRequest
+from conversation_memory import ConversationMemory
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -23,10 +26,74 @@ logger = logging.getLogger(__name__)
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# Tool calls from one turn run concurrently, at most this many at a time
+TOOL_MAX_WORKERS = 8
+TOOL_TIMEOUT_SECONDS = 30.0
+
+
+def run_tool_call(tool_call) -> Dict[str, Any]:
+    """Validates and executes one tool call; always returns a structured result."""
+    tool_name = tool_call.function.name
+    raw_arguments = tool_call.function.arguments
+
+    try:
+        if tool_name == "execute_calculation":
+            # Pydantic validation
+            request = CalculationRequest.model_validate_json(raw_arguments)
+            # Execute with validated arguments
+            result = execute_tool(tool_name, request.model_dump())
+        else:
+            result = {"success": False, "error": f"Unknown tool: {tool_name}"}
+    except ValidationError as e:
+        result = {"success": False, "error": f"Validation Error: {e}"}
+    except json.JSONDecodeError:
+        result = {"success": False, "error": "Invalid JSON arguments"}
+    return result
+
+
+def execute_tool_calls(tool_calls, timeout: float = TOOL_TIMEOUT_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Runs all tool calls of one turn concurrently and waits for every one to
+    settle. Returns results in the same order as `tool_calls`.
+
+    Each call gets at most `timeout` seconds from submission (time spent
+    queued for a worker counts). A call that fails or times out yields an
+    error result instead of raising.
+
+    Every turn gets its own pool (up to TOOL_MAX_WORKERS threads). A timed-out
+    call cannot be interrupted, so it keeps its thread until it returns, but
+    later turns do not wait behind it.
+    """
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(len(tool_calls), TOOL_MAX_WORKERS)), thread_name_prefix="tool-call"
+    )
+    try:
+        futures = [pool.submit(run_tool_call, tool_call) for tool_call in tool_calls]
+        wait(futures, timeout=timeout)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for tool_call, future in zip(tool_calls, futures):
+        if future.cancelled() or not future.done():
+            # Still queued (shutdown() cancelled it) or running (abandoned)
+            logger.warning(f"Tool call {tool_call.id} timed out after {timeout}s")
+            results.append({"success": False, "error": f"Tool call timed out after {timeout}s"})
+        elif future.exception() is not None:
+            logger.error(f"Tool call {tool_call.id} failed: {future.exception()}")
+            results.append({"success": False, "error": f"Tool error: {future.exception()}"})
+        else:
+            results.append(future.result())
+
+    logger.info(f"Executed {len(tool_calls)} tool call(s) in {time.perf_counter() - start:.2f}s")
+    return results
+
 
 def get_ai_response_with_tools(
     messages: List[Dict[str, Any]],
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    memory: ConversationMemory | None = None
 ) -> Dict[str, Any]:
     """
     Sends messages to OpenAI, handling tool calls if returned.
@@ -39,10 +106,14 @@ def get_ai_response_with_tools(
     Args:
         messages: The conversation history
         model: The OpenAI model to use
+        memory: If given, compacts `messages` in place to its token budget
+            before each API call
 
     Returns:
         {"response_text": str, "tool_results": list}
     """
+    if memory is not None:
+        memory.compact(messages)
 
     # --- First API Call ---
     try:
@@ -70,23 +141,11 @@ def get_ai_response_with_tools(
         # Append the assistant's message (with tool_calls) to messages
         messages.append(response_message)
 
-        for tool_call in response_message.tool_calls:
-            tool_name = tool_call.function.name
-            raw_arguments = tool_call.function.arguments
-            
-            try:
-                if tool_name == "execute_calculation":
-                    # Pydantic validation
-                    request = CalculationRequest.model_validate_json(raw_arguments)
-                    # Execute with validated arguments
-                    result = execute_tool(tool_name, request.model_dump())
-                else:
-                    result = {"success": False, "error": f"Unknown tool: {tool_name}"}
-            except ValidationError as e:
-                result = {"success": False, "error": f"Validation Error: {e}"}
-            except json.JSONDecodeError:
-                 result = {"success": False, "error": "Invalid JSON arguments"}
+        # Run the calls concurrently; results come back in tool_call order,
+        # once every call has finished or timed out
+        results = execute_tool_calls(response_message.tool_calls)
 
+        for tool_call, result in zip(response_message.tool_calls, results):
             # Append tool result
             messages.append({
                 "role": "tool",
@@ -95,6 +154,9 @@ def get_ai_response_with_tools(
             })
             tool_results.append(result)
 
+        if memory is not None:
+            memory.compact(messages, stage="tool_results")
+
         # Second API call: send updated messages → get final answer
         second_response = client.chat.completions.create(
             model=model, messages=messages, temperature=0.1
@@ -121,6 +183,7 @@ if __name__ == "__main__":
     messages = [
         {"role": "system", "content": "You are a helpful assistant with access to a calculator tool. Use it for any mathematical calculations."}
     ]
+    memory = ConversationMemory(max_tokens=3000)
 
     while True:
         user_input = input("\nYou: ").strip()
@@ -128,12 +191,15 @@ if __name__ == "__main__":
             break
 
         messages.append({"role": "user", "content": user_input})
-        result = get_ai_response_with_tools(messages)
+        result = get_ai_response_with_tools(messages, memory=memory)
 
         print(f"\nAssistant: {result['response_text']}")
 
         if result["tool_results"]:
             print(f"  [Tools used: {len(result['tool_results'])}]")
+        saved = memory.tokens_saved_in_turn()
+        if saved:
+            print(f"  [History compacted: {saved} tokens saved this turn]")
 
         # Add assistant response to history
         messages.append({"role": "assistant", "content": result["response_text"]})
@@ -0,0 +1,227 @@
+"""
+Lab 2: Async Agent Core — Many Conversations per Process
+==========================================================
+The same two-call pattern as agent_core.py, on OpenAI's AsyncOpenAI client.
+One client (and its pooled HTTP connections) is shared by every
+conversation, so a single process can serve many at once:
+
+    client = create_async_client()
+    results = await asyncio.gather(*(
+        get_ai_response_with_tools_async(history, client=client) for history in conversations
+    ))
+    await client.close()
+
+Calls without `client=` share a default client for the running event loop,
+created on first use; close it with close_default_async_client().
+
+Tool calls run on one bounded thread pool shared by every conversation,
+concurrently and with per-call timeouts. A timed-out call keeps its worker
+until it returns, so tools that hang indefinitely shrink the pool for
+everyone.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from agent_core import TOOL_MAX_WORKERS, TOOL_TIMEOUT_SECONDS, run_tool_call
+from calculator import get_tool_schemas
+from conversation_memory import ConversationMemory
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+def create_async_client(
+    base_url: str | None = None,
+    api_key: str | None = None,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    timeout: float = 60.0,
+) -> AsyncOpenAI:
+    """
+    Builds one AsyncOpenAI client to share across conversations.
+    Create it inside the event loop that will use it.
+
+    Args:
+        base_url: API base URL (default: OpenAI, or OPENAI_BASE_URL)
+        api_key: API key (default: OPENAI_API_KEY)
+        max_connections: Hard limit on open connections; extra requests wait
+        max_keepalive_connections: Idle connections kept for reuse
+        timeout: Per-request timeout in seconds
+    """
+    return AsyncOpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=base_url,
+        timeout=timeout,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            )
+        ),
+    )
+
+
+# Tool calls from every conversation share this bounded pool
+tool_pool = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool-call")
+
+
+# One default client per event loop: an httpx pool cannot be shared across loops
+_default_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+
+def get_default_async_client() -> AsyncOpenAI:
+    """The shared client for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _default_clients.get(loop)
+    if client is None:
+        client = _default_clients[loop] = create_async_client()
+    return client
+
+
+async def close_default_async_client():
+    """Closes the running loop's default client (if one was created)."""
+    client = _default_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+async def execute_tool_calls_async(
+    tool_calls, timeout: float = TOOL_TIMEOUT_SECONDS
+) -> List[Dict[str, Any]]:
+    """
+    Async counterpart of agent_core.execute_tool_calls (same ordering and
+    errors), on the shared tool_pool instead of a pool per turn.
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    async def run_one(tool_call) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(tool_pool, run_tool_call, tool_call), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool call {tool_call.id} timed out after {timeout}s")
+            return {"success": False, "error": f"Tool call timed out after {timeout}s"}
+        except Exception as e:
+            logger.error(f"Tool call {tool_call.id} failed: {e}")
+            return {"success": False, "error": f"Tool error: {e}"}
+
+    results = await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+    logger.info(f"Executed {len(tool_calls)} tool call(s) in {time.perf_counter() - start:.2f}s")
+    return list(results)
+
+
+async def get_ai_response_with_tools_async(
+    messages: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    client: AsyncOpenAI | None = None,
+    memory: ConversationMemory | None = None,
+) -> Dict[str, Any]:
+    """
+    Async version of agent_core.get_ai_response_with_tools.
+
+    Args:
+        messages: The conversation history (appended to, as in the sync version)
+        model: The OpenAI model to use
+        client: Shared AsyncOpenAI client (see create_async_client);
+            default: the running loop's client from get_default_async_client()
+        memory: Per-conversation ConversationMemory (compacts `messages` in place)
+
+    Returns:
+        {"response_text": str, "tool_results": list}
+    """
+    client = client or get_default_async_client()
+    if memory is not None:
+        memory.compact(messages)
+
+    # --- First API Call ---
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=get_tool_schemas(),
+            tool_choice="auto",
+            temperature=0.1,
+        )
+    except Exception as e:
+        logger.error(f"OpenAI API call failed: {e}")
+        return {
+            "response_text": "I'm having trouble connecting. Please try again.",
+            "tool_results": []
+        }
+
+    response_message = response.choices[0].message
+    tool_results = []
+
+    # --- Check for Tool Calls ---
+    if response_message.tool_calls:
+        logger.info(f"Model initiated {len(response_message.tool_calls)} tool call(s).")
+        messages.append(response_message)
+
+        # All calls settle (or time out) before the second call; order is preserved
+        results = await execute_tool_calls_async(response_message.tool_calls)
+        for tool_call, result in zip(response_message.tool_calls, results):
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": json.dumps(result)
+            })
+            tool_results.append(result)
+
+        if memory is not None:
+            memory.compact(messages, stage="tool_results")
+
+        # Second API call: send updated messages → get final answer
+        second_response = await client.chat.completions.create(
+            model=model, messages=messages, temperature=0.1
+        )
+        response_text = second_response.choices[0].message.content
+
+    else:
+        response_text = response_message.content
+
+    return {
+        "response_text": response_text,
+        "tool_results": tool_results
+    }
+
+
+# =============================================================================
+# Demo: several conversations at once
+# =============================================================================
+async def _demo():
+    client = create_async_client()
+    questions = [
+        "What is 15% of 500?",
+        "What is 2 to the power of 16?",
+        "Divide 1234 by 7.",
+    ]
+    conversations = [
+        [
+            {"role": "system", "content": "You are a helpful assistant with access to a calculator tool. Use it for any mathematical calculations."},
+            {"role": "user", "content": question},
+        ]
+        for question in questions
+    ]
+    results = await asyncio.gather(
+        *(get_ai_response_with_tools_async(messages, client=client) for messages in conversations)
+    )
+    for question, result in zip(questions, results):
+        print(f"\nYou: {question}\nAssistant: {result['response_text']}")
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -10,7 +10,17 @@ Implement a production-ready calculator tool with:
 import json
 import logging
 import functools
-from typing import Dict, Any
+import operator
+from typing import Dict, Any, Callable, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to a plain loop
+    np = None
+
+from resilience import (
+    BulkheadFullError, CircuitOpenError, call_with_resilience, get_breaker, get_bulkhead,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +78,39 @@ CALCULATOR_SCHEMA = {
 # Step 2: Implement the Execution Function
 # =============================================================================
 
+def _divide(a: float, b: float) -> float:
+    if b == 0:
+        raise ZeroDivisionError("Division by zero is not allowed")
+    return a / b
+
+
+# Operation table shared by the single-call and batch paths
+OPERATIONS: Dict[str, Callable[[float, float], float]] = {
+    Operation.ADD.value: operator.add,
+    Operation.SUBTRACT.value: operator.sub,
+    Operation.MULTIPLY.value: operator.mul,
+    Operation.DIVIDE.value: _divide,
+    Operation.POW.value: operator.pow,
+}
+
+
+def _calculate(operation: str, operand_a: Any, operand_b: Any) -> Dict[str, Any]:
+    """Looks up and applies one operation; returns the structured result."""
+    func = OPERATIONS.get(operation) if isinstance(operation, str) else None
+    if func is None:
+        return {"success": False, "result": None, "error": f"Unsupported operation: {operation}"}
+    try:
+        result = func(float(operand_a), float(operand_b))
+    except ZeroDivisionError:
+        return {"success": False, "result": None, "error": "Division by zero is not allowed"}
+    except Exception as e:
+        return {"success": False, "result": None, "error": f"Calculation error: {str(e)}"}
+    if isinstance(result, complex):
+        # e.g. a negative base raised to a fractional power
+        return {"success": False, "result": None, "error": "Calculation error: result is not a real number"}
+    return {"success": True, "result": result, "error": None}
+
+
 def execute_calculation(operation: str, operand_a: float, operand_b: float) -> Dict[str, Any]:
     """
     Performs the calculation and returns a structured result.
@@ -85,35 +128,123 @@ def execute_calculation(operation: str, operand_a: float, operand_b: float) -> D
     """
     logger.info(f"Executing calculation: {operand_a} {operation} {operand_b}")
 
-    result = None
-    error = None
-
-    try:
-        # TODO: Implement the operation logic
-        # - "add": operand_a + operand_b
-        # - "subtract": operand_a - operand_b
-        # - "multiply": operand_a * operand_b
-        # - "divide": operand_a / operand_b (handle division by zero!)
-        # - "pow": operand_a ** operand_b
-        # - anything else: set error to "Unsupported operation: {operation}"
-        pass
-    except Exception as e:
-        error = f"Calculation error: {str(e)}"
+    # Dispatch through OPERATIONS; division by zero and unknown operations
+    # come back as structured errors
+    response = _calculate(operation, operand_a, operand_b)
 
     # Build the response
-    if error:
-        logger.warning(f"Calculation failed: {error}")
-        return {"success": False, "result": None, "error": error}
+    if response["error"]:
+        logger.warning(f"Calculation failed: {response['error']}")
     else:
-        logger.info(f"Calculation successful: {result}")
-        return {"success": True, "result": result, "error": None}
+        logger.info(f"Calculation successful: {response['result']}")
+    return response
+
+
+# Element-wise NumPy equivalents. pow is left out on purpose: np.power can
+# differ from Python's ** in the last bit, and results must match exactly.
+_VECTOR_OPERATIONS = {
+    Operation.ADD.value: operator.add,
+    Operation.SUBTRACT.value: operator.sub,
+    Operation.MULTIPLY.value: operator.mul,
+    Operation.DIVIDE.value: operator.truediv,
+}
+
+
+def _is_real_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _calculate_vectorized(operation: str, operands_a: list, operands_b: list) -> List[Dict[str, Any]] | None:
+    """
+    One NumPy pass over a same-operation group; None unless every operand is
+    an int or float (NumPy would quietly turn None into nan, where float()
+    raises).
+    """
+    if not all(map(_is_real_number, operands_a)) or not all(map(_is_real_number, operands_b)):
+        return None
+    try:
+        a = np.asarray(operands_a, dtype=np.float64)
+        b = np.asarray(operands_b, dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    zero = b == 0 if operation == Operation.DIVIDE.value else np.zeros(len(b), dtype=bool)
+    with np.errstate(all="ignore"):
+        values = _VECTOR_OPERATIONS[operation](a, np.where(zero, 1.0, b))
+    return [
+        {"success": False, "result": None, "error": "Division by zero is not allowed"}
+        if is_zero else {"success": True, "result": value, "error": None}
+        for value, is_zero in zip(values.tolist(), zero.tolist())
+    ]
+
+
+def _call_one(request: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return _calculate(request["operation"], request["operand_a"], request["operand_b"])
+    except KeyError as e:
+        return {"success": False, "result": None, "error": f"Missing argument: {e.args[0]}"}
+
+
+def execute_calculation_batch(
+    requests: Sequence[Dict[str, Any]], min_vector_size: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Runs many calculations, e.g. all parallel tool calls from one LLM turn.
+
+    Each request is a dict of execute_calculation() arguments. Returns one
+    {"success", "result", "error"} dict per request, in order, identical to
+    what execute_calculation() would return for it. Requests are grouped by
+    operation; groups of at least `min_vector_size` are computed with NumPy
+    (when installed), the rest through the operation table. Logs once per
+    batch instead of once per call.
+    """
+    results: List[Dict[str, Any] | None] = [None] * len(requests)
+    groups: Dict[str, List[int]] = {}
+    for i, request in enumerate(requests):
+        if not isinstance(request, dict):
+            results[i] = {
+                "success": False, "result": None,
+                "error": f"Invalid request: expected an object of arguments, got {type(request).__name__}",
+            }
+        elif isinstance(request.get("operation"), str):
+            groups.setdefault(request["operation"], []).append(i)
+        else:
+            # Missing or non-string operation: the single-call path reports it
+            results[i] = _call_one(request)
+
+    for operation, indices in groups.items():
+        group = None
+        if np is not None and operation in _VECTOR_OPERATIONS and len(indices) >= min_vector_size:
+            try:
+                operands_a = [requests[i]["operand_a"] for i in indices]
+                operands_b = [requests[i]["operand_b"] for i in indices]
+            except KeyError:
+                pass
+            else:
+                group = _calculate_vectorized(operation, operands_a, operands_b)
+        if group is None:
+            group = [_call_one(requests[i]) for i in indices]
+        for i, result in zip(indices, group):
+            results[i] = result
+
+    failures = sum(not result["success"] for result in results)
+    logger.info(f"Executed {len(requests)} calculations in batch ({failures} failed)")
+    return results
 
 
 # =============================================================================
 # Step 3: Build the Resilient API Call Decorator
 # =============================================================================
 
-def resilient_api_call(max_retries: int = 2, timeout_seconds: int = 10):
+def resilient_api_call(
+    max_retries: int = 2,
+    timeout_seconds: float = 10,
+    endpoint: str | None = None,
+    backoff_base: float = 0.5,
+    backoff_max: float = 8.0,
+    failure_threshold: int = 5,
+    recovery_timeout: float = 30.0,
+    max_concurrent: int = 10,
+):
     """
     A decorator that adds retries with exponential backoff to any function
     that makes an external API call.
@@ -125,27 +256,41 @@ def resilient_api_call(max_retries: int = 2, timeout_seconds: int = 10):
 
     Args:
         max_retries: Number of retry attempts after the initial call
-        timeout_seconds: Timeout in seconds for external requests
+        timeout_seconds: Timeout in seconds for each attempt (enforced)
+        endpoint: Name of the dependency; functions sharing a name share its
+            circuit breaker and bulkhead (default: the function's name)
+        backoff_base: First backoff ceiling in seconds (doubles per retry, full jitter)
+        backoff_max: Largest backoff ceiling in seconds
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds the circuit stays open before a trial call
+        max_concurrent: Calls allowed in flight to the endpoint at once
+
+    Failures are returned, not raised:
+        {"success": False, "error": "Service unavailable after retries: ..."}
+    Metrics: resilience.metrics.snapshot()
     """
     def decorator(func):
+        name = endpoint or func.__qualname__
+        breaker = get_breaker(name, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
+        bulkhead = get_bulkhead(name, max_concurrent=max_concurrent)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # TODO: Implement retry logic
-            # Option A (recommended): Use tenacity library
-            #   from tenacity import retry, stop_after_attempt, wait_exponential
-            #   Wrap the function call with retry behavior
-            #
-            # Option B (manual): Use a for loop with time.sleep
-            #   for attempt in range(max_retries + 1):
-            #       try: return func(*args, **kwargs)
-            #       except: time.sleep(2 ** attempt)
-            #
-            # On final failure, return:
-            #   {"success": False, "error": "Service unavailable after retries"}
             try:
-                return func(*args, **kwargs)
+                return call_with_resilience(
+                    func, args, kwargs,
+                    endpoint=name,
+                    max_retries=max_retries,
+                    timeout_seconds=timeout_seconds,
+                    backoff_base=backoff_base,
+                    backoff_max=backoff_max,
+                    breaker=breaker,
+                    bulkhead=bulkhead,
+                )
+            except (CircuitOpenError, BulkheadFullError) as e:
+                return {"success": False, "error": f"Service unavailable: {e}"}
             except Exception as e:
-                return {"success": False, "error": f"Service error: {str(e)}"}
+                return {"success": False, "error": f"Service unavailable after retries: {e}"}
         return wrapper
     return decorator
 
@@ -177,3 +322,10 @@ if __name__ == "__main__":
     print(execute_calculation("add", 10, 5))
     print(execute_calculation("divide", 10, 0))
     print(execute_calculation("pow", 2, 10))
+
+    # Batch mode: one call for many requests
+    print(execute_calculation_batch([
+        {"operation": "multiply", "operand_a": 200, "operand_b": 0.15},
+        {"operation": "divide", "operand_a": 1, "operand_b": 0},
+        {"operation": "modulo", "operand_a": 7, "operand_b": 2},
+    ]))
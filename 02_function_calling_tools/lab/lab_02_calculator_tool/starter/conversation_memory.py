@@ -0,0 +1,295 @@
+"""
+Lab 2: Conversation Memory — Token-Budgeted History
+=====================================================
+The chat loop appends every user, assistant and tool message forever, so
+prompt tokens (and latency and cost) grow with session length.
+ConversationMemory keeps a history list under a token budget, in place:
+
+  1. System messages and the most recent messages are never touched
+  2. Older tool results are collapsed to their essentials
+  3. If still over budget, the oldest turns are folded into one summary
+     message (or just dropped when summarizer=None)
+
+    memory = ConversationMemory(max_tokens=2000)
+    result = get_ai_response_with_tools(messages, memory=memory)
+    print(memory.metrics())
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to ~4 characters per token
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators per message (OpenAI's estimate)
+
+_MESSAGE_KEYS = ("role", "content", "name", "tool_calls", "tool_call_id")
+
+Summarizer = Callable[[Optional[str], List[Dict[str, Any]]], str]
+
+
+def _char_estimate(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+@lru_cache(maxsize=None)
+def default_token_counter(encoding: str = "o200k_base") -> Callable[[str], int]:
+    """tiktoken count for gpt-4o-family models, or a character estimate without it."""
+    if tiktoken is not None:
+        try:
+            encoder = tiktoken.get_encoding(encoding)
+            return lambda text: len(encoder.encode_ordinary(text))
+        except Exception as e:  # e.g. the BPE file cannot be downloaded
+            logger.warning(f"tiktoken unavailable ({e}); estimating tokens from characters")
+    return _char_estimate
+
+
+def as_dict(message) -> Dict[str, Any]:
+    """Plain-dict form of a message (the SDK returns assistant messages as objects)."""
+    if isinstance(message, dict):
+        return message
+    data = message.model_dump(exclude_none=True)
+    return {key: data[key] for key in _MESSAGE_KEYS if key in data}
+
+
+def collapse_tool_result(content: str, max_chars: int = 200) -> str:
+    """
+    Compact form of a tool message's content: null fields and "success": true
+    are removed, and long output is truncated.
+
+    '{"success": true, "result": 75.0, "error": null}' -> '{"result":75.0}'
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if v is not None and not (k == "success" and v is True)}
+        content = json.dumps(data, separators=(",", ":"))
+    if len(content) > max_chars:
+        content = content[:max_chars] + "…"
+    return content
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def extractive_summary(previous: Optional[str], dropped: List[Dict[str, Any]]) -> str:
+    """
+    Summarizer without a model call: one clipped line per dropped message,
+    appended to the previous summary.
+    """
+    lines = [previous] if previous else []
+    for message in dropped:
+        role = message["role"]
+        if role == "user":
+            lines.append(f"- User: {_clip(message.get('content') or '', 120)}")
+        elif role == "assistant" and message.get("tool_calls"):
+            calls = ", ".join(
+                f"{call['function']['name']}({_clip(call['function']['arguments'], 60)})"
+                for call in message["tool_calls"]
+            )
+            lines.append(f"- Assistant called {calls}")
+        elif role == "tool":
+            lines.append(f"  -> {collapse_tool_result(message.get('content') or '', 80)}")
+        elif message.get("content"):
+            lines.append(f"- Assistant: {_clip(message['content'], 120)}")
+    return "\n".join(lines)
+
+
+def llm_summarizer(client, model: str = "gpt-4o-mini", max_words: int = 150) -> Summarizer:
+    """Summarizer that asks the model to merge dropped turns into the running summary."""
+    def summarize(previous: Optional[str], dropped: List[Dict[str, Any]]) -> str:
+        transcript = extractive_summary(None, dropped)
+        prompt = (
+            f"Update this conversation summary in at most {max_words} words. "
+            "Keep facts, numbers and user preferences.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        response = client.chat.completions.create(
+            model=model, messages=[{"role": "user", "content": prompt}], temperature=0
+        )
+        return response.choices[0].message.content.strip()
+    return summarize
+
+
+@dataclass
+class CompactionStats:
+    """What one compact() call did."""
+
+    turn: int  # User messages seen so far, including ones since dropped
+    tokens_before: int
+    tokens_after: int
+    tool_results_collapsed: int = 0
+    messages_dropped: int = 0
+    summarized: bool = False
+    stage: str = "request"  # "request" (start of a turn) or "tool_results"
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class ConversationMemory:
+    """
+    Token budget policy for a message list. compact() edits the list in
+    place, so callers keep appending to the same `messages` as before.
+
+    One ConversationMemory belongs to one conversation: it counts turns
+    from the messages appended between compact() calls.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 3000,
+        keep_recent: int = 6,
+        summarizer: Optional[Summarizer] = extractive_summary,
+        max_summary_tokens: int = 400,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Args:
+            max_tokens: Prompt budget for the whole history
+            keep_recent: Trailing messages always kept verbatim (the current
+                turn is always kept, even if it is longer)
+            summarizer: Folds dropped turns into the summary; None just drops them
+            max_summary_tokens: The summary is trimmed (oldest lines first) to this
+                size, and to at most a quarter of max_tokens
+            count_tokens: Text -> token count (default: tiktoken o200k_base)
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.summarizer = summarizer
+        self.max_summary_tokens = min(max_summary_tokens, max_tokens // 4)
+        self.count_tokens = count_tokens or default_token_counter()
+        self.stats: List[CompactionStats] = []
+        self.turns = 0
+        self._compacted_length = 0  # len(messages) after the last compact()
+
+    # --- Token accounting ---
+    def message_tokens(self, message: Dict[str, Any]) -> int:
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count_tokens(str(message.get("content") or ""))
+        for call in message.get("tool_calls") or ():
+            tokens += self.count_tokens(call["function"]["name"] + call["function"]["arguments"])
+        return tokens
+
+    def total_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.message_tokens(as_dict(m)) for m in messages)
+
+    # --- Compaction ---
+    @staticmethod
+    def _is_summary(message: Dict[str, Any]) -> bool:
+        return message["role"] == "system" and str(message.get("content", "")).startswith(SUMMARY_PREFIX)
+
+    def _recent_start(self, messages: List[Dict[str, Any]], head: int) -> int:
+        """Index where the verbatim tail begins."""
+        start = max(head, len(messages) - self.keep_recent)
+        last_user = max((i for i, m in enumerate(messages) if m["role"] == "user"), default=start)
+        start = min(start, max(head, last_user))
+        # Never separate tool results from the assistant message that requested them
+        while start > head and messages[start]["role"] == "tool":
+            start -= 1
+        return start
+
+    def _trim_summary(self, summary: str) -> str:
+        lines = summary.splitlines()
+        while len(lines) > 1 and self.count_tokens("\n".join(lines)) > self.max_summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def compact(self, messages: List[Any], stage: str = "request") -> CompactionStats:
+        """
+        Brings `messages` under max_tokens (in place) and records what it did.
+        `stage` tags the call within a turn: "request" before the first API
+        call, "tool_results" after tool messages were appended.
+        """
+        messages[:] = [as_dict(m) for m in messages]
+        # Only messages appended since the last call are new; a shorter list
+        # means the caller started over
+        new = messages[self._compacted_length:] if len(messages) >= self._compacted_length else messages
+        self.turns += sum(1 for m in new if m["role"] == "user")
+        stats = CompactionStats(self.turns, self.total_tokens(messages), 0, stage=stage)
+
+        head = 0
+        while head < len(messages) and messages[head]["role"] == "system" and not self._is_summary(messages[head]):
+            head += 1
+        summary = messages[head]["content"][len(SUMMARY_PREFIX):].strip() if (
+            head < len(messages) and self._is_summary(messages[head])
+        ) else None
+        body_start = head + (summary is not None)
+        recent = self._recent_start(messages, body_start)
+        older = messages[body_start:recent]
+        tokens = stats.tokens_before
+
+        # 1. Collapse older tool results
+        if tokens > self.max_tokens:
+            for i, message in enumerate(older):
+                if message["role"] == "tool":
+                    collapsed = collapse_tool_result(message.get("content") or "")
+                    if collapsed != message.get("content"):
+                        older[i] = {**message, "content": collapsed}
+                        stats.tool_results_collapsed += 1
+            tokens = self.total_tokens(messages[:body_start] + older + messages[recent:])
+
+        # 2. Drop (and summarize) the oldest turns until the history fits
+        dropped: List[Dict[str, Any]] = []
+        target = self.max_tokens
+        if tokens > self.max_tokens and self.summarizer is not None:
+            # Room for the summary message, prefix included
+            target -= self.max_summary_tokens + self.message_tokens({"content": SUMMARY_PREFIX})
+        while tokens > target and older:
+            end = 1
+            while end < len(older) and older[end]["role"] != "user":
+                end += 1
+            turn_messages, older = older[:end], older[end:]
+            dropped.extend(turn_messages)
+            tokens -= sum(self.message_tokens(m) for m in turn_messages)
+
+        new_head = messages[:head]
+        if dropped:
+            stats.messages_dropped = len(dropped)
+            if self.summarizer is not None:
+                summary = self._trim_summary(self.summarizer(summary, dropped))
+                stats.summarized = True
+        if summary:
+            new_head.append({"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"})
+        messages[:] = new_head + older + messages[recent:]
+
+        stats.tokens_after = self.total_tokens(messages)
+        if stats.tokens_after > self.max_tokens:
+            logger.warning(
+                f"History is {stats.tokens_after} tokens after compaction "
+                f"(budget {self.max_tokens}); the verbatim recent messages do not fit"
+            )
+        self._compacted_length = len(messages)
+        self.stats.append(stats)
+        return stats
+
+    def tokens_saved_in_turn(self, turn: Optional[int] = None) -> int:
+        """Tokens saved by every compact() pass of `turn` (default: the latest)."""
+        turn = self.turns if turn is None else turn
+        return sum(s.tokens_saved for s in self.stats if s.turn == turn)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Totals over every compact() call so far."""
+        saved = [s.tokens_saved for s in self.stats]
+        return {
+            "compactions": len(self.stats),
+            "tokens_saved_total": sum(saved),
+            "tokens_saved_last": saved[-1] if saved else 0,
+            "tokens_saved_last_turn": self.tokens_saved_in_turn(),
+            "turns": self.turns,
+            "tool_results_collapsed": sum(s.tool_results_collapsed for s in self.stats),
+            "messages_dropped": sum(s.messages_dropped for s in self.stats),
+            "history_tokens": self.stats[-1].tokens_after if self.stats else 0,
+        }
@@ -0,0 +1,133 @@
+"""
+Load test for the async agent core.
+
+Starts a local mock OpenAI server, then drives N simulated conversations
+concurrently through get_ai_response_with_tools_async() on one shared
+client. No API key or network access is needed.
+
+    python load_test.py --sessions 200 --turns 3 --latency 0.2
+    python load_test.py --sessions 50 --sync-baseline
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # agent_core builds its client at import
+
+from openai import OpenAI
+
+import agent_core
+from agent_core_async import create_async_client, get_ai_response_with_tools_async
+from mock_openai_server import MockOpenAIServer
+
+SYSTEM_PROMPT = {
+    "role": "system",
+    "content": "You are a helpful assistant with access to a calculator tool. Use it for any mathematical calculations.",
+}
+FAILURE_TEXT = "I'm having trouble connecting. Please try again."
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _question(rng: random.Random) -> str:
+    return f"What is {rng.randint(1, 999)} times {rng.randint(1, 999)}?"
+
+
+async def _session(session_id: int, turns: int, client, latencies: list, errors: list):
+    rng = random.Random(session_id)
+    messages = [SYSTEM_PROMPT]
+    for _ in range(turns):
+        messages.append({"role": "user", "content": _question(rng)})
+        start = time.perf_counter()
+        try:
+            result = await get_ai_response_with_tools_async(messages, client=client)
+        except Exception as e:
+            errors.append(repr(e))
+            return
+        latencies.append(time.perf_counter() - start)
+        if result["response_text"] == FAILURE_TEXT:
+            errors.append(FAILURE_TEXT)
+        messages.append({"role": "assistant", "content": result["response_text"]})
+
+
+async def run_async_load(base_url: str, sessions: int, turns: int, max_connections: int) -> dict:
+    client = create_async_client(
+        base_url=base_url,
+        api_key="mock",
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_session(i, turns, client, latencies, errors) for i in range(sessions)))
+    wall = time.perf_counter() - start
+    await client.close()
+    return {"turns": len(latencies), "wall_s": wall, "latencies": latencies, "errors": errors}
+
+
+def run_sync_baseline(base_url: str, sessions: int, turns: int) -> dict:
+    """The same sessions, one turn at a time through the sync agent_core."""
+    agent_core.client = OpenAI(api_key="mock", base_url=base_url)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    for session_id in range(sessions):
+        rng = random.Random(session_id)
+        messages = [SYSTEM_PROMPT]
+        for _ in range(turns):
+            messages.append({"role": "user", "content": _question(rng)})
+            turn_start = time.perf_counter()
+            result = agent_core.get_ai_response_with_tools(messages)
+            latencies.append(time.perf_counter() - turn_start)
+            if result["response_text"] == FAILURE_TEXT:
+                errors.append(FAILURE_TEXT)
+            messages.append({"role": "assistant", "content": result["response_text"]})
+    wall = time.perf_counter() - start
+    return {"turns": len(latencies), "wall_s": wall, "latencies": latencies, "errors": errors}
+
+
+def _report(label: str, stats: dict):
+    latencies = stats["latencies"]
+    print(f"\n{label}")
+    print(f"  turns       : {stats['turns']:,} in {stats['wall_s']:.2f}s "
+          f"({stats['turns'] / stats['wall_s']:.1f} turns/s)")
+    print(f"  turn latency: p50 {percentile(latencies, 50) * 1000:.0f}ms  "
+          f"p95 {percentile(latencies, 95) * 1000:.0f}ms  "
+          f"p99 {percentile(latencies, 99) * 1000:.0f}ms")
+    print(f"  errors      : {len(stats['errors'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many concurrent agent sessions against a mock OpenAI server")
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3, help="User turns per conversation")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock completion latency (seconds)")
+    parser.add_argument("--tool-calls", type=int, default=1, help="Tool calls the mock returns per turn")
+    parser.add_argument("--max-connections", type=int, default=100, help="Connection pool size")
+    parser.add_argument("--sync-baseline", action="store_true", help="Also run the sessions sequentially with agent_core")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)  # agent_core logs every call at INFO
+
+    with MockOpenAIServer(completion_latency=args.latency, tool_calls_per_turn=args.tool_calls) as server:
+        print(f"Mock OpenAI API at {server.base_url} ({args.latency * 1000:.0f}ms per completion)")
+        stats = asyncio.run(run_async_load(server.base_url, args.sessions, args.turns, args.max_connections))
+        _report(f"Async: {args.sessions} concurrent sessions x {args.turns} turns", stats)
+        if args.sync_baseline:
+            baseline = run_sync_baseline(server.base_url, args.sessions, args.turns)
+            _report(f"Sync baseline: {args.sessions} sessions run one after another", baseline)
+            print(f"\n  speed-up    : {baseline['wall_s'] / stats['wall_s']:.1f}x")
+        print(f"\nMock server handled {server.requests_served:,} completions")
+
+
+if __name__ == "__main__":
+    main()
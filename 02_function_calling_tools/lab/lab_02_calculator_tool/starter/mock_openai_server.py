@@ -0,0 +1,178 @@
+"""
+Local mock of the OpenAI Chat Completions API.
+
+Serves POST /v1/chat/completions on http://127.0.0.1:<port>/v1 so the agent
+can be load-tested without an API key or network access. It follows the
+two-call pattern:
+
+- a user message containing two numbers, sent with tools, gets
+  `tool_calls_per_turn` execute_calculation tool calls on those numbers
+- a request ending in tool results gets a text answer quoting them
+- anything else gets a plain text reply
+
+`completion_latency` simulates model time per completion.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_OPERATIONS = ("multiply", "add", "subtract", "divide")
+
+
+def _message(content: str | None = None, tool_calls: list | None = None) -> dict:
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return message
+
+
+def mock_completion(payload: dict, tool_calls_per_turn: int = 1) -> dict:
+    """Builds a chat.completion object for a request payload."""
+    messages = payload.get("messages", [])
+    last = messages[-1] if messages else {}
+    finish_reason = "stop"
+
+    if last.get("role") == "tool":
+        results = []
+        for message in reversed(messages):
+            if message.get("role") != "tool":
+                break
+            results.append(json.loads(message["content"]).get("result"))
+        message = _message(f"The result is {', '.join(map(str, reversed(results)))}.")
+    else:
+        numbers = [float(n) for n in _NUMBER.findall(str(last.get("content", "")))]
+        if payload.get("tools") and len(numbers) >= 2:
+            tool_calls = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {
+                        "name": "execute_calculation",
+                        "arguments": json.dumps(
+                            {"operation": operation, "operand_a": numbers[0], "operand_b": numbers[1]}
+                        ),
+                    },
+                }
+                for operation in itertools.islice(itertools.cycle(_OPERATIONS), tool_calls_per_turn)
+            ]
+            message = _message(tool_calls=tool_calls)
+            finish_reason = "tool_calls"
+        else:
+            message = _message("Hello! Ask me to calculate something.")
+
+    prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in messages)
+    completion_tokens = len(str(message.get("content") or "").split())
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    completion_latency: float = 0.0
+    tool_calls_per_turn: int = 1
+
+    requests_served = 0
+    _count_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output clean
+
+    def _send_json(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        with self._count_lock:
+            type(self).requests_served += 1
+        time.sleep(self.completion_latency)
+        self._send_json(200, mock_completion(payload, self.tool_calls_per_turn))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Many sessions connect at once
+
+
+class MockOpenAIServer:
+    """
+    Runs a MockOpenAIHandler on a background thread.
+
+    Usage:
+        with MockOpenAIServer(completion_latency=0.2) as server:
+            client = AsyncOpenAI(api_key="mock", base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        completion_latency: float = 0.0,
+        tool_calls_per_turn: int = 1,
+    ):
+        handler = type(
+            "Handler",
+            (MockOpenAIHandler,),
+            {"completion_latency": completion_latency, "tool_calls_per_turn": tool_calls_per_turn},
+        )
+        self.handler = handler
+        self.httpd = _Server((host, port), handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests_served(self) -> int:
+        return self.handler.requests_served
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with MockOpenAIServer(port=8081) as server:
+        print(f"Mock OpenAI API listening on {server.base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
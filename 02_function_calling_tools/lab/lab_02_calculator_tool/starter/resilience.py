@@ -0,0 +1,406 @@
+"""
+Lab 2: Resilience Layer for External Tool Calls
+=================================================
+The pieces behind calculator.resilient_api_call:
+
+- per-attempt timeouts, enforced by running each attempt on a worker thread
+- exponential backoff with full jitter between attempts
+- a per-endpoint CircuitBreaker (closed → open → half-open) so a dead
+  dependency fails fast instead of burning every caller's retries
+- a per-endpoint Bulkhead capping calls in flight to one dependency
+- metrics: latency histograms and breaker state transitions
+
+    from resilience import metrics
+    print(metrics.snapshot())
+"""
+
+import bisect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open; the call was not attempted."""
+
+
+class BulkheadFullError(Exception):
+    """Too many calls to the endpoint are already in flight."""
+
+
+class AttemptTimeoutError(TimeoutError):
+    """One attempt exceeded its timeout (a running worker is abandoned)."""
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus-style, non-cumulative counts)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = pct / 100 * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(zip((f"le_{b:g}" for b in self.buckets), self.counts))
+            count, total = self.count, self.total
+        return {
+            "count": count,
+            "mean_s": total / count if count else 0.0,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+            "buckets": counts,
+        }
+
+
+class ResilienceMetrics:
+    """Per-endpoint counters, latency histograms and breaker transitions."""
+
+    COUNTERS = ("calls", "successes", "failures", "attempts", "retries", "timeouts",
+                "rejected_open", "rejected_bulkhead")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._attempt_latency: Dict[str, LatencyHistogram] = {}
+        self._call_latency: Dict[str, LatencyHistogram] = {}
+        self.transitions: deque = deque(maxlen=1000)  # Most recent breaker state changes
+
+    def _endpoint(self, endpoint: str):
+        with self._lock:
+            if endpoint not in self._counters:
+                self._counters[endpoint] = dict.fromkeys(self.COUNTERS, 0)
+                self._attempt_latency[endpoint] = LatencyHistogram()
+                self._call_latency[endpoint] = LatencyHistogram()
+
+    def increment(self, endpoint: str, counter: str, amount: int = 1):
+        self._endpoint(endpoint)
+        with self._lock:
+            self._counters[endpoint][counter] += amount
+
+    def observe_attempt(self, endpoint: str, seconds: float):
+        self._endpoint(endpoint)
+        self._attempt_latency[endpoint].record(seconds)
+
+    def observe_call(self, endpoint: str, seconds: float):
+        """Whole call, including retries and backoff."""
+        self._endpoint(endpoint)
+        self._call_latency[endpoint].record(seconds)
+
+    def record_transition(self, endpoint: str, old: str, new: str):
+        logger.warning(f"Circuit for {endpoint}: {old} -> {new}")
+        with self._lock:
+            self.transitions.append({"time": time.time(), "endpoint": endpoint, "from": old, "to": new})
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = list(self._counters)
+            transitions = list(self.transitions)
+        return {
+            endpoint: {
+                **self._counters[endpoint],
+                "breaker": _breakers[endpoint].state if endpoint in _breakers else CLOSED,
+                "attempt_latency": self._attempt_latency[endpoint].snapshot(),
+                "call_latency": self._call_latency[endpoint].snapshot(),
+                "transitions": [t for t in transitions if t["endpoint"] == endpoint],
+            }
+            for endpoint in endpoints
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._attempt_latency.clear()
+            self._call_latency.clear()
+            self.transitions.clear()
+
+
+metrics = ResilienceMetrics()
+
+
+# =============================================================================
+# Circuit Breaker and Bulkhead
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    closed:    calls pass; `failure_threshold` consecutive failures open it
+    open:      calls fail fast for `recovery_timeout` seconds
+    half_open: up to `half_open_max_calls` trial calls; a success closes
+               the breaker, a failure opens it again
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, new: str):
+        old, self._state = self._state, new
+        if new == OPEN:
+            self._opened_at = self.clock()
+        self._failures = 0
+        self._trials = 0
+        metrics.record_transition(self.endpoint, old, new)
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self):
+        """Raises CircuitOpenError unless a call may go ahead now."""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._trials >= self.half_open_max_calls):
+                raise CircuitOpenError(f"Circuit open for {self.endpoint}")
+            if state == HALF_OPEN:
+                self._trials += 1
+
+    def cancel_call(self):
+        """Gives back a half-open trial taken by before_call() for a call that never ran."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self._state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._transition(OPEN)
+
+
+class Bulkhead:
+    """Caps concurrent calls to one endpoint; extra callers wait up to `max_wait` seconds."""
+
+    def __init__(self, endpoint: str, max_concurrent: int = 10, max_wait: float = 0.0):
+        self.endpoint = endpoint
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self):
+        if self.max_wait:
+            acquired = self._slots.acquire(timeout=self.max_wait)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            raise BulkheadFullError(f"More than {self.max_concurrent} calls in flight to {self.endpoint}")
+
+    def release(self):
+        self._slots.release()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_bulkheads: Dict[str, Bulkhead] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str, **settings) -> CircuitBreaker:
+    """The shared breaker for an endpoint (settings apply on first use)."""
+    with _registry_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint, **settings)
+        return _breakers[endpoint]
+
+
+def get_bulkhead(endpoint: str, **settings) -> Bulkhead:
+    """The shared bulkhead for an endpoint (settings apply on first use)."""
+    with _registry_lock:
+        if endpoint not in _bulkheads:
+            _bulkheads[endpoint] = Bulkhead(endpoint, **settings)
+        return _bulkheads[endpoint]
+
+
+# =============================================================================
+# Execution
+# =============================================================================
+
+# Attempts run on a pool so their timeout can be enforced from the calling
+# thread. Each endpoint gets its own pool, so attempts hung on one dependency
+# cannot starve the others.
+DEFAULT_POOL_SIZE = 32
+_attempt_pools: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _attempt_pool(endpoint: str, bulkhead: Optional[Bulkhead]) -> ThreadPoolExecutor:
+    """
+    The endpoint's pool. With a bulkhead it has one thread per slot, and an
+    attempt holds its slot until it returns, so an admitted attempt never
+    waits behind hung ones.
+    """
+    with _registry_lock:
+        if endpoint not in _attempt_pools:
+            size = bulkhead.max_concurrent if bulkhead is not None else DEFAULT_POOL_SIZE
+            _attempt_pools[endpoint] = ThreadPoolExecutor(size, thread_name_prefix="resilient-attempt")
+        return _attempt_pools[endpoint]
+
+
+def _run_attempt(func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], bulkhead: Optional[Bulkhead]) -> Any:
+    """Worker side of an attempt: the bulkhead slot is released only once func returns."""
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if bulkhead is not None:
+            bulkhead.release()
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_resilience(
+    func: Callable[..., Any],
+    args: tuple = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    endpoint: Optional[str] = None,
+    max_retries: int = 2,
+    timeout_seconds: float = 10.0,
+    backoff_base: float = 0.5,
+    backoff_max: float = 8.0,
+    breaker: Optional[CircuitBreaker] = None,
+    bulkhead: Optional[Bulkhead] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Any:
+    """
+    Calls func(*args, **kwargs) with up to `max_retries` retries.
+
+    Raises CircuitOpenError / BulkheadFullError without attempting (these
+    are not retried), or the last attempt's exception when every attempt
+    failed. A timed-out attempt raises AttemptTimeoutError and is cancelled
+    if it has not started; one already running cannot be interrupted, so
+    it finishes in the background and keeps its bulkhead slot until then.
+    """
+    endpoint = endpoint or getattr(func, "__qualname__", repr(func))
+    kwargs = kwargs or {}
+    metrics.increment(endpoint, "calls")
+    call_start = time.perf_counter()
+    last_error: Optional[BaseException] = None
+    try:
+        for attempt in range(max_retries + 1):
+            if attempt:
+                metrics.increment(endpoint, "retries")
+                sleep(backoff_delay(attempt - 1, backoff_base, backoff_max))
+            # Take the bulkhead slot first: a half-open trial, once granted,
+            # must end in record_success/record_failure or be given back
+            try:
+                if bulkhead is not None:
+                    bulkhead.acquire()
+            except BulkheadFullError:
+                metrics.increment(endpoint, "rejected_bulkhead")
+                raise
+            try:
+                if breaker is not None:
+                    breaker.before_call()
+            except CircuitOpenError:
+                if bulkhead is not None:
+                    bulkhead.release()
+                metrics.increment(endpoint, "rejected_open")
+                raise
+
+            metrics.increment(endpoint, "attempts")
+            attempt_start = time.perf_counter()
+            try:
+                future = _attempt_pool(endpoint, bulkhead).submit(_run_attempt, func, args, kwargs, bulkhead)
+            except BaseException:
+                if bulkhead is not None:
+                    bulkhead.release()
+                if breaker is not None:
+                    breaker.cancel_call()
+                raise
+            try:
+                result = future.result(timeout=timeout_seconds)
+            except FutureTimeout:
+                # A queued attempt must not run after we have moved on
+                if future.cancel() and bulkhead is not None:
+                    bulkhead.release()
+                metrics.increment(endpoint, "timeouts")
+                last_error = AttemptTimeoutError(f"{endpoint} timed out after {timeout_seconds}s")
+            except Exception as e:
+                last_error = e
+            else:
+                metrics.observe_attempt(endpoint, time.perf_counter() - attempt_start)
+                if breaker is not None:
+                    breaker.record_success()
+                metrics.increment(endpoint, "successes")
+                return result
+
+            metrics.observe_attempt(endpoint, time.perf_counter() - attempt_start)
+            if breaker is not None:
+                breaker.record_failure()
+            logger.warning(f"{endpoint} attempt {attempt + 1}/{max_retries + 1} failed: {last_error}")
+
+        metrics.increment(endpoint, "failures")
+        raise last_error
+    except (CircuitOpenError, BulkheadFullError):
+        metrics.increment(endpoint, "failures")
+        raise
+    finally:
+        metrics.observe_call(endpoint, time.perf_counter() - call_start)
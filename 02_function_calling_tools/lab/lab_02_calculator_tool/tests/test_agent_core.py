@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # agent_core builds its client at import
+
+import agent_core
+from agent_core import TOOL_MAX_WORKERS, execute_tool_calls
+
+
+def _call(call_id: str, name: str = "execute_calculation", **arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def test_results_keep_tool_call_order(monkeypatch):
+    real_run = agent_core.run_tool_call
+
+    def run_slow_first(tool_call):
+        time.sleep(json.loads(tool_call.function.arguments)["operand_a"] / 100)
+        return real_run(tool_call)
+
+    monkeypatch.setattr(agent_core, "run_tool_call", run_slow_first)
+    calls = [_call(f"call_{a}", operation="add", operand_a=a, operand_b=1) for a in (5, 3, 1, 0)]
+
+    results = execute_tool_calls(calls)
+
+    assert [result["result"] for result in results] == [6.0, 4.0, 2.0, 1.0]
+
+
+def test_hung_calls_time_out_without_starving_the_next_turn(monkeypatch):
+    release = threading.Event()
+    real_run = agent_core.run_tool_call
+
+    def run(tool_call):
+        if tool_call.function.name == "hang":
+            release.wait()
+        return real_run(tool_call)
+
+    monkeypatch.setattr(agent_core, "run_tool_call", run)
+    try:
+        hung = [_call(f"hang_{i}", name="hang") for i in range(TOOL_MAX_WORKERS)]
+        results = execute_tool_calls(hung + [_call("ok", operation="multiply", operand_a=2, operand_b=3)],
+                                     timeout=0.1)
+        assert all(result["error"] == "Tool call timed out after 0.1s" for result in results[:-1])
+        # Queued behind eight hung calls, the ninth never got a worker
+        assert results[-1]["error"] == "Tool call timed out after 0.1s"
+
+        start = time.perf_counter()
+        next_turn = execute_tool_calls([_call("next", operation="add", operand_a=1, operand_b=2)], timeout=1.0)
+        assert next_turn == [{"success": True, "result": 3.0, "error": None}]
+        assert time.perf_counter() - start < 0.5
+    finally:
+        release.set()
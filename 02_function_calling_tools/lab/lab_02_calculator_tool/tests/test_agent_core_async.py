@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # agent_core builds its client at import
+
+import agent_core_async
+from agent_core_async import close_default_async_client, get_ai_response_with_tools_async
+from mock_openai_server import MockOpenAIServer
+
+
+def test_calls_without_client_share_one_default_client(monkeypatch):
+    created = []
+    real_create = agent_core_async.create_async_client
+
+    def counting_create(**kwargs):
+        created.append(real_create(base_url=server.base_url, api_key="mock"))
+        return created[-1]
+
+    monkeypatch.setattr(agent_core_async, "create_async_client", counting_create)
+
+    async def conversation():
+        messages = [{"role": "user", "content": "What is 2 times 3?"}]
+        return await get_ai_response_with_tools_async(messages)
+
+    async def run():
+        results = await asyncio.gather(*(conversation() for _ in range(5)))
+        client = created[0]
+        await close_default_async_client()
+        return results, client
+
+    with MockOpenAIServer(completion_latency=0.0) as server:
+        results, client = asyncio.run(run())
+
+    assert len(created) == 1
+    assert client.is_closed()
+    assert all(result["tool_results"] for result in results)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from calculator import execute_calculation, execute_calculation_batch
+
+
+def test_batch_returns_error_entries_for_malformed_requests():
+    requests = [
+        {"operation": "add", "operand_a": 1, "operand_b": 2},
+        "add 1 2",
+        None,
+        {"operation": ["add"], "operand_a": 1, "operand_b": 2},
+        {"operation": {"op": "add"}, "operand_a": 1, "operand_b": 2},
+        {"operand_a": 1, "operand_b": 2},
+    ]
+
+    results = execute_calculation_batch(requests)
+
+    assert results[0] == {"success": True, "result": 3.0, "error": None}
+    assert results[1]["error"] == "Invalid request: expected an object of arguments, got str"
+    assert results[2]["error"] == "Invalid request: expected an object of arguments, got NoneType"
+    assert results[3]["error"] == "Unsupported operation: ['add']"
+    assert results[4]["error"] == "Unsupported operation: {'op': 'add'}"
+    assert results[5]["error"] == "Missing argument: operation"
+
+
+def test_batch_matches_single_calls():
+    requests = [{"operation": op, "operand_a": a, "operand_b": b}
+                for op in ("add", "subtract", "multiply", "divide", "pow", "mod")
+                for a, b in ((6, 3), (2, 0), (-8, 0.5), ("x", 1))] * 3
+
+    assert execute_calculation_batch(requests) == [execute_calculation(**r) for r in requests]
+
+
+def test_vectorized_group_keeps_single_call_errors_for_non_numbers():
+    requests = [{"operation": "add", "operand_a": i, "operand_b": 1} for i in range(10)]
+    requests[3]["operand_b"] = None
+    requests[5]["operand_a"] = True
+
+    results = execute_calculation_batch(requests)
+
+    assert results == [execute_calculation(**r) for r in requests]
+    assert results[3]["success"] is False
+    assert results[3]["error"].startswith("Calculation error: float() argument must be")
@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from conversation_memory import SUMMARY_PREFIX, ConversationMemory, collapse_tool_result
+
+
+def _count_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _tool_turn(i: int) -> list:
+    result = {"success": True, "result": i * 1.5, "error": None, "detail": "x " * 40}
+    return [
+        {"role": "user", "content": f"question {i}: what is {i} times 1.5?"},
+        {"role": "assistant", "content": None, "tool_calls": [{
+            "id": f"call_{i}", "type": "function",
+            "function": {"name": "execute_calculation", "arguments": json.dumps({"operation": "multiply"})},
+        }]},
+        {"role": "tool", "tool_call_id": f"call_{i}", "content": json.dumps(result)},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+def test_collapse_drops_nulls_and_success_flag():
+    assert collapse_tool_result('{"success": true, "result": 75.0, "error": null}') == '{"result":75.0}'
+    assert collapse_tool_result("plain text " * 50, max_chars=20).endswith("…")
+
+
+def test_old_tool_results_are_collapsed_before_anything_is_dropped():
+    messages = [{"role": "system", "content": "You are a calculator."}]
+    for i in range(3):
+        messages.extend(_tool_turn(i))
+    memory = ConversationMemory(max_tokens=230, keep_recent=4, count_tokens=_count_tokens)
+
+    stats = memory.compact(messages)
+
+    assert stats.tool_results_collapsed == 2  # The last turn is kept verbatim
+    assert stats.messages_dropped == 0
+    assert messages[3]["content"].startswith('{"result":0.0')
+    assert messages[-2] == _tool_turn(2)[2]
+
+
+def test_oldest_turns_are_dropped_into_a_summary():
+    messages = [{"role": "system", "content": "You are a calculator."}]
+    for i in range(6):
+        messages.extend(_tool_turn(i))
+    memory = ConversationMemory(max_tokens=400, keep_recent=4, count_tokens=_count_tokens)
+
+    stats = memory.compact(messages)
+
+    assert stats.messages_dropped > 0 and stats.summarized
+    assert messages[0]["content"] == "You are a calculator."
+    summary = messages[1]["content"]
+    assert summary.startswith(SUMMARY_PREFIX)
+    # The newest dropped turn is summarized; older lines are trimmed first
+    kept = int(messages[2]["content"].split()[1].rstrip(":"))
+    last = kept - 1
+    assert last >= 0 and stats.messages_dropped == 4 * kept
+    assert f"- User: question {last}: what is {last} times 1.5?" in summary
+    assert "- Assistant called execute_calculation(" in summary
+    assert f"  -> {{\"result\":{last * 1.5}" in summary
+    assert f"- Assistant: answer {last}" in summary
+    assert memory.count_tokens(summary[len(SUMMARY_PREFIX):].strip()) <= memory.max_summary_tokens
+    assert messages[-4]["content"] == "question 5: what is 5 times 1.5?"
+    assert memory.total_tokens(messages) <= 400
+
+
+def test_summarizer_none_just_drops_turns():
+    messages = []
+    for i in range(6):
+        messages.extend(_tool_turn(i))
+    memory = ConversationMemory(max_tokens=200, keep_recent=4, summarizer=None, count_tokens=_count_tokens)
+
+    memory.compact(messages)
+
+    assert not any(str(m.get("content", "")).startswith(SUMMARY_PREFIX) for m in messages)
+    assert messages[0]["role"] == "user"  # Cut at a turn boundary
+
+
+def test_turn_counter_runs_past_compacted_history():
+    messages = [{"role": "system", "content": "You are a calculator."}]
+    memory = ConversationMemory(max_tokens=300, keep_recent=4, count_tokens=_count_tokens)
+
+    for i in range(30):
+        turn = _tool_turn(i)
+        messages.append(turn[0])
+        memory.compact(messages)
+        messages.extend(turn[1:3])
+        memory.compact(messages, stage="tool_results")
+        messages.append(turn[3])
+
+    assert memory.turns == 30
+    assert [(s.turn, s.stage) for s in memory.stats[-2:]] == [(30, "request"), (30, "tool_results")]
+    last_two = memory.stats[-2:]
+    assert memory.tokens_saved_in_turn() == sum(s.tokens_saved for s in last_two)
+    assert memory.metrics()["turns"] == 30
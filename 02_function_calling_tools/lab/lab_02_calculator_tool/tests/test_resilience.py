@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+import resilience
+from resilience import (
+    CLOSED,
+    HALF_OPEN,
+    AttemptTimeoutError,
+    Bulkhead,
+    BulkheadFullError,
+    CircuitBreaker,
+    call_with_resilience,
+)
+
+
+def _no_sleep(_seconds):
+    pass
+
+
+def test_queued_attempt_is_cancelled_on_timeout(monkeypatch):
+    monkeypatch.setattr(resilience, "DEFAULT_POOL_SIZE", 1)
+    endpoint = "test-queued-cancel"
+    release = threading.Event()
+    ran = []
+    # Occupy the endpoint's only worker so the next attempt has to queue
+    resilience._attempt_pool(endpoint, None).submit(release.wait)
+
+    with pytest.raises(AttemptTimeoutError):
+        call_with_resilience(lambda: ran.append(1), endpoint=endpoint, max_retries=0,
+                             timeout_seconds=0.05, sleep=_no_sleep)
+    release.set()
+    resilience._attempt_pool(endpoint, None).submit(lambda: None).result(timeout=1)
+
+    assert ran == []
+
+
+def test_hung_attempt_keeps_its_bulkhead_slot_until_it_returns():
+    endpoint = "test-hung-bulkhead"
+    bulkhead = Bulkhead(endpoint, max_concurrent=1)
+    release = threading.Event()
+
+    with pytest.raises(AttemptTimeoutError):
+        call_with_resilience(release.wait, endpoint=endpoint, max_retries=0,
+                             timeout_seconds=0.05, bulkhead=bulkhead, sleep=_no_sleep)
+    with pytest.raises(BulkheadFullError):
+        call_with_resilience(lambda: "ok", endpoint=endpoint, bulkhead=bulkhead, sleep=_no_sleep)
+
+    release.set()
+    deadline = time.monotonic() + 1
+    while time.monotonic() < deadline:
+        try:
+            assert call_with_resilience(lambda: "ok", endpoint=endpoint,
+                                        bulkhead=bulkhead, sleep=_no_sleep) == "ok"
+            break
+        except BulkheadFullError:
+            time.sleep(0.01)
+    else:
+        pytest.fail("bulkhead slot was never released")
+
+
+def test_hung_endpoint_does_not_starve_another(monkeypatch):
+    monkeypatch.setattr(resilience, "DEFAULT_POOL_SIZE", 2)
+    release = threading.Event()
+    try:
+        for _ in range(2):
+            with pytest.raises(AttemptTimeoutError):
+                call_with_resilience(release.wait, endpoint="test-hung", max_retries=0,
+                                     timeout_seconds=0.02, sleep=_no_sleep)
+
+        start = time.perf_counter()
+        assert call_with_resilience(lambda: 42, endpoint="test-healthy",
+                                    timeout_seconds=1.0, sleep=_no_sleep) == 42
+        assert time.perf_counter() - start < 0.5
+    finally:
+        release.set()
+
+
+def test_retry_after_timeout_returns_result_once():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.2)
+        return len(calls)
+
+    assert call_with_resilience(flaky, endpoint="test-retry", max_retries=1,
+                                timeout_seconds=0.05, sleep=_no_sleep) == 2
+
+
+def test_bulkhead_rejection_does_not_use_up_half_open_trial():
+    endpoint = "test-half-open-bulkhead"
+    now = [0.0]
+    breaker = CircuitBreaker(endpoint, failure_threshold=1, recovery_timeout=1.0, clock=lambda: now[0])
+    bulkhead = Bulkhead(endpoint, max_concurrent=1)
+
+    def fail():
+        raise ValueError("down")
+
+    with pytest.raises(ValueError):
+        call_with_resilience(fail, endpoint=endpoint, max_retries=0, breaker=breaker,
+                             bulkhead=bulkhead, sleep=_no_sleep)
+    now[0] = 2.0
+    assert breaker.state == HALF_OPEN
+
+    bulkhead.acquire()
+    with pytest.raises(BulkheadFullError):
+        call_with_resilience(lambda: "ok", endpoint=endpoint, breaker=breaker,
+                             bulkhead=bulkhead, sleep=_no_sleep)
+    bulkhead.release()
+
+    assert call_with_resilience(lambda: "ok", endpoint=endpoint, breaker=breaker,
+                                bulkhead=bulkhead, sleep=_no_sleep) == "ok"
+    assert breaker.state == CLOSED
@@ -11,10 +11,66 @@ Every tool in the system inherits from BaseTool and implements:
   - permissions: list of required permissions (optional)
   - execute(**kwargs): the implementation logic
   - get_schema(): auto-generates OpenAI-compatible schema
+  - execution_mode / timeout: how the registry runs it (optional)
+
+Schemas are built once per tool instance and `version`, then reused on
+every turn (get_schema_json() also keeps the serialized bytes).
 """
 
+import json
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from enum import Enum
+from typing import Dict, Any, NamedTuple, Optional
+
+
+class ExecutionMode(str, Enum):
+    """How ToolRegistry.execute_async() runs a tool."""
+    INLINE = "inline"      # Call execute() directly: fast, non-blocking work only
+    BLOCKING = "blocking"  # Run execute() on the registry's thread pool (I/O, slow syscalls)
+    PROCESS = "process"    # Run execute() in the registry's process pool (CPU-heavy; tool must pickle)
+    ASYNC = "async"        # Await execute_async() on the event loop
+
+
+class CachedSchema(NamedTuple):
+    version: str
+    schema: Dict[str, Any]
+    json_bytes: bytes
+
+
+class SchemaCache:
+    """
+    Tool schemas keyed by tool identity; an entry is rebuilt when the tool's
+    `version` changes, and dropped when the tool is garbage-collected.
+    """
+
+    def __init__(self):
+        self._entries: "weakref.WeakKeyDictionary[BaseTool, CachedSchema]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tool: "BaseTool") -> CachedSchema:
+        version = tool.version
+        with self._lock:
+            entry = self._entries.get(tool)
+            if entry is not None and entry.version == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        schema = tool.build_schema()
+        entry = CachedSchema(version, schema, json.dumps(schema, separators=(",", ":")).encode())
+        with self._lock:
+            self._entries[tool] = entry
+        return entry
+
+    def invalidate(self, tool: "BaseTool"):
+        with self._lock:
+            self._entries.pop(tool, None)
+
+
+schema_cache = SchemaCache()
 
 
 class BaseTool(ABC):
@@ -51,6 +107,27 @@ class BaseTool(ABC):
         """
         return []
 
+    @property
+    def version(self) -> str:
+        """
+        Schema version. Override (or bump) when name, description or
+        parameters change at runtime so the cached schema is rebuilt.
+        """
+        return "1"
+
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        """
+        How the registry runs this tool asynchronously. The default keeps
+        a slow execute() from stalling other tool calls.
+        """
+        return ExecutionMode.BLOCKING
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """Seconds execute_async() waits for this tool (None = no limit)."""
+        return 30.0
+
     @abstractmethod
     def execute(self, **kwargs) -> Dict[str, Any]:
         """
@@ -61,8 +138,24 @@ class BaseTool(ABC):
         """
         pass
 
+    async def execute_async(self, **kwargs) -> Dict[str, Any]:
+        """
+        Native async implementation, used when execution_mode is ASYNC.
+        ASYNC tools override this (and may implement execute() as
+        asyncio.run(self.execute_async(**kwargs)) for sync callers).
+        """
+        return self.execute(**kwargs)
+
     def get_schema(self) -> Dict[str, Any]:
-        """Returns the OpenAI-compatible tool schema."""
+        """Returns the OpenAI-compatible tool schema (cached — treat as read-only)."""
+        return schema_cache.get(self).schema
+
+    def get_schema_json(self) -> bytes:
+        """The schema serialized once, for building request bodies directly."""
+        return schema_cache.get(self).json_bytes
+
+    def build_schema(self) -> Dict[str, Any]:
+        """Builds the schema (called by the cache on first use and per version)."""
         return {
             "type": "function",
             "function": {
@@ -0,0 +1,88 @@
+"""
+Contention microbenchmark for ToolRateLimiter.
+
+Runs is_allowed() from 1–64 threads at once and compares ToolRateLimiter
+(integer monotonic_ns bucket, lock-free denials) with the textbook
+float token bucket.
+
+    python bench_rate_limiter.py --threads 1 2 4 8 16 32 64 --calls 20000
+    python bench_rate_limiter.py --saturated     # limit far below demand
+"""
+
+import argparse
+import threading
+import time
+from threading import Lock
+
+from manager import ToolRateLimiter
+
+
+class SingleLockLimiter:
+    """Baseline: float bucket refilled from time.monotonic(), lock on every call."""
+
+    def __init__(self, calls_per_minute: int = 30):
+        self.calls_per_minute = calls_per_minute
+        self.allowance = float(calls_per_minute)
+        self.last_check = time.monotonic()
+        self.lock = Lock()
+
+    def is_allowed(self) -> bool:
+        with self.lock:
+            current = time.monotonic()
+            self.allowance = min(
+                self.calls_per_minute,
+                self.allowance + (current - self.last_check) * (self.calls_per_minute / 60.0),
+            )
+            self.last_check = current
+            if self.allowance < 1:
+                return False
+            self.allowance -= 1
+            return True
+
+
+def run(limiter, threads: int, calls: int) -> tuple[float, int]:
+    """Returns (checks per second, allowed) for `calls` checks per thread."""
+    allowed = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        is_allowed = limiter.is_allowed
+        barrier.wait()
+        count = 0
+        for _ in range(calls):
+            count += is_allowed()
+        allowed[index] = count
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * calls / elapsed, sum(allowed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter throughput under thread contention")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--calls", type=int, default=20_000, help="Checks per thread")
+    parser.add_argument("--saturated", action="store_true", help="Use a low limit so most checks are denied")
+    args = parser.parse_args()
+
+    cpm = 600 if args.saturated else 10**9
+    print(f"calls_per_minute={cpm:,}, {args.calls:,} checks per thread\n")
+    print(f"{'Threads':>7}  {'textbook':>14}  {'ToolRateLimiter':>15}  {'speed-up':>8}  {'allowed (textbook / ours)':>27}")
+    print("-" * 80)
+    for threads in args.threads:
+        single, single_allowed = run(SingleLockLimiter(cpm), threads, args.calls)
+        ours, ours_allowed = run(ToolRateLimiter(cpm), threads, args.calls)
+        print(
+            f"{threads:>7}  {single:>12,.0f}/s  {ours:>13,.0f}/s  {ours / single:>7.2f}x  "
+            f"{single_allowed:>13,} / {ours_allowed:<13,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
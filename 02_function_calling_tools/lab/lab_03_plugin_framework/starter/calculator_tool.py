@@ -10,7 +10,7 @@ Steps:
 """
 
 from typing import Dict, Any
-from base import BaseTool
+from base import BaseTool, ExecutionMode
 
 
 class CalculatorTool(BaseTool):
@@ -27,6 +27,11 @@ class CalculatorTool(BaseTool):
         # Hint: "Executes basic arithmetic operations (add, subtract, multiply, divide, pow)."
         pass
 
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        # Arithmetic is instant; a thread hop would cost more than the call
+        return ExecutionMode.INLINE
+
     @property
     def parameters(self) -> Dict[str, Any]:
         # TODO: Return the JSON Schema for the calculator
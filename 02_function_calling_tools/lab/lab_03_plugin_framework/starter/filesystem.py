@@ -13,7 +13,7 @@ Steps:
 
 import os
 from typing import Dict, Any
-from base import BaseTool
+from base import BaseTool, ExecutionMode
 from security import PathSanitizer, SecurityError
 
 
@@ -35,6 +35,15 @@ class ListFilesTool(BaseTool):
     def permissions(self) -> list[str]:
         return ["filesystem:read"]
 
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        # Directory listings can stall on network mounts: keep them off the event loop
+        return ExecutionMode.BLOCKING
+
+    @property
+    def timeout(self) -> float:
+        return 10.0
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
@@ -5,60 +5,97 @@ Prevents abuse by limiting how often a tool can be called.
 Uses a token bucket algorithm: tokens refill over time, each
 call consumes one token.
 
-Steps:
-  1. Implement is_allowed() — check and consume a token
+Time comes from time.monotonic_ns(): wall-clock jumps cannot refill the
+bucket, and integer arithmetic means no float drift. Once the bucket is
+short of a token, calls are denied without taking the lock until the
+next token is due, so a flood of rejected calls does not contend on it.
 """
 
+import asyncio
 import time
 from threading import Lock
 
+# Internal units per token. A bucket refilling `calls_per_minute` tokens
+# per minute gains exactly `calls_per_minute` units per nanosecond.
+TOKEN = 60_000_000_000
+
 
 class ToolRateLimiter:
     """
-    A simple token-bucket style rate limiter.
+    A token-bucket rate limiter.
 
     Attributes:
-        calls_per_minute: Maximum calls allowed per minute
+        calls_per_minute: Maximum calls allowed per minute (also the burst size)
         allowance: Current number of available tokens
-        last_check: Timestamp of last check
     """
 
     def __init__(self, calls_per_minute: int = 30):
+        if calls_per_minute < 1:
+            raise ValueError("calls_per_minute must be at least 1")
         self.calls_per_minute = calls_per_minute
-        self.allowance = float(calls_per_minute)
-        self.last_check = time.time()
+        self.capacity = calls_per_minute * TOKEN
         self.lock = Lock()
+        self._units = self.capacity
+        self._last_ns = time.monotonic_ns()
+        self._empty_until_ns = 0  # No whole token can exist before this time
+
+    def _refill(self, now_ns: int):
+        """Caller holds self.lock."""
+        elapsed = now_ns - self._last_ns
+        if elapsed > 0:
+            self._units = min(self.capacity, self._units + elapsed * self.calls_per_minute)
+            self._last_ns = now_ns
 
     def is_allowed(self) -> bool:
         """
         Returns True if the call is within rate limit, False otherwise.
 
         Algorithm:
-          1. Calculate time passed since last check
-          2. Refill tokens: add (time_passed * calls_per_minute / 60)
-          3. Cap tokens at max (calls_per_minute)
-          4. If tokens < 1: deny (return False)
-          5. Otherwise: consume 1 token and allow (return True)
+          1. Deny at once if the last denial showed no token is due yet
+          2. Refill tokens from elapsed monotonic time, capped at the maximum
+          3. If a whole token is available: consume it and allow
+          4. Otherwise: record when the next one is due and deny
         """
+        now = time.monotonic_ns()
+        if now < self._empty_until_ns:
+            return False
         with self.lock:
-            current = time.time()
-            time_passed = current - self.last_check
-            self.last_check = current
+            self._refill(now)
+            if self._units >= TOKEN:
+                self._units -= TOKEN
+                return True
+            self._empty_until_ns = now + (TOKEN - self._units) // self.calls_per_minute
+            return False
 
-            # TODO: Refill tokens based on elapsed time
-            # self.allowance += time_passed * (self.calls_per_minute / 60.0)
+    @property
+    def allowance(self) -> float:
+        """Tokens available right now."""
+        with self.lock:
+            self._refill(time.monotonic_ns())
+            return self._units / TOKEN
 
-            # TODO: Cap at maximum
-            # if self.allowance > self.calls_per_minute:
-            #     self.allowance = self.calls_per_minute
+    def seconds_until_token(self) -> float:
+        """Time until a whole token is available (0.0 if one is now)."""
+        missing = TOKEN - self.allowance * TOKEN
+        return max(0.0, missing / self.calls_per_minute / 1e9)
 
-            # TODO: Check if we have a token to spend
-            # if self.allowance < 1:
-            #     return False
-            # self.allowance -= 1
-            # return True
+    async def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Waits for a token instead of rejecting.
 
-            pass
+        Returns:
+            True once a token is consumed, False if `timeout` seconds pass first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_allowed():
+            delay = max(self.seconds_until_token(), 0.001)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+        return True
 
 
 # Quick test
@@ -68,3 +105,11 @@ if __name__ == "__main__":
     for i in range(8):
         allowed = limiter.is_allowed()
         print(f"Call {i+1}: {'Allowed' if allowed else 'BLOCKED'}")
+
+    # Waiting instead of rejecting: at 600/min the next token arrives in ~0.1s
+    fast = ToolRateLimiter(calls_per_minute=600)
+    for _ in range(600):
+        fast.is_allowed()
+    start = time.monotonic()
+    acquired = asyncio.run(fast.acquire(timeout=1.0))
+    print(f"acquire(): {acquired} after {time.monotonic() - start:.3f}s")
@@ -6,17 +6,30 @@ The registry is the heart of the tool system. It:
   2. Generates schemas for the LLM API
   3. Executes tools safely with error boundaries
   4. Enforces rate limits and permissions
+  5. Runs tools concurrently without one slow tool blocking the rest
 
-Steps:
-  1. Implement register() — store tools and create rate limiters
-  2. Implement get_schemas() — return all tool schemas
-  3. Implement execute() — look up and run a tool safely
-  4. Implement execute_secure() — add permission checks
+execute_async() runs each tool according to its execution_mode:
+INLINE tools are called directly, BLOCKING tools on a thread pool,
+PROCESS tools in a process pool, and ASYNC tools are awaited. Each call
+is bounded by the tool's timeout, and cancelling the caller cancels
+work that has not started yet (a running thread or process cannot be
+interrupted, so it is abandoned). Rate-limit checks that may block
+(anything but the in-process ToolRateLimiter, e.g. flock() or a Redis
+round trip) also run on the thread pool.
+
+    results = await registry.execute_many([
+        ("list_files", {"path": "."}),
+        ("execute_calculation", {"operation": "add", "operand_a": 1, "operand_b": 2}),
+    ])
 """
 
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Any, Optional
-from base import BaseTool
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Protocol, Tuple
+from base import BaseTool, ExecutionMode
 from manager import ToolRateLimiter
 
 logger = logging.getLogger(__name__)
@@ -27,12 +40,51 @@ class SecurityError(Exception):
     pass
 
 
+class RateLimiter(Protocol):
+    """What the registry needs from a limiter (ToolRateLimiter, SharedRateLimiter)."""
+
+    def is_allowed(self) -> bool: ...
+
+
+def _error(message: str) -> Dict[str, Any]:
+    return {"success": False, "result": None, "error": message}
+
+
+def _execute_in_process(tool: BaseTool, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs in a pool worker process (module-level so it can be pickled)."""
+    return tool.execute(**arguments)
+
+
+async def _execute_inline(tool: BaseTool, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return tool.execute(**arguments)
+
+
 class ToolRegistry:
     """Centralized registry for managing and executing tools."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        limiter_factory: Optional[Callable[[str, int], RateLimiter]] = None,
+        max_threads: int = 8,
+        max_processes: Optional[int] = None,
+    ):
+        """
+        Args:
+            limiter_factory: (tool_name, calls_per_minute) -> limiter with
+                is_allowed(). Default: an in-process ToolRateLimiter. Use
+                shared_limiter.shared_limiter_factory(...) to enforce one
+                limit across worker processes.
+            max_threads: Thread pool size for BLOCKING tools
+            max_processes: Process pool size for PROCESS tools (default: CPU count)
+        """
         self._tools: Dict[str, BaseTool] = {}
-        self._limiters: Dict[str, ToolRateLimiter] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._limiter_factory = limiter_factory or (lambda name, calls_per_minute: ToolRateLimiter(calls_per_minute))
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
     def register(self, tool: BaseTool, calls_per_minute: int = 60):
         """
@@ -42,10 +94,9 @@ class ToolRegistry:
             tool: A BaseTool instance to register
             calls_per_minute: Rate limit for this tool
         """
-        # TODO: Store the tool in self._tools using tool.name as key
-        # TODO: Create a ToolRateLimiter for this tool in self._limiters
-        # TODO: Log the registration
-        pass
+        self._tools[tool.name] = tool
+        self._limiters[tool.name] = self._limiter_factory(tool.name, calls_per_minute)
+        logger.info(f"Registered tool: {tool.name} ({calls_per_minute} calls/min)")
 
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Returns a tool by name, or None if not found."""
@@ -58,9 +109,11 @@ class ToolRegistry:
         Returns:
             List of OpenAI-compatible tool schemas
         """
-        # TODO: Return a list of get_schema() for each registered tool
-        # Hint: [tool.get_schema() for tool in self._tools.values()]
-        pass
+        return [tool.get_schema() for tool in self._tools.values()]
+
+    def get_schemas_json(self) -> bytes:
+        """The tool list as a JSON array, joined from each tool's cached schema bytes."""
+        return b"[" + b",".join(tool.get_schema_json() for tool in self._tools.values()) + b"]"
 
     def execute(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -74,10 +127,14 @@ class ToolRegistry:
         Returns:
             Tool result dict with success/result/error keys
         """
-        # TODO: Look up the tool (return error dict if not found)
-        # TODO: Check rate limiter (return error dict if rate limited)
-        # TODO: Try to execute the tool, catch exceptions
-        pass
+        try:
+            tool, error = self._admit(tool_name)
+            if error:
+                return error
+            return tool.execute(**arguments)
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {e}")
+            return _error(f"Tool error: {e}")
 
     def execute_secure(
         self,
@@ -96,12 +153,123 @@ class ToolRegistry:
         Returns:
             Tool result or access denied error
         """
-        # TODO: Look up the tool
-        # TODO: Check if user has all required permissions
-        #   missing = [p for p in tool.permissions if p not in user_permissions]
-        #   If missing, return {"success": False, "error": "Access Denied. Missing: ..."}
-        # TODO: If permissions OK, delegate to self.execute()
-        pass
+        try:
+            tool, error = self._admit(tool_name, user_permissions)
+            if error:
+                return error
+            return tool.execute(**arguments)
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {e}")
+            return _error(f"Tool error: {e}")
+
+    # --- Admission ---
+    def _admit(
+        self, tool_name: str, user_permissions: Optional[List[str]] = None
+    ) -> Tuple[Optional[BaseTool], Optional[Dict[str, Any]]]:
+        """
+        Looks up the tool and checks permissions (if given) and the rate limit.
+        A limiter backend failure (Redis down, flock() error) denies the call.
+        """
+        tool = self.get_tool(tool_name)
+        if tool is None:
+            return None, _error(f"Tool not found: {tool_name}")
+        if user_permissions is not None:
+            missing = [p for p in tool.permissions if p not in user_permissions]
+            if missing:
+                return None, _error(f"Access Denied. Missing: {', '.join(missing)}")
+        try:
+            allowed = self._limiters[tool_name].is_allowed()
+        except Exception as e:
+            logger.error(f"Rate limiter for {tool_name} failed: {e}")
+            return None, _error(f"Rate limiter unavailable for {tool_name}: {e}")
+        if not allowed:
+            return None, _error(f"Rate limit exceeded for {tool_name}")
+        return tool, None
+
+    async def _admit_async(
+        self, tool_name: str, user_permissions: Optional[List[str]] = None
+    ) -> Tuple[Optional[BaseTool], Optional[Dict[str, Any]]]:
+        """_admit() without blocking the event loop on a shared limiter backend."""
+        limiter = self._limiters.get(tool_name)
+        if limiter is None or isinstance(limiter, ToolRateLimiter):
+            return self._admit(tool_name, user_permissions)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads(), self._admit, tool_name, user_permissions)
+
+    # --- Concurrent execution ---
+    def _threads(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.max_threads, thread_name_prefix="tool")
+            return self._thread_pool
+
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(self.max_processes)
+            return self._process_pool
+
+    def _dispatch(self, tool: BaseTool, arguments: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
+        mode = tool.execution_mode
+        if mode == ExecutionMode.ASYNC:
+            return tool.execute_async(**arguments)
+        if mode == ExecutionMode.INLINE:
+            return _execute_inline(tool, arguments)
+        loop = asyncio.get_running_loop()
+        if mode == ExecutionMode.PROCESS:
+            return loop.run_in_executor(self._processes(), _execute_in_process, tool, arguments)
+        return loop.run_in_executor(self._threads(), functools.partial(tool.execute, **arguments))
+
+    async def execute_async(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        user_permissions: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Executes a tool without blocking the event loop.
+
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Tool arguments
+            user_permissions: If given, checked as in execute_secure()
+            timeout: Seconds to wait (default: the tool's own timeout)
+
+        Returns:
+            Tool result dict; timeouts and failures become error dicts
+        """
+        try:
+            tool, error = await self._admit_async(tool_name, user_permissions)
+            if error:
+                return error
+            timeout = tool.timeout if timeout is None else timeout
+            return await asyncio.wait_for(self._dispatch(tool, arguments), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {tool_name} timed out after {timeout}s")
+            return _error(f"Tool {tool_name} timed out after {timeout}s")
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {e}")
+            return _error(f"Tool error: {e}")
+
+    async def execute_many(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        user_permissions: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Runs (tool_name, arguments) calls concurrently; results keep the input order."""
+        return list(await asyncio.gather(
+            *(self.execute_async(name, arguments, user_permissions, timeout) for name, arguments in calls)
+        ))
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker pools; queued calls are cancelled."""
+        with self._pool_lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait, cancel_futures=True)
+            self._thread_pool = self._process_pool = None
 
 
 # =============================================================================
@@ -134,3 +302,11 @@ if __name__ == "__main__":
 
     print("\nSecurity test (with permissions):")
     print(registry.execute_secure("list_files", {"path": "."}, ["filesystem:read"]))
+
+    # Test concurrent execution
+    print("\nConcurrent test:")
+    print(asyncio.run(registry.execute_many([
+        ("list_files", {"path": "."}),
+        ("execute_calculation", {"operation": "add", "operand_a": 1, "operand_b": 2}),
+    ], user_permissions=["filesystem:read"])))
+    registry.shutdown()
@@ -0,0 +1,217 @@
+"""
+SharedRateLimiter — One Rate Limit Across Worker Processes
+===========================================================
+ToolRateLimiter lives in process memory, so 16 gunicorn workers each
+allow the full `calls_per_minute` (16x the intended limit). A
+SharedRateLimiter keeps the same is_allowed() API but stores its token
+bucket in a backend every worker sees:
+
+  - FileLockBackend: one small file per key, updated under flock().
+    Coordinates all processes on one host; no server needed.
+  - RedisBackend: one atomic Lua script per check. Coordinates hosts.
+    Works with any client exposing redis-py's eval(); FakeRedis stands
+    in for a server in tests.
+
+    backend = FileLockBackend("/tmp/tool-rate-limits")
+    registry = ToolRegistry(limiter_factory=shared_limiter_factory(backend))
+"""
+
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict
+
+from manager import TOKEN
+
+try:
+    import fcntl
+except ImportError:  # Windows: FileLockBackend is unavailable
+    fcntl = None
+
+
+class RateLimitBackend(ABC):
+    """Shared token-bucket storage. try_acquire() must be atomic across processes."""
+
+    @abstractmethod
+    def try_acquire(self, key: str, calls_per_minute: int) -> bool:
+        """Consumes one token from `key`'s bucket if one is available."""
+        pass
+
+
+class SharedRateLimiter:
+    """Drop-in for ToolRateLimiter whose bucket lives in a shared backend."""
+
+    def __init__(self, key: str, calls_per_minute: int, backend: RateLimitBackend):
+        if calls_per_minute < 1:
+            raise ValueError("calls_per_minute must be at least 1")
+        self.key = key
+        self.calls_per_minute = calls_per_minute
+        self.backend = backend
+
+    def is_allowed(self) -> bool:
+        """Returns True if the call is within the shared rate limit, False otherwise."""
+        return self.backend.try_acquire(self.key, self.calls_per_minute)
+
+
+def shared_limiter_factory(backend: RateLimitBackend) -> Callable[[str, int], SharedRateLimiter]:
+    """A ToolRegistry limiter_factory that gives every tool a bucket in `backend`."""
+    return lambda tool_name, calls_per_minute: SharedRateLimiter(tool_name, calls_per_minute, backend)
+
+
+# =============================================================================
+# Single host: file lock
+# =============================================================================
+
+_STATE = struct.Struct("<qq")  # Available units, last refill (monotonic ns)
+
+
+class FileLockBackend(RateLimitBackend):
+    """
+    Buckets stored as 16-byte files in `directory`, read and written under
+    an exclusive flock(). time.monotonic_ns() is system-wide, so every
+    process on the host refills from the same clock.
+    """
+
+    def __init__(self, directory: str | Path | None = None):
+        if fcntl is None:
+            raise RuntimeError("FileLockBackend needs fcntl (POSIX); use RedisBackend instead")
+        self.directory = Path(directory or Path(tempfile.gettempdir()) / "tool-rate-limits")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._fds: Dict[str, int] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._pid = os.getpid()
+
+    def _path(self, key: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", key)[:64]
+        return self.directory / f"{safe}-{hashlib.sha1(key.encode()).hexdigest()[:8]}.bucket"
+
+    def _open(self, key: str) -> tuple[int, threading.Lock]:
+        with self._guard:
+            if self._pid != os.getpid():
+                # Forked: flock() is per open file, so descriptors inherited
+                # from the parent would not exclude it — reopen everything
+                for fd in self._fds.values():
+                    os.close(fd)
+                self._fds.clear()
+                self._locks.clear()
+                self._pid = os.getpid()
+            if key not in self._fds:
+                self._fds[key] = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+                self._locks[key] = threading.Lock()
+            return self._fds[key], self._locks[key]
+
+    def try_acquire(self, key: str, calls_per_minute: int) -> bool:
+        fd, thread_lock = self._open(key)
+        capacity = calls_per_minute * TOKEN
+        # Threads of one process share the descriptor, so flock() alone
+        # would not separate them
+        with thread_lock:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                now = time.monotonic_ns()
+                data = os.pread(fd, _STATE.size, 0)
+                units, last_ns = _STATE.unpack(data) if len(data) == _STATE.size else (capacity, now)
+                if now < last_ns:  # Clock restarted (reboot): start full
+                    units, last_ns = capacity, now
+                units = min(capacity, units + (now - last_ns) * calls_per_minute)
+                allowed = units >= TOKEN
+                if allowed:
+                    units -= TOKEN
+                os.pwrite(fd, _STATE.pack(units, now), 0)
+                return allowed
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+# =============================================================================
+# Many hosts: Redis
+# =============================================================================
+
+# Runs atomically on the server. Uses the server clock so hosts with
+# skewed clocks agree; an idle bucket is full after 60s, so it may expire.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * capacity / 60000000)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 60000)
+return allowed
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Buckets stored as Redis hashes. `client` is e.g. redis.Redis(), or
+    anything with the same eval(script, numkeys, *keys_and_args).
+    """
+
+    def __init__(self, client, prefix: str = "tool-rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    def try_acquire(self, key: str, calls_per_minute: int) -> bool:
+        return int(self.client.eval(TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, calls_per_minute)) == 1
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for a Redis client in tests. It runs only
+    TOKEN_BUCKET_SCRIPT (in Python, with the same arithmetic) and shares
+    state between threads of one process, not between processes.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.hashes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def eval(self, script: str, numkeys: int, *keys_and_args):
+        if script != TOKEN_BUCKET_SCRIPT:
+            raise NotImplementedError("FakeRedis only runs TOKEN_BUCKET_SCRIPT")
+        key, capacity = keys_and_args[0], float(keys_and_args[numkeys])
+        with self._lock:
+            now = int(self.clock() * 1_000_000)
+            state = self.hashes.get(key, {})
+            tokens = state.get("tokens", capacity)
+            ts = state.get("ts", now)
+            tokens = min(capacity, tokens + max(0, now - ts) * capacity / 60_000_000)
+            allowed = 0
+            if tokens >= 1:
+                tokens -= 1
+                allowed = 1
+            self.hashes[key] = {"tokens": tokens, "ts": now}
+            return allowed
+
+
+def _demo_worker(directory: str) -> int:
+    limiter = SharedRateLimiter("demo", 50, FileLockBackend(directory))
+    return sum(limiter.is_allowed() for _ in range(100))
+
+
+# Quick test
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    directory = tempfile.mkdtemp()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        allowed = sum(pool.map(_demo_worker, [directory] * 4))
+    print(f"FileLockBackend: 4 processes x 100 calls, limit 50/min -> {allowed} allowed")
+
+    limiter = SharedRateLimiter("demo", 50, RedisBackend(FakeRedis()))
+    print(f"RedisBackend (fake): {sum(limiter.is_allowed() for _ in range(100))} of 100 allowed")
@@ -0,0 +1,37 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from manager import ToolRateLimiter
+
+
+def test_concurrent_callers_are_admitted_exactly_once_per_token():
+    limiter = ToolRateLimiter(calls_per_minute=100)
+    allowed = []
+
+    def worker():
+        allowed.append(sum(limiter.is_allowed() for _ in range(500)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 100 burst tokens, plus at most a couple refilled during the run
+    assert 100 <= sum(allowed) <= 102
+
+
+def test_acquire_waits_for_the_next_token_or_times_out():
+    limiter = ToolRateLimiter(calls_per_minute=600)
+    while limiter.is_allowed():
+        pass
+
+    assert asyncio.run(limiter.acquire(timeout=1.0)) is True
+    assert asyncio.run(ToolRateLimiter(1).acquire(timeout=0.0)) is True
+    exhausted = ToolRateLimiter(1)
+    exhausted.is_allowed()
+    assert asyncio.run(exhausted.acquire(timeout=0.05)) is False
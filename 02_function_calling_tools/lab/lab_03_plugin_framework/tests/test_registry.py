@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from base import BaseTool, ExecutionMode
+from manager import ToolRateLimiter
+from registry import ToolRegistry
+from shared_limiter import RateLimitBackend, SharedRateLimiter, shared_limiter_factory
+
+
+class BrokenBackend(RateLimitBackend):
+    """A shared backend whose store is unreachable."""
+
+    def try_acquire(self, key, calls_per_minute):
+        raise ConnectionError("redis: connection refused")
+
+
+class SlowLimiter:
+    """Stands in for a shared backend with a slow round trip."""
+
+    def is_allowed(self):
+        time.sleep(0.2)
+        return True
+
+
+class AddTool(BaseTool):
+    name = "add"
+    description = "Adds two numbers"
+    parameters = {
+        "type": "object",
+        "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
+        "required": ["a", "b"],
+    }
+
+    def execute(self, a, b, **kwargs):
+        return {"success": True, "result": a + b, "error": None}
+
+
+class ReadTool(BaseTool):
+    name = "read"
+    description = "Needs a permission"
+    parameters = {"type": "object", "properties": {}}
+    permissions = ["filesystem:read"]
+
+    def execute(self, **kwargs):
+        return {"success": True, "result": "contents", "error": None}
+
+
+class SlowTool(BaseTool):
+    name = "slow"
+    description = "Sleeps"
+    parameters = {"type": "object", "properties": {}}
+    timeout = 0.05
+
+    def execute(self, **kwargs):
+        time.sleep(0.5)
+        return {"success": True, "result": None, "error": None}
+
+
+class FailingTool(BaseTool):
+    name = "failing"
+    description = "Raises"
+    parameters = {"type": "object", "properties": {}}
+    execution_mode = ExecutionMode.INLINE
+
+    def execute(self, **kwargs):
+        raise RuntimeError("boom")
+
+
+ADD = {"a": 1, "b": 2}
+
+
+def _registry(**kwargs) -> ToolRegistry:
+    registry = ToolRegistry(**kwargs)
+    registry.register(AddTool())
+    registry.register(ReadTool())
+    return registry
+
+
+def test_limiter_backend_error_becomes_error_dict():
+    registry = _registry(limiter_factory=shared_limiter_factory(BrokenBackend()))
+
+    for result in (
+        registry.execute("add", ADD),
+        registry.execute_secure("read", {}, ["filesystem:read"]),
+        asyncio.run(registry.execute_async("add", ADD)),
+    ):
+        assert result["success"] is False
+        assert "connection refused" in result["error"]
+
+
+def test_execute_many_survives_a_failing_limiter():
+    def factory(tool_name, calls_per_minute):
+        if tool_name == "read":
+            return SharedRateLimiter(tool_name, calls_per_minute, BrokenBackend())
+        return ToolRateLimiter(calls_per_minute)
+
+    registry = _registry(limiter_factory=factory)
+
+    results = asyncio.run(registry.execute_many(
+        [("read", {}), ("add", ADD)],
+        user_permissions=["filesystem:read"],
+    ))
+
+    assert results[0]["success"] is False
+    assert results[1] == {"success": True, "result": 3, "error": None}
+
+
+def test_execute_secure_checks_permissions_and_rate_limit():
+    registry = ToolRegistry()
+    registry.register(ReadTool(), calls_per_minute=1)
+
+    denied = registry.execute_secure("read", {}, [])
+    assert denied["error"] == "Access Denied. Missing: filesystem:read"
+    assert registry.execute_secure("read", {}, ["filesystem:read"])["success"]
+    limited = registry.execute_secure("read", {}, ["filesystem:read"])
+    assert limited["error"] == "Rate limit exceeded for read"
+    assert registry.execute_secure("missing", {}, [])["error"] == "Tool not found: missing"
+
+
+def test_execute_async_timeout_and_exception_become_error_dicts():
+    registry = ToolRegistry()
+    registry.register(SlowTool())
+    registry.register(FailingTool())
+
+    slow, failing = asyncio.run(registry.execute_many([("slow", {}), ("failing", {})]))
+    registry.shutdown(wait=False)
+
+    assert slow["error"] == "Tool slow timed out after 0.05s"
+    assert failing["error"] == "Tool error: boom"
+
+
+def test_slow_shared_limiter_does_not_block_the_event_loop():
+    registry = ToolRegistry(limiter_factory=lambda name, calls_per_minute: SlowLimiter())
+    registry.register(AddTool())
+
+    start = time.perf_counter()
+    results = asyncio.run(registry.execute_many([("add", ADD)] * 4))
+    elapsed = time.perf_counter() - start
+    registry.shutdown()
+
+    assert all(result["result"] == 3 for result in results)
+    assert elapsed < 0.5  # Four checks in parallel, not 4 x 0.2s in turn
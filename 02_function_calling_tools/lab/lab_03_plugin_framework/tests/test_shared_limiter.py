@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "starter")))
+
+from shared_limiter import FakeRedis, FileLockBackend, RedisBackend, SharedRateLimiter, _demo_worker
+
+needs_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork()"
+)
+
+_inherited: FileLockBackend | None = None
+
+
+def _bucket_fds(directory: str) -> int:
+    return sum(
+        os.path.realpath(os.path.join("/proc/self/fd", fd)).startswith(directory)
+        for fd in os.listdir("/proc/self/fd")
+    )
+
+
+def _forked_worker(directory: str) -> tuple[int, int]:
+    """Uses the backend inherited from the parent; returns (allowed, open bucket fds)."""
+    limiter = SharedRateLimiter("demo", 50, _inherited)
+    allowed = sum(limiter.is_allowed() for _ in range(100))
+    return allowed, _bucket_fds(directory)
+
+
+def test_file_lock_admits_exactly_the_limit_across_processes(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        allowed = sum(pool.map(_demo_worker, [str(tmp_path)] * 4))
+
+    assert allowed == 50
+
+
+@needs_fork
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_forked_children_reopen_and_close_inherited_descriptors(tmp_path):
+    global _inherited
+    directory = os.path.realpath(tmp_path)
+    _inherited = FileLockBackend(directory)
+    try:
+        parent_allowed = sum(SharedRateLimiter("demo", 50, _inherited).is_allowed() for _ in range(10))
+        with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("fork")) as pool:
+            results = list(pool.map(_forked_worker, [directory] * 4))
+    finally:
+        _inherited = None
+
+    assert parent_allowed + sum(allowed for allowed, _ in results) == 50
+    assert all(fds == 1 for _, fds in results)  # The inherited descriptor was closed
+
+
+def test_fake_redis_refills_with_its_clock():
+    now = [1000.0]
+    limiter = SharedRateLimiter("tool", 60, RedisBackend(FakeRedis(clock=lambda: now[0])))
+
+    assert sum(limiter.is_allowed() for _ in range(100)) == 60
+    now[0] += 0.5
+    assert not limiter.is_allowed()
+    now[0] += 0.5
+    assert limiter.is_allowed()
+    assert not limiter.is_allowed()
+    now[0] += 10
+    assert sum(limiter.is_allowed() for _ in range(100)) == 10
@@ -0,0 +1,112 @@
+"""
+Per-turn tool-list assembly cost, with and without the schema cache.
+
+Registers N synthetic tools, then times what an agent does every turn:
+building the `tools=` list (and its JSON request body) for all tools or a
+routed top-k subset.
+
+    python bench_tool_schemas.py --tools 250 --turns 200 --top-k 5
+"""
+
+import argparse
+import inspect
+import json
+import random
+import time
+
+from tools.registry import Tool, ToolRegistry
+
+_TYPES = (str, int, float, bool, list[str], dict[str, float])
+
+
+def _synthetic_function(index: int, rng: random.Random):
+    params = [
+        inspect.Parameter(
+            f"arg_{index}_{j}",
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=rng.choice(_TYPES),
+            **({"default": None} if j >= 2 else {}),
+        )
+        for j in range(rng.randint(1, 6))
+    ]
+
+    def func(**kwargs):
+        return kwargs
+
+    func.__name__ = func.__qualname__ = f"tool_{index}"
+    func.__signature__ = inspect.Signature(params)
+    return func
+
+
+def build_registry(count: int, seed: int = 0) -> ToolRegistry:
+    rng = random.Random(seed)
+    registry = ToolRegistry()
+    for i in range(count):
+        registry.register(
+            f"tool_{i}", f"Synthetic tool number {i}. " + "Does something useful. " * rng.randint(1, 5)
+        )(_synthetic_function(i, rng))
+    return registry
+
+
+def _time_per_turn(fn, turns: int) -> float:
+    start = time.perf_counter()
+    for turn in range(turns):
+        fn(turn)
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-turn tool schema assembly")
+    parser.add_argument("--tools", type=int, default=250)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5, help="Tools per turn after routing (0 = all)")
+    args = parser.parse_args()
+
+    registry = build_registry(args.tools)
+    tools = registry.get_all_tools()
+    rng = random.Random(1)
+    subsets = [rng.sample(tools, args.top_k) if args.top_k else tools for _ in range(args.turns)]
+
+    def rebuilt(turn):
+        # Previous behaviour: model_json_schema() + dicts every turn, then the body
+        return json.dumps([tool.build_openai_schema() for tool in subsets[turn]]).encode()
+
+    def cached_dicts(turn):
+        return json.dumps(registry.get_openai_schemas(subsets[turn])).encode()
+
+    def cached_bytes(turn):
+        return registry.get_openai_schemas_json(subsets[turn])
+
+    registry.get_openai_schemas_json()  # Warm the cache: every tool is built once
+    assert json.loads(rebuilt(0)) == json.loads(cached_bytes(0))
+
+    # Tool construction: a fresh pydantic model per Tool vs the shared model cache
+    sample = tools[: min(50, len(tools))]
+    start = time.perf_counter()
+    for tool in sample:
+        tool._create_pydantic_model(tool.func)
+    fresh_model = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    for tool in sample:
+        Tool(tool.name, tool.func, tool.description)
+    cached_model = (time.perf_counter() - start) / len(sample)
+
+    per_turn = args.top_k or args.tools
+    print(f"{args.tools} registered tools, {per_turn} sent per turn, {args.turns} turns\n")
+    print(f"{'Per turn':<40} {'Time':>10}")
+    print("-" * 51)
+    results = [
+        ("rebuild schemas + json.dumps", _time_per_turn(rebuilt, args.turns)),
+        ("cached dicts + json.dumps", _time_per_turn(cached_dicts, args.turns)),
+        ("cached JSON bytes (joined)", _time_per_turn(cached_bytes, args.turns)),
+    ]
+    for label, seconds in results:
+        print(f"{label:<40} {seconds * 1e6:>8.1f}µs  ({results[0][1] / seconds:.1f}x)")
+    print(f"\n{'Per Tool()':<40} {'Time':>10}")
+    print("-" * 51)
+    print(f"{'create_model every time':<40} {fresh_model * 1e6:>8.1f}µs")
+    print(f"{'shared model cache':<40} {cached_model * 1e6:>8.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
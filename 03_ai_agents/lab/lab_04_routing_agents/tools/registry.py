@@ -1,14 +1,42 @@
 from typing import Callable, Any, Dict
 from pydantic import BaseModel, create_model
 import inspect
+import json
+import threading
+import weakref
+
+# Argument models (pydantic's compiled validators), so re-creating a Tool for
+# the same function reuses the model. Keyed weakly by func, then by name ->
+# (version, model): an entry dies with its function, and a new version
+# replaces the old one.
+_MODEL_CACHE: "weakref.WeakKeyDictionary[Callable, Dict[str, tuple[str, type[BaseModel]]]]" = weakref.WeakKeyDictionary()
+_MODEL_CACHE_LOCK = threading.Lock()
+
 
 class Tool:
     """A callable tool with schema."""
-    def __init__(self, name: str, func: Callable, description: str):
+    def __init__(self, name: str, func: Callable, description: str, version: str = "1"):
         self.name = name
         self.func = func
         self.description = description
-        self.model = self._create_pydantic_model(func)
+        self.version = version  # Bump to rebuild the cached model and schema
+        self.model = self._cached_model(func)
+        self._schema_key = None
+        self._schema: dict | None = None
+        self._schema_json: bytes | None = None
+
+    def _cached_model(self, func: Callable) -> type[BaseModel]:
+        try:
+            with _MODEL_CACHE_LOCK:
+                cached = _MODEL_CACHE.get(func, {}).get(self.name)
+        except TypeError:  # Not weak-referenceable: build without caching
+            return self._create_pydantic_model(func)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        model = self._create_pydantic_model(func)
+        with _MODEL_CACHE_LOCK:
+            _MODEL_CACHE.setdefault(func, {})[self.name] = (self.version, model)
+        return model
 
     def _create_pydantic_model(self, func: Callable) -> type[BaseModel]:
         """Create a Pydantic model from function signature."""
@@ -30,7 +58,24 @@ class Tool:
                 
         return create_model(f"{self.name}Schema", **fields)
 
+    def _cached_schema(self):
+        key = (self.name, self.description, self.version)
+        if self._schema_key != key:
+            self._schema = self.build_openai_schema()
+            self._schema_json = json.dumps(self._schema, separators=(",", ":")).encode()
+            self._schema_key = key
+
     def to_openai_schema(self) -> dict:
+        """OpenAI function schema, built once per name/description/version (treat as read-only)."""
+        self._cached_schema()
+        return self._schema
+
+    def to_openai_schema_json(self) -> bytes:
+        """The schema pre-serialized as compact JSON bytes."""
+        self._cached_schema()
+        return self._schema_json
+
+    def build_openai_schema(self) -> dict:
         """Convert tool to OpenAI function schema format using Pydantic."""
         schema = self.model.model_json_schema()
         
@@ -63,10 +108,10 @@ class ToolRegistry:
         self._tools: Dict[str, Tool] = {}
         self._categories: Dict[str, list[str]] = {}
 
-    def register(self, name: str, description: str, category: str = "general"):
+    def register(self, name: str, description: str, category: str = "general", version: str = "1"):
         """Decorator to register a function as a tool."""
         def decorator(func: Callable):
-            tool = Tool(name, func, description)
+            tool = Tool(name, func, description, version)
             self._tools[name] = tool
             if category not in self._categories:
                 self._categories[category] = []
@@ -84,6 +129,15 @@ class ToolRegistry:
         """Get all tools in a specific category."""
         return [self._tools[name] for name in self._categories.get(category, [])]
 
+    def get_openai_schemas(self, tools: list[Tool] | None = None) -> list[dict]:
+        """Cached schemas for `tools` (default: every registered tool)."""
+        return [tool.to_openai_schema() for tool in (self.get_all_tools() if tools is None else tools)]
+
+    def get_openai_schemas_json(self, tools: list[Tool] | None = None) -> bytes:
+        """The same list as a JSON array, joined from pre-serialized bytes."""
+        tools = self.get_all_tools() if tools is None else tools
+        return b"[" + b",".join(tool.to_openai_schema_json() for tool in tools) + b"]"
+
     def execute_tool(self, name: str) -> Callable:
         """Return a callable that executes the named tool."""
         tool = self.get_tool(name)